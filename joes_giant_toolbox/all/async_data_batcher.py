@@ -0,0 +1,304 @@
+"""Defines class AsyncDataBatcher"""
+
+import asyncio
+import collections
+import time
+import warnings
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from joes_giant_toolbox.all.data_batcher import _OVERSIZE_POLICIES, _datapoint_size
+
+BatchStats = collections.namedtuple(
+    "BatchStats",
+    [
+        "n_items",  # number of items in the batch
+        "n_bytes",  # total size of the items (according to size_func), if max_batch_bytes was given
+        "fill_fraction",  # how full the batch is, relative to its tightest limit (max_batch_size or max_batch_bytes)
+        "flush_reason",  # one of ["max_batch_size", "max_batch_bytes", "max_latency", "end_of_data"]
+        "oldest_item_wait_seconds",  # time from the arrival of the first item in the batch until the batch was emitted
+        "consumer_wait_seconds",  # time the consumer spent waiting for the batch (inside __anext__)
+    ],
+)
+
+
+async def _iterate_async(data) -> AsyncIterator[Any]:
+    """Wraps a normal (synchronous) iterable as an async iterator"""
+    for item in data:
+        yield item
+
+
+class AsyncDataBatcher:
+    """Groups the items of an async stream into batches, emitting each batch as soon as it reaches
+    `max_batch_size` items or `max_batch_bytes` bytes, or its oldest item has waited `max_latency_seconds`
+    (whichever comes first)
+
+    Statistics on every emitted batch (how full it was, why it was emitted, how long its items waited)
+    are recorded in `batch_stats` (most recent batches) and summarised by stats_summary()
+
+    Example:
+        >>> async def main():
+        ...     async for batch in AsyncDataBatcher(
+        ...         incoming_events(),      # any async iterable (or normal iterable)
+        ...         max_batch_size=500,
+        ...         max_latency_seconds=0.2,
+        ...     ):
+        ...         await load_into_bigquery(batch)
+        >>> asyncio.run(main())
+        >>> async def demo():
+        ...     async def trickle():
+        ...         for x in range(7):
+        ...             await asyncio.sleep(0.05 if x == 5 else 0)
+        ...             yield x
+        ...     batcher = AsyncDataBatcher(trickle(), max_batch_size=3, max_latency_seconds=0.01)
+        ...     print([batch async for batch in batcher])
+        ...     print([x.flush_reason for x in batcher.batch_stats])
+        >>> asyncio.run(demo())
+        [(0, 1, 2), (3, 4), (5, 6)]
+        ['max_batch_size', 'max_latency', 'end_of_data']
+    """
+
+    def __init__(
+        self,
+        data,
+        max_batch_size: Optional[int] = None,
+        max_latency_seconds: Optional[float] = None,
+        max_batch_bytes: Optional[int] = None,
+        size_func: Optional[Callable[[Any], int]] = None,
+        oversize_policy: str = "own_batch",
+        stats_history_size: int = 1_000,
+    ) -> None:
+        """
+        Note:
+            At least one of `max_batch_size`, `max_latency_seconds` or `max_batch_bytes` must be specified
+
+        Args:
+            data (Any): An async iterable (e.g. async generator), or a normal python iterable
+            max_batch_size (int): Emit a batch once it contains this many items
+            max_latency_seconds (float): Emit a batch once its first item has waited this many seconds
+                (even if no further items arrive)
+            max_batch_bytes (int): Emit a batch once the next item would push its total size over this
+            size_func (Callable): Function returning the size (in bytes) of a single item
+                e.g. len, sys.getsizeof, lambda x: len(json.dumps(x))
+                By default, as for DataBatcher (len() of str/bytes, .nbytes of numpy arrays and
+                scalars, otherwise sys.getsizeof(), with dict/list etc. items needing a size_func)
+                Only used if `max_batch_bytes` is specified
+            oversize_policy (str): What to do with an item which on its own exceeds `max_batch_bytes`:
+                "own_batch" (default): emit it in a batch of its own
+                "raise": raise a ValueError (after emitting the items batched before it)
+                "skip": leave it out of the batches (with a warning)
+            stats_history_size (int): Number of most recent batches to keep in `batch_stats`
+        """
+        if (
+            max_batch_size is None
+            and max_latency_seconds is None
+            and max_batch_bytes is None
+        ):
+            raise ValueError(
+                "At least one of `max_batch_size`, `max_latency_seconds` or `max_batch_bytes` must be specified"
+            )
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError("`max_batch_size` must be a positive integer")
+        if max_batch_bytes is not None and max_batch_bytes < 1:
+            raise ValueError("`max_batch_bytes` must be a positive integer")
+        if oversize_policy not in _OVERSIZE_POLICIES:
+            raise ValueError(f"`oversize_policy` must be one of {_OVERSIZE_POLICIES}")
+        self.max_batch_size = max_batch_size
+        self.max_latency_seconds = max_latency_seconds
+        self.max_batch_bytes = max_batch_bytes
+        self.size_func = _datapoint_size if size_func is None else size_func
+        self.oversize_policy = oversize_policy
+        self.batch_stats: Deque[BatchStats] = collections.deque(
+            maxlen=stats_history_size
+        )
+        self._data: AsyncIterator[Any] = (
+            data.__aiter__() if hasattr(data, "__aiter__") else _iterate_async(data)
+        )
+        self._pending_next_item: Optional[asyncio.Future] = None
+        # (item, size, arrival time) of an item which did not fit into the previous batch #
+        self._carried_item: Optional[Tuple[Any, int, float]] = None
+        self._deferred_error: Optional[BaseException] = None
+        self._data_exhausted: bool = False
+        self._totals: Dict[str, Any] = {
+            "n_batches": 0,
+            "n_items": 0,
+            "n_bytes": 0,
+            "sum_fill_fraction": 0.0,
+            "sum_oldest_item_wait_seconds": 0.0,
+            "max_oldest_item_wait_seconds": 0.0,
+            "sum_consumer_wait_seconds": 0.0,
+            "flush_reasons": collections.Counter(),
+        }
+
+    def __aiter__(self):
+        return self
+
+    async def _wait_for_next_item(self, timeout: Optional[float]) -> bool:
+        """Waits (at most [timeout] seconds) for the next item of the data to arrive
+        Returns False on timeout (the read is not cancelled, and is picked up again by the next call)"""
+        if self._pending_next_item is None:
+            self._pending_next_item = asyncio.ensure_future(self._data.__anext__())
+        done, _ = await asyncio.wait({self._pending_next_item}, timeout=timeout)
+        return bool(done)
+
+    async def __anext__(self) -> tuple:
+        """Returns the next batch of data"""
+        consumer_wait_start: float = time.monotonic()
+        batch: List[Any] = []
+        n_bytes: int = 0
+        first_item_arrival: Optional[float] = None
+        flush_reason: str = "end_of_data"
+        if self._carried_item is not None:
+            item, item_size, first_item_arrival = self._carried_item
+            self._carried_item = None
+            batch.append(item)
+            n_bytes += item_size
+        while not self._data_exhausted and self._deferred_error is None:
+            if self.max_batch_size is not None and len(batch) >= self.max_batch_size:
+                flush_reason = "max_batch_size"
+                break
+            if self.max_batch_bytes is not None and n_bytes >= self.max_batch_bytes:
+                flush_reason = "max_batch_bytes"
+                break
+            timeout: Optional[float] = None
+            if self.max_latency_seconds is not None and first_item_arrival is not None:
+                timeout = (
+                    first_item_arrival + self.max_latency_seconds - time.monotonic()
+                )
+                if timeout <= 0:
+                    flush_reason = "max_latency"
+                    break
+            if not await self._wait_for_next_item(timeout):
+                flush_reason = "max_latency"
+                break
+            next_item_read, self._pending_next_item = self._pending_next_item, None
+            try:
+                item = next_item_read.result()
+            except StopAsyncIteration:
+                self._data_exhausted = True
+                break
+            except Exception as error:  # pylint: disable=broad-except
+                # emit the items already batched, and raise the error on the next call #
+                self._deferred_error = error
+                break
+            item_arrival: float = time.monotonic()
+            item_size: int = (
+                self.size_func(item) if self.max_batch_bytes is not None else 0
+            )
+            if (
+                self.max_batch_bytes is not None
+                and item_size > self.max_batch_bytes
+                and self.oversize_policy != "own_batch"
+            ):
+                if self.oversize_policy == "skip":
+                    warnings.warn(
+                        f"skipped item (size {item_size} exceeds max_batch_bytes={self.max_batch_bytes})"
+                    )
+                    continue
+                self._deferred_error = ValueError(
+                    f"item has size {item_size}, which exceeds max_batch_bytes={self.max_batch_bytes}"
+                )
+                break
+            if (
+                self.max_batch_bytes is not None
+                and batch
+                and n_bytes + item_size > self.max_batch_bytes
+            ):
+                self._carried_item = (item, item_size, item_arrival)
+                flush_reason = "max_batch_bytes"
+                break
+            batch.append(item)
+            n_bytes += item_size
+            if first_item_arrival is None:
+                first_item_arrival = item_arrival
+        if not batch:
+            if self._deferred_error is not None:
+                error, self._deferred_error = self._deferred_error, None
+                self._data_exhausted = True
+                raise error
+            raise StopAsyncIteration
+        now: float = time.monotonic()
+        self._record_batch_stats(
+            BatchStats(
+                n_items=len(batch),
+                n_bytes=n_bytes if self.max_batch_bytes is not None else None,
+                fill_fraction=self._fill_fraction(len(batch), n_bytes),
+                flush_reason=flush_reason,
+                oldest_item_wait_seconds=now - first_item_arrival,
+                consumer_wait_seconds=now - consumer_wait_start,
+            )
+        )
+        return tuple(batch)
+
+    def _fill_fraction(self, n_items: int, n_bytes: int) -> Optional[float]:
+        """Fullness of a batch relative to its tightest limit (None if there is no size limit)"""
+        fill_fractions: List[float] = []
+        if self.max_batch_size is not None:
+            fill_fractions.append(n_items / self.max_batch_size)
+        if self.max_batch_bytes is not None:
+            fill_fractions.append(n_bytes / self.max_batch_bytes)
+        return max(fill_fractions) if fill_fractions else None
+
+    def _record_batch_stats(self, stats: BatchStats) -> None:
+        self.batch_stats.append(stats)
+        self._totals["n_batches"] += 1
+        self._totals["n_items"] += stats.n_items
+        self._totals["n_bytes"] += stats.n_bytes or 0
+        self._totals["sum_fill_fraction"] += stats.fill_fraction or 0.0
+        self._totals["sum_oldest_item_wait_seconds"] += stats.oldest_item_wait_seconds
+        self._totals["max_oldest_item_wait_seconds"] = max(
+            self._totals["max_oldest_item_wait_seconds"],
+            stats.oldest_item_wait_seconds,
+        )
+        self._totals["sum_consumer_wait_seconds"] += stats.consumer_wait_seconds
+        self._totals["flush_reasons"][stats.flush_reason] += 1
+
+    def stats_summary(self) -> Dict[str, Any]:
+        """Returns summary statistics over all of the batches emitted so far"""
+        n_batches: int = self._totals["n_batches"]
+        return {
+            "n_batches": n_batches,
+            "n_items": self._totals["n_items"],
+            "n_bytes": self._totals["n_bytes"] if self.max_batch_bytes else None,
+            "mean_batch_size": self._totals["n_items"] / n_batches
+            if n_batches
+            else None,
+            "mean_fill_fraction": (
+                self._totals["sum_fill_fraction"] / n_batches
+                if n_batches and (self.max_batch_size or self.max_batch_bytes)
+                else None
+            ),
+            "mean_oldest_item_wait_seconds": (
+                self._totals["sum_oldest_item_wait_seconds"] / n_batches
+                if n_batches
+                else None
+            ),
+            "max_oldest_item_wait_seconds": self._totals[
+                "max_oldest_item_wait_seconds"
+            ],
+            "mean_consumer_wait_seconds": (
+                self._totals["sum_consumer_wait_seconds"] / n_batches
+                if n_batches
+                else None
+            ),
+            "flush_reasons": dict(self._totals["flush_reasons"]),
+        }
+
+    async def aclose(self) -> None:
+        """Stops batching, cancelling any read from the data which is still in progress"""
+        self._data_exhausted = True
+        self._carried_item = None
+        if self._pending_next_item is not None:
+            self._pending_next_item.cancel()
+            try:
+                await self._pending_next_item
+            except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                pass
+            self._pending_next_item = None
+        if hasattr(self._data, "aclose"):
+            await self._data.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
@@ -0,0 +1,191 @@
+"""
+Defines class CircuitBreaker
+"""
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from joes_giant_toolbox.custom_exceptions import CircuitOpenError
+from joes_giant_toolbox.custom_logging import get_logger
+
+_LOGGER = get_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a dependency which is down (failing fast, instead of every caller waiting for it to
+    time out and then retrying it), and lets a few probe calls through to detect when it has recovered
+
+    States:
+        "closed": calls go through. After `failure_threshold` consecutive failures, the breaker opens
+        "open": calls fail immediately with CircuitOpenError. After `recovery_timeout_seconds`, the
+            breaker becomes half-open
+        "half_open": up to `half_open_max_calls` probe calls go through at a time (the rest fail
+            immediately). A successful probe closes the breaker, a failed one opens it again
+
+    A single CircuitBreaker can be shared by any number of threads and coroutines (e.g. 1 per
+    upstream service), and passed to retry_with_backoff() / call_with_retries()
+
+    Example:
+        >>> payments_api_breaker = CircuitBreaker(failure_threshold=5, recovery_timeout_seconds=30)
+        >>> @retry_with_backoff(max_attempts=4, circuit_breaker=payments_api_breaker)
+        ... def get_payment_status(payment_id):
+        ...     return requests.get(f"https://payments.internal/status/{payment_id}", timeout=2).json()
+        >>> payments_api_breaker.call(requests.get, "https://payments.internal/health")
+        >>> payments_api_breaker.state
+        'closed'
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        exceptions_to_count: tuple = (Exception,),
+        name: str = "circuit_breaker",
+    ) -> None:
+        """
+        Args:
+            failure_threshold (int): Number of consecutive failures which opens the breaker
+            recovery_timeout_seconds (float): Time the breaker stays open before letting probe calls through
+            half_open_max_calls (int): Maximum number of probe calls in progress at once while half-open
+            exceptions_to_count (tuple): Exceptions which count as a failure of the dependency (other
+                exceptions are raised as usual, but count as the dependency having responded)
+            name (str): Name used in log messages and in CircuitOpenError
+        """
+        if failure_threshold < 1:
+            raise ValueError("`failure_threshold` must be a positive integer")
+        if half_open_max_calls < 1:
+            raise ValueError("`half_open_max_calls` must be a positive integer")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.exceptions_to_count = exceptions_to_count
+        self.name = name
+        self._state: str = "closed"
+        self._consecutive_failures: int = 0
+        self._opened_at: float = 0.0
+        self._probes_in_progress: int = 0
+        self._lock = threading.Lock()
+        self._counts: collections.Counter = collections.Counter()
+
+    @property
+    def state(self) -> str:
+        """One of ["closed", "open", "half_open"]"""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _update_state(self) -> None:
+        """Moves from open to half-open once the recovery timeout has passed (requires self._lock)"""
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.recovery_timeout_seconds
+        ):
+            self._state = "half_open"
+            self._probes_in_progress = 0
+            _LOGGER.info("%s is half-open (letting probe calls through)", self.name)
+
+    def before_call(self) -> None:
+        """Registers the start of a call, raising CircuitOpenError if the call is not allowed"""
+        with self._lock:
+            self._update_state()
+            if self._state == "open" or (
+                self._state == "half_open"
+                and self._probes_in_progress >= self.half_open_max_calls
+            ):
+                self._counts["rejected"] += 1
+                raise CircuitOpenError(
+                    f"{self.name} is {self._state}: not calling the dependency"
+                )
+            if self._state == "half_open":
+                self._probes_in_progress += 1
+            self._counts["allowed"] += 1
+
+    def _end_probe(self) -> None:
+        """(requires self._lock)"""
+        if self._state == "half_open" and self._probes_in_progress > 0:
+            self._probes_in_progress -= 1
+
+    def record_success(self) -> None:
+        """Registers that a call (started with before_call()) got a response from the dependency"""
+        with self._lock:
+            self._end_probe()
+            self._counts["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state == "half_open":
+                self._state = "closed"
+                _LOGGER.info("%s is closed (the dependency has recovered)", self.name)
+
+    def record_failure(self) -> None:
+        """Registers that a call (started with before_call()) failed"""
+        with self._lock:
+            self._end_probe()
+            self._counts["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == "half_open" or (
+                self._state == "closed"
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._counts["times_opened"] += 1
+                _LOGGER.warning(
+                    "%s is open (after %s consecutive failures)",
+                    self.name,
+                    self._consecutive_failures,
+                )
+
+    def record_abandoned(self) -> None:
+        """Registers that a call (started with before_call()) ended without an outcome (e.g. it was cancelled)"""
+        with self._lock:
+            self._end_probe()
+
+    def record_outcome(self, error: BaseException | None) -> None:
+        """Registers the outcome of a call: a failure if [error] is one of `exceptions_to_count`, abandoned
+        if [error] is not an Exception (e.g. asyncio.CancelledError), otherwise a success"""
+        if error is None:
+            self.record_success()
+        elif isinstance(error, self.exceptions_to_count):
+            self.record_failure()
+        elif not isinstance(error, Exception):
+            self.record_abandoned()
+        else:
+            self.record_success()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Calls func(*args, **kwargs) through the breaker (for coroutine functions, use call_async())"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            self.record_outcome(error)
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func: Callable, *args, **kwargs) -> Any:
+        """Awaits func(*args, **kwargs) through the breaker"""
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as error:
+            self.record_outcome(error)
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current state and the counts of allowed, rejected, successful and failed calls"""
+        with self._lock:
+            self._update_state()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "allowed": self._counts["allowed"],
+                "rejected": self._counts["rejected"],
+                "successes": self._counts["successes"],
+                "failures": self._counts["failures"],
+                "times_opened": self._counts["times_opened"],
+            }
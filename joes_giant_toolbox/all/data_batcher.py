@@ -1,5 +1,119 @@
 """Defines class DataBatcher"""
 
+import itertools
+import queue
+import sys
+import threading
+import warnings
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# what to do with a single record which is larger than max_batch_bytes on its own #
+_OVERSIZE_POLICIES = ("own_batch", "raise", "skip")
+
+_END_OF_BATCHES = object()  # placed on the prefetch queue once the data is exhausted
+
+
+def _datapoint_size(datapoint: Any) -> int:
+    """Default size (in bytes) of a single datapoint, for use with max_batch_bytes: len() of str, bytes,
+    bytearray and memoryview, .nbytes of numpy arrays and scalars (and pandas objects), otherwise
+    sys.getsizeof() (e.g. int, float)
+
+    Raises a TypeError for other containers (e.g. dict, list), whose len() is a count of items and
+    whose sys.getsizeof() leaves out their contents
+    """
+    if isinstance(datapoint, (str, bytes, bytearray, memoryview)):
+        return len(datapoint)
+    nbytes: Any = getattr(datapoint, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(datapoint, "__len__"):
+        raise TypeError(
+            f"cannot tell the size in bytes of a {type(datapoint).__name__} datapoint: "
+            "pass a size_func (e.g. size_func=lambda x: len(json.dumps(x)))"
+        )
+    return sys.getsizeof(datapoint)
+
+
+class _PrefetchError:
+    """Carries an exception raised in the prefetch thread across to the consuming thread"""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _prefetch_batches(
+    batches: Iterator[Any],
+    prefetch_queue: queue.Queue,
+    stop_prefetching: threading.Event,
+) -> None:
+    """Fills [prefetch_queue] with batches until they run out, an error occurs, or prefetching is stopped
+
+    (a module-level function rather than a method, so that the running thread does not keep the
+    DataBatcher alive, which would prevent it from being shut down when it is garbage collected)
+    """
+
+    def put_unless_stopped(item: Any) -> bool:
+        while not stop_prefetching.is_set():
+            try:
+                prefetch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for batch in batches:
+            if not put_unless_stopped(batch):
+                return
+        put_unless_stopped(_END_OF_BATCHES)
+    except BaseException as error:  # pylint: disable=broad-except
+        put_unless_stopped(_PrefetchError(error))
+
+
+def _pack_by_bytes(
+    datapoints: Iterator[Any],
+    size_func: Callable[[Any], int],
+    max_batch_bytes: int,
+    max_batch_size: Optional[int],
+    oversize_policy: str,
+) -> Iterator[Tuple[int, int, List[Any]]]:
+    """Greedily packs consecutive datapoints into batches whose total size does not exceed [max_batch_bytes]
+    (nor [max_batch_size] datapoints, if given)
+
+    Yields:
+        (start_index, stop_index, datapoints) of each batch
+    """
+    batch: List[Any] = []
+    batch_bytes: int = 0
+    start_idx: int = 0
+    for datapoint_idx, datapoint in enumerate(datapoints):
+        datapoint_bytes: int = size_func(datapoint)
+        if datapoint_bytes > max_batch_bytes:
+            if oversize_policy == "raise":
+                raise ValueError(
+                    f"datapoint {datapoint_idx} has size {datapoint_bytes}, which exceeds max_batch_bytes={max_batch_bytes}"
+                )
+            if batch:
+                yield start_idx, datapoint_idx, batch
+            if oversize_policy == "own_batch":
+                yield datapoint_idx, datapoint_idx + 1, [datapoint]
+            else:
+                warnings.warn(
+                    f"skipped datapoint {datapoint_idx} (size {datapoint_bytes} exceeds max_batch_bytes={max_batch_bytes})"
+                )
+            batch, batch_bytes, start_idx = [], 0, datapoint_idx + 1
+            continue
+        if batch and (
+            batch_bytes + datapoint_bytes > max_batch_bytes
+            or (max_batch_size is not None and len(batch) >= max_batch_size)
+        ):
+            yield start_idx, datapoint_idx, batch
+            batch, batch_bytes, start_idx = [], 0, datapoint_idx
+        batch.append(datapoint)
+        batch_bytes += datapoint_bytes
+    if batch:
+        yield start_idx, start_idx + len(batch), batch
+
 
 class DataBatcher:
     """Breaks a provided iterable up into batches according to a
@@ -20,6 +134,22 @@ class DataBatcher:
     (1, 2, 3, 4, 5)
     (6, 7, 8, 9, 10)
     (11, 12)
+    >>> import itertools
+    >>> unbounded_stream = itertools.count()
+    >>> next(DataBatcher(unbounded_stream, fixed_batch_size=3))
+    (0, 1, 2)
+    >>> import numpy as np
+    >>> next(DataBatcher(np.arange(10_000_000), fixed_batch_size=4))   # a view, not a copy
+    array([0, 1, 2, 3])
+    >>> records = [{"id": 1, "text": "a" * 100}, {"id": 2, "text": "b" * 5_000}, {"id": 3, "text": "c"}]
+    >>> for batch in DataBatcher(records, max_batch_bytes=4_000, size_func=lambda x: len(json.dumps(x))):
+    ...     print([record["id"] for record in batch])
+    [1]
+    [2]
+    [3]
+    >>> with DataBatcher(slow_paginated_api_results(), fixed_batch_size=500, prefetch=2) as batcher:
+    ...     for batch in batcher:
+    ...         process(batch)  # the next 2 batches are fetched in the background meanwhile
     """
 
     def __init__(
@@ -27,55 +157,234 @@ class DataBatcher:
         data,
         batch_pattern=None,
         fixed_batch_size: int | None = None,
+        prefetch: int = 0,
+        max_batch_bytes: int | None = None,
+        size_func: Optional[Callable[[Any], int]] = None,
+        oversize_policy: str = "own_batch",
     ) -> None:
         """Initial setup of DataBatcher class
 
         Note:
-            Exactly one of `batch_pattern` or `fixed_batch_size` must be specified
+            Exactly one of `batch_pattern`, `fixed_batch_size` or `max_batch_bytes` must be specified
+            (except that `fixed_batch_size` and `max_batch_bytes` can be combined, in which case each
+            batch respects both limits)
+            `data` is consumed lazily, so it can be an unbounded iterator (generator, file, stream etc.)
+            when using `fixed_batch_size` (with `batch_pattern`, the final batch would never end)
 
         Args:
-            data (Any): Any python iterable (list, tuple, set, str, dict etc.)
+            data (Any): Any python iterable (list, tuple, set, str, dict, generator, file etc.)
+                Batches are returned as tuples, except for inputs which can be sliced without
+                copying element by element, for which each batch is a slice of the input:
+                    - tuple, str, bytes, bytearray, memoryview: a slice of the same type
+                    - numpy.ndarray: a view (slice along the first axis)
+                    - pandas.DataFrame, pandas.Series: a .iloc slice
+                (a list input gives tuples, built from a list slice)
             batch_pattern (tuple[int, ...]): A list of integers describing sequence of batch sizes
                 If `batch_pattern` is exhausted before `data`, the final batch contains everything
                 remaining in `data`
                 Omit this argument if using a fixed batch size
             fixed_batch_size(int): Return this number of datapoints in each batch
                 Omit this argument if using a batching pattern
+            max_batch_bytes (int): Pack consecutive datapoints greedily into each batch, for as long as
+                the total size of the batch (according to `size_func`) does not exceed this
+            size_func (Callable): Function returning the size (in bytes) of a single datapoint
+                e.g. len, sys.getsizeof, lambda x: len(json.dumps(x))
+                By default: len() of str/bytes/bytearray/memoryview, .nbytes of numpy arrays and
+                scalars, otherwise sys.getsizeof() (e.g. int, float), and each element of
+                bytes/bytearray/memoryview input counts as its item size. Other containers
+                (e.g. dict or list records) raise a TypeError, so need an explicit size_func
+                Only used if `max_batch_bytes` is specified
+            oversize_policy (str): What to do with a datapoint which on its own exceeds `max_batch_bytes`:
+                "own_batch" (default): return it in a batch of its own
+                "raise": raise a ValueError
+                "skip": leave it out of the batches (with a warning)
+            prefetch (int): If greater than 0, a background thread prepares up to this many upcoming
+                batches while the current one is being processed (useful when `data` is slow to read,
+                e.g. network or cloud storage). An exception raised while reading `data` is re-raised
+                by the next call to __next__(). Call close() (or use the DataBatcher as a context
+                manager) to stop the background thread if you stop iterating early
         """
-        if (batch_pattern is None and fixed_batch_size is None) or (
-            batch_pattern is not None and fixed_batch_size is not None
+        if (
+            batch_pattern is None
+            and fixed_batch_size is None
+            and max_batch_bytes is None
+        ) or (
+            batch_pattern is not None
+            and (fixed_batch_size is not None or max_batch_bytes is not None)
         ):
             raise ValueError(
-                "Exactly one of `batch_pattern` or `fixed_batch_size` must be specified"
+                "Exactly one of `batch_pattern`, `fixed_batch_size` or `max_batch_bytes` must be specified"
+            )
+        if fixed_batch_size is not None and fixed_batch_size < 1:
+            raise ValueError("`fixed_batch_size` must be a positive integer")
+        if max_batch_bytes is not None and max_batch_bytes < 1:
+            raise ValueError("`max_batch_bytes` must be a positive integer")
+        if oversize_policy not in _OVERSIZE_POLICIES:
+            raise ValueError(f"`oversize_policy` must be one of {_OVERSIZE_POLICIES}")
+        data_slicer: Optional[Callable[[int, int], Any]] = self._get_slicer(data)
+        self._batches: Iterator[Any]
+        if max_batch_bytes is not None:
+            if size_func is None:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    item_size: int = memoryview(data).itemsize
+                    size_func = (
+                        lambda _: item_size
+                    )  # pylint: disable=unnecessary-lambda-assignment
+                else:
+                    size_func = _datapoint_size
+            packed_batches: Iterator[Tuple[int, int, List[Any]]] = _pack_by_bytes(
+                self._iterate_datapoints(data) if data_slicer else iter(data),
+                size_func,
+                max_batch_bytes,
+                fixed_batch_size,
+                oversize_policy,
+            )
+            if data_slicer is None:
+                self._batches = (tuple(batch) for _, _, batch in packed_batches)
+            else:
+                self._batches = (
+                    data_slicer(start, stop) for start, stop, _ in packed_batches
+                )
+        else:
+            batch_sizes: Iterator[int]
+            if fixed_batch_size is not None:
+                batch_sizes = itertools.repeat(fixed_batch_size)
+            else:
+                batch_sizes = iter(batch_pattern)
+            if data_slicer is None:
+                self._batches = self._iterator_batches(iter(data), batch_sizes)
+            else:
+                self._batches = self._sliced_batches(
+                    data_slicer, len(data), batch_sizes
+                )
+        if prefetch < 0:
+            raise ValueError("`prefetch` must be a non-negative integer")
+        self._closed: bool = False
+        self._prefetch_queue: Optional[queue.Queue] = None
+        self._stop_prefetching: threading.Event = threading.Event()
+        self._prefetch_thread: Optional[threading.Thread] = None
+        if prefetch > 0:
+            self._prefetch_queue = queue.Queue(maxsize=prefetch)
+            self._prefetch_thread = threading.Thread(
+                target=_prefetch_batches,
+                args=(self._batches, self._prefetch_queue, self._stop_prefetching),
+                name="DataBatcher-prefetch",
+                daemon=True,
             )
-        self._data = iter(data)
-        if fixed_batch_size is not None:
-            n_full_batches, n_remainder = divmod(len(data), fixed_batch_size)
-            batch_pattern = tuple([fixed_batch_size] * n_full_batches + [n_remainder])
-        self._batch_size = iter(batch_pattern)
+            self._prefetch_thread.start()
+
+    @staticmethod
+    def _get_slicer(data) -> Optional[Callable[[int, int], Any]]:
+        """Returns a function returning data[start:stop] (None if `data` is not sliceable without
+        building the batch element by element)"""
+        if isinstance(data, (tuple, str, bytes, bytearray, memoryview)):
+            return lambda start, stop: data[start:stop]
+        if isinstance(data, list):
+            return lambda start, stop: tuple(data[start:stop])
+        numpy_module = sys.modules.get("numpy")
+        if numpy_module is not None and isinstance(data, numpy_module.ndarray):
+            if data.ndim > 0:
+                return lambda start, stop: data[start:stop]
+        pandas_module = sys.modules.get("pandas")
+        if pandas_module is not None and isinstance(
+            data, (pandas_module.DataFrame, pandas_module.Series)
+        ):
+            return lambda start, stop: data.iloc[start:stop]
+        return None
+
+    @staticmethod
+    def _iterate_datapoints(data) -> Iterator[Any]:
+        """Iterates over the datapoints of sliceable data, in the same order as they are sliced"""
+        pandas_module = sys.modules.get("pandas")
+        if pandas_module is not None and isinstance(data, pandas_module.DataFrame):
+            return (row for _, row in data.iterrows())
+        return iter(data)
+
+    @staticmethod
+    def _sliced_batches(
+        data_slicer: Callable[[int, int], Any], n_data: int, batch_sizes: Iterator[int]
+    ) -> Iterator[Any]:
+        """Yields batches of sliceable data (no element-by-element copying)"""
+        start: int = 0
+        for batch_size in batch_sizes:
+            stop: int = min(start + batch_size, n_data)
+            if stop <= start:
+                return
+            yield data_slicer(start, stop)
+            start = stop
+        if start < n_data:  # nothing left in batch_pattern
+            yield data_slicer(start, n_data)
+
+    @staticmethod
+    def _iterator_batches(
+        data_iterator: Iterator[Any], batch_sizes: Iterator[int]
+    ) -> Iterator[tuple]:
+        """Yields batches (tuples) of data from an iterator, consuming it lazily"""
+        for batch_size in batch_sizes:
+            batch: tuple = tuple(itertools.islice(data_iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+        batch = tuple(data_iterator)  # nothing left in batch_pattern
+        if batch:
+            yield batch
 
     def __iter__(self):
         return self
 
-    def __next__(self) -> tuple:
+    def __next__(self) -> Any:
         """Returns the next batch of data"""
-        result = []
-        try:
-            batch_size: int = next(self._batch_size)
-            for _ in range(batch_size):
-                try:
-                    result.append(next(self._data))
-                except StopIteration:
-                    break
-        except StopIteration:  # nothing left in batch_pattern
-            while self._data:
-                try:
-                    result.append(next(self._data))
-                except StopIteration:
-                    break
-        if len(result) == 0:
+        if self._closed:
             raise StopIteration
-        return tuple(result)
+        if self._prefetch_queue is None:
+            return next(self._batches)
+        # (polled, so that a consumer waiting here stops when close() is called from another thread) #
+        while True:
+            try:
+                item = self._prefetch_queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self._stop_prefetching.is_set():
+                    raise StopIteration from None
+        if item is _END_OF_BATCHES:
+            self.close()
+            raise StopIteration
+        if isinstance(item, _PrefetchError):
+            self.close()
+            raise item.error
+        return item
+
+    def close(self, timeout: Optional[float] = 1.0) -> None:
+        """Stops iteration (and the prefetch thread, if there is one). Any prefetched batches are discarded
+
+        Can be called from another thread, in which case a consumer waiting for the next batch gets
+        StopIteration
+
+        Args:
+            timeout (float): Maximum number of seconds to wait for the prefetch thread to finish
+                (it can only stop between batches, so it may outlive this call if `data` is very slow)
+        """
+        self._closed = True
+        self._stop_prefetching.set()
+        if (
+            self._prefetch_thread is not None
+            and self._prefetch_thread is not threading.current_thread()
+        ):
+            self._prefetch_thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # don't wait for the prefetch thread while being garbage collected #
+        stop_prefetching: Optional[threading.Event] = getattr(
+            self, "_stop_prefetching", None
+        )
+        if stop_prefetching is not None:
+            stop_prefetching.set()
 
 
 if __name__ == "__main__":
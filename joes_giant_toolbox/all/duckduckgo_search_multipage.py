@@ -7,6 +7,10 @@ import warnings
 import requests
 import bs4
 
+from joes_giant_toolbox.custom_logging import enable_verbose_logging, get_logger
+
+_LOGGER = get_logger(__name__)
+
 
 def duckduckgo_search_multipage(
     query_str: str,
@@ -43,7 +47,7 @@ def duckduckgo_search_multipage(
     region: str, optional (default: None)
         Region to specify to DuckDuckGo (e.g. "uk-en","us-en","za-en" etc.) - refer to the DuckDuckGo "URL parameters" documentation
     verbose: bool, optional (default: True)
-        Whether to print status information as the requests are processed or not
+        Whether to log status information (at INFO level) as the requests are processed or not
     **kwargs
         Additional parameters to pass to requests.get() function (e.g. to alter the request timeout, headers etc.)
 
@@ -81,6 +85,8 @@ def duckduckgo_search_multipage(
     ...     headers={"User-Agent":"Joe's Giant Toolbox"},
     ... )
     """
+    if verbose:
+        enable_verbose_logging(_LOGGER)
     results_dict = {
         "request_log": {},
         "search_results_list": [],
@@ -109,8 +115,10 @@ def duckduckgo_search_multipage(
         "additional_desc": "no_problems_detected",  # this can be updated later
     }
     if verbose:
-        print(
-            f"sent request: results_page=1, status_code={ddg_response.status_code}, status_desc='{ddg_response.reason}'"
+        _LOGGER.info(
+            "sent request: results_page=1, status_code=%s, status_desc='%s'",
+            ddg_response.status_code,
+            ddg_response.reason,
         )
     if ddg_response.status_code == 200:
         soup = bs4.BeautifulSoup(ddg_response.text, "html.parser")
@@ -132,10 +140,12 @@ def duckduckgo_search_multipage(
         ]
         results_dict["request_log"]["page_1"]["n_results"] = len(result_desc_list)
         if verbose:
-            print(f"{len(result_link_list)} results returned")
+            _LOGGER.info("%s results returned", len(result_link_list))
         if results_dict["request_log"][f"page_1"]["n_results"] == 0:
             if verbose:
-                print(f"page 1 returned 0 results -> Not requesting further pages")
+                _LOGGER.info(
+                    "page 1 returned 0 results -> Not requesting further pages"
+                )
             results_dict["request_log"][f"page_1"][
                 "additional_desc"
             ] = "page_returned_no_results_so_not_requesting_further_pages"
@@ -167,7 +177,7 @@ def duckduckgo_search_multipage(
                 kwargs["params"].update(post_request_params)
                 wait_time = random.uniform(*wait_secs_between_requests_min_max)
                 if verbose:
-                    print(f"waiting {wait_time:.2f} seconds")
+                    _LOGGER.info("waiting %.2f seconds", wait_time)
                 time.sleep(wait_time)
                 ddg_response = requests.post(
                     url="https://lite.duckduckgo.com/lite", **kwargs
@@ -179,8 +189,11 @@ def duckduckgo_search_multipage(
                     "additional_desc": "no_problems_detected",  # this can be updated later
                 }
                 if verbose:
-                    print(
-                        f"sent request: results_page={page_num}, status_code={ddg_response.status_code}, status_desc='{ddg_response.reason}'"
+                    _LOGGER.info(
+                        "sent request: results_page=%s, status_code=%s, status_desc='%s'",
+                        page_num,
+                        ddg_response.status_code,
+                        ddg_response.reason,
                     )
                 if ddg_response.status_code == 200:
                     soup = bs4.BeautifulSoup(ddg_response.text, "html.parser")
@@ -200,14 +213,15 @@ def duckduckgo_search_multipage(
                         result_link_list
                     )
                     if verbose:
-                        print(f"{len(result_link_list)} results returned")
+                        _LOGGER.info("%s results returned", len(result_link_list))
                     if (
                         results_dict["request_log"][f"page_{page_num}"]["n_results"]
                         == 0
                     ):
                         if verbose:
-                            print(
-                                f"page {page_num} returned 0 results -> Not requesting further pages"
+                            _LOGGER.info(
+                                "page %s returned 0 results -> Not requesting further pages",
+                                page_num,
                             )
                         results_dict["request_log"][f"page_{page_num}"][
                             "additional_desc"
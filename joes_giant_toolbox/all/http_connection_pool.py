@@ -0,0 +1,414 @@
+"""
+Defines class HTTPConnectionPool, and the module-level pool used by make_url_request()
+"""
+import atexit
+import collections
+import http.client
+import os
+import ssl
+import string
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+# header sent by urllib.request.urlopen() (so that websites see the same client as before) #
+_DEFAULT_USER_AGENT: str = f"Python-urllib/{urllib.request.__version__}"
+_REDIRECT_STATUS_CODES = (301, 302, 303, 307, 308)
+
+
+class HTTPConnectionPool:
+    """Keeps HTTP and HTTPS connections open between requests ("keep-alive"), so that repeated requests
+    to the same host do not each pay for a new TCP connection and TLS handshake
+
+    Connections are reused per (scheme, host, port), at most [max_connections_per_host] are open to
+    each host at once (further requests wait for a connection to be released, for at most their
+    timeout), and connections left idle for [idle_timeout_seconds] are closed. The pool can be shared
+    by any number of threads
+
+    make_url_request() uses a module-level pool by default (see get_default_connection_pool()), which
+    does not limit the number of connections per host.
+    Do not share a pool with forked child processes (the default pool is replaced in child processes)
+
+    Example Usage
+    -------------
+    >>> crawler_pool = HTTPConnectionPool(max_connections_per_host=4, idle_timeout_seconds=60)
+    >>> for page_num in range(1, 1001):
+    ...     make_url_request(
+    ...         url=f"https://api.example.com/items?page={page_num}", connection_pool=crawler_pool
+    ...     )
+    >>> crawler_pool.stats()
+    {'connections_opened': 1, 'connections_reused': 999, 'connections_evicted_idle': 0,
+     'connections_open': 1, 'waits_for_connection': 0}
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: Optional[int] = 10,
+        idle_timeout_seconds: float = 30.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_connections_per_host: int, optional
+            Maximum number of connections open to each (scheme, host, port) at once
+            (None means no limit)
+        idle_timeout_seconds: float
+            Connections unused for this long are closed (servers close idle connections themselves
+            after a while, and reusing a connection which the server has closed costs a failed attempt)
+        """
+        if max_connections_per_host is not None and max_connections_per_host < 1:
+            raise ValueError(
+                "`max_connections_per_host` must be a positive integer (or None)"
+            )
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout_seconds = idle_timeout_seconds
+        # idle connections per host (only hosts which have any), as (connection, time released)
+        #   with the most recent last #
+        self._idle: Dict[Tuple, List] = {}
+        self._n_open: collections.Counter = collections.Counter()
+        self._next_eviction_time: float = 0.0
+        self._condition = threading.Condition()
+        self._counts: collections.Counter = collections.Counter()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _create_connection(
+        self, scheme: str, host: str, timeout: float
+    ) -> http.client.HTTPConnection:
+        if scheme == "http":
+            return http.client.HTTPConnection(host, timeout=timeout)
+        if self._ssl_context is None:
+            # the same context that urllib.request.urlopen() creates for every connection #
+            ssl_context = (
+                ssl._create_default_https_context()  # pylint: disable=protected-access
+            )
+            ssl_context.set_alpn_protocols(["http/1.1"])
+            if ssl_context.post_handshake_auth is not None:
+                ssl_context.post_handshake_auth = True
+            self._ssl_context = ssl_context
+        return http.client.HTTPSConnection(
+            host, timeout=timeout, context=self._ssl_context
+        )
+
+    def _close_connection(self, host_key: Tuple, connection) -> None:
+        """Closes a connection counted as open to [host_key] (requires self._condition)"""
+        connection.close()
+        self._n_open[host_key] -= 1
+        if self._n_open[host_key] == 0:
+            del self._n_open[host_key]
+        self._condition.notify()
+
+    def _evict_idle_from_host(self, host_key: Tuple, now: float) -> None:
+        """Closes the connections to [host_key] which have been idle for too long
+        (requires self._condition)"""
+        idle_connections: List = self._idle[host_key]
+        n_expired: int = 0
+        while (
+            n_expired < len(idle_connections)
+            and now - idle_connections[n_expired][1] >= self.idle_timeout_seconds
+        ):
+            self._close_connection(host_key, idle_connections[n_expired][0])
+            n_expired += 1
+        self._counts["connections_evicted_idle"] += n_expired
+        del idle_connections[:n_expired]
+        if not idle_connections:
+            del self._idle[host_key]
+
+    def _evict_idle(self, now: float) -> None:
+        """Closes connections (to any host) which have been idle for too long, at most once a second
+        (requires self._condition)"""
+        if now < self._next_eviction_time:
+            return
+        self._next_eviction_time = now + min(1.0, self.idle_timeout_seconds)
+        for host_key in list(self._idle):
+            self._evict_idle_from_host(host_key, now)
+
+    def _acquire(
+        self, scheme: str, host: str, timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Returns (connection, True) for a reused connection, or (new connection, False)
+
+        Raises TimeoutError if no connection to the host becomes available within [timeout] seconds
+        """
+        host_key: Tuple = (scheme, host)
+        deadline: Optional[float] = (
+            None if timeout is None else time.monotonic() + timeout
+        )
+        with self._condition:
+            while True:
+                now: float = time.monotonic()
+                self._evict_idle(now)
+                if host_key in self._idle:
+                    self._evict_idle_from_host(host_key, now)
+                if host_key in self._idle:
+                    connection, _ = self._idle[host_key].pop()
+                    if not self._idle[host_key]:
+                        del self._idle[host_key]
+                    self._counts["connections_reused"] += 1
+                    connection.timeout = timeout
+                    if connection.sock is not None:
+                        connection.sock.settimeout(timeout)
+                    return connection, True
+                if (
+                    self.max_connections_per_host is None
+                    or self._n_open[host_key] < self.max_connections_per_host
+                ):
+                    self._n_open[host_key] += 1
+                    self._counts["connections_opened"] += 1
+                    break
+                if deadline is not None and now >= deadline:
+                    raise TimeoutError(
+                        f"no connection to {host} became available within {timeout} seconds"
+                    )
+                self._counts["waits_for_connection"] += 1
+                self._condition.wait(None if deadline is None else deadline - now)
+        try:
+            return self._create_connection(scheme, host, timeout), False
+        except BaseException:
+            with self._condition:
+                self._n_open[host_key] -= 1
+                if self._n_open[host_key] == 0:
+                    del self._n_open[host_key]
+                self._condition.notify()
+            raise
+
+    def _release(
+        self,
+        scheme: str,
+        host: str,
+        connection: http.client.HTTPConnection,
+        reusable: bool,
+    ) -> None:
+        host_key: Tuple = (scheme, host)
+        with self._condition:
+            if reusable:
+                self._idle.setdefault(host_key, []).append(
+                    (connection, time.monotonic())
+                )
+                self._condition.notify()
+            else:
+                self._close_connection(host_key, connection)
+
+    def _send(
+        self,
+        request: urllib.request.Request,
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Sends a GET request on a pooled connection, returning the connection and the response.
+        A reused connection which the server has meanwhile closed is replaced by a new one"""
+        while True:
+            connection, reused = self._acquire(request.type, request.host, timeout)
+            try:
+                try:
+                    connection.request("GET", request.selector, headers=headers)
+                except OSError as error:
+                    # (urllib.request.urlopen() raises connection errors as URLError) #
+                    raise urllib.error.URLError(error)
+                return connection, connection.getresponse()
+            except (OSError, http.client.HTTPException) as error:
+                self._release(request.type, request.host, connection, reusable=False)
+                stale_connection: bool = reused and not isinstance(
+                    getattr(error, "reason", error), TimeoutError
+                )
+                if not stale_connection:
+                    raise
+            except BaseException:
+                self._release(request.type, request.host, connection, reusable=False)
+                raise
+
+    def urlopen(
+        self,
+        request: urllib.request.Request,
+        timeout: float,
+        max_bytes: Optional[int] = None,
+    ) -> Tuple[int, bytes]:
+        """Makes a GET request, returning (status code, content), and raising the same exceptions as
+        urllib.request.urlopen() would (HTTPError for error status codes, URLError for connection
+        errors, TimeoutError if the response is too slow)
+
+        Redirects are followed as urllib.request.urlopen() follows them. Requests which the pool does
+        not handle (with data, to a scheme other than http/https, or through a proxy) are made with
+        urllib.request.urlopen()
+        """
+        headers: Dict[str, str] = dict(request.header_items())
+        headers.setdefault("User-agent", _DEFAULT_USER_AGENT)
+        n_redirects: int = 0
+        while True:
+            if (
+                request.data is not None
+                or request.type not in ("http", "https")
+                or request.type in urllib.request.getproxies()
+            ):
+                with urllib.request.urlopen(request, timeout=timeout) as url_response:
+                    return url_response.status, url_response.read(
+                        *(() if max_bytes is None else (max_bytes,))
+                    )
+            if not request.host:
+                raise urllib.error.URLError("no host given")
+            scheme, host = request.type, request.host
+            connection, response = self._send(request, headers, timeout)
+            reusable: bool = False
+            try:
+                if response.status in _REDIRECT_STATUS_CODES and (
+                    "location" in response.headers or "uri" in response.headers
+                ):
+                    response.read()
+                    reusable = not response.will_close
+                    redirect_url: str = self._redirect_url(
+                        request, response, n_redirects
+                    )
+                    request = urllib.request.Request(redirect_url, headers=headers)
+                    n_redirects += 1
+                    continue
+                if not 200 <= response.status < 300:
+                    response.read()
+                    reusable = not response.will_close
+                    raise urllib.error.HTTPError(
+                        request.full_url,
+                        response.status,
+                        response.reason,
+                        response.headers,
+                        None,
+                    )
+                content: bytes = (
+                    response.read() if max_bytes is None else response.read(max_bytes)
+                )
+                # (a partly read response leaves the connection unusable) #
+                reusable = response.isclosed() and not response.will_close
+                return response.status, content
+            finally:
+                self._release(scheme, host, connection, reusable)
+
+    @staticmethod
+    def _redirect_url(
+        request: urllib.request.Request,
+        response: http.client.HTTPResponse,
+        n_redirects: int,
+    ) -> str:
+        """Returns the URL redirected to, with the same checks as urllib.request.HTTPRedirectHandler"""
+        redirect_url: str = response.headers.get("location") or response.headers.get(
+            "uri"
+        )
+        redirect_url = urllib.parse.urljoin(request.full_url, redirect_url)
+        redirect_url = urllib.parse.quote(
+            redirect_url, encoding="iso-8859-1", safe=string.punctuation
+        )
+        if urllib.parse.urlparse(redirect_url).scheme not in ("http", "https", "ftp"):
+            raise urllib.error.HTTPError(
+                redirect_url,
+                response.status,
+                f"{response.reason} - Redirection to url '{redirect_url}' is not allowed",
+                response.headers,
+                None,
+            )
+        if n_redirects >= urllib.request.HTTPRedirectHandler.max_redirections:
+            raise urllib.error.HTTPError(
+                request.full_url,
+                response.status,
+                urllib.request.HTTPRedirectHandler.inf_msg + response.reason,
+                response.headers,
+                None,
+            )
+        return redirect_url
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the counts of opened, reused and evicted connections, and of waits for a connection"""
+        with self._condition:
+            return {
+                "connections_opened": self._counts["connections_opened"],
+                "connections_reused": self._counts["connections_reused"],
+                "connections_evicted_idle": self._counts["connections_evicted_idle"],
+                "connections_open": sum(self._n_open.values()),
+                "waits_for_connection": self._counts["waits_for_connection"],
+            }
+
+    def close(self) -> None:
+        """Closes all idle connections (connections in use are closed when they are released)"""
+        with self._condition:
+            for host_key, idle_connections in self._idle.items():
+                for connection, _ in idle_connections:
+                    self._close_connection(host_key, connection)
+            self._idle.clear()
+            self._condition.notify_all()
+
+
+_DEFAULT_CONNECTION_POOL: Optional[HTTPConnectionPool] = None
+_DEFAULT_CONNECTION_POOL_LOCK = threading.Lock()
+
+
+def get_default_connection_pool() -> HTTPConnectionPool:
+    """Returns the module-level HTTPConnectionPool used by make_url_request(), creating it on first use"""
+    global _DEFAULT_CONNECTION_POOL  # pylint: disable=global-statement
+    with _DEFAULT_CONNECTION_POOL_LOCK:
+        if _DEFAULT_CONNECTION_POOL is None:
+            # (no limit per host, since callers never waited for a connection before the pool) #
+            _DEFAULT_CONNECTION_POOL = HTTPConnectionPool(max_connections_per_host=None)
+        return _DEFAULT_CONNECTION_POOL
+
+
+def _forget_default_connection_pool() -> None:
+    """Gives a forked child process its own default pool (rather than sharing the parent's sockets)"""
+    global _DEFAULT_CONNECTION_POOL, _DEFAULT_CONNECTION_POOL_LOCK  # pylint: disable=global-statement
+    _DEFAULT_CONNECTION_POOL = None
+    _DEFAULT_CONNECTION_POOL_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_default_connection_pool)
+
+
+@atexit.register
+def _close_default_connection_pool() -> None:
+    if _DEFAULT_CONNECTION_POOL is not None:
+        _DEFAULT_CONNECTION_POOL.close()
+
+
+if __name__ == "__main__":
+    # compare a new connection per request (urllib.request.urlopen) with pooled keep-alive connections,
+    #   for requests from 8 threads to a local HTTP/1.1 server
+    import concurrent.futures
+    import http.server
+
+    class _OkHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # (otherwise the body waits for the client's delayed ACK of the headers, as real servers avoid) #
+        disable_nagle_algorithm = True
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            body = b'{"status": "ok"}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    URL = f"http://127.0.0.1:{server.server_port}/items"
+    N_REQUESTS = 3000
+
+    def new_connection_per_request(_) -> bytes:
+        with urllib.request.urlopen(URL, timeout=10) as url_response:
+            return url_response.read()
+
+    benchmark_pool = HTTPConnectionPool(max_connections_per_host=8)
+
+    def pooled_request(_) -> bytes:
+        return benchmark_pool.urlopen(urllib.request.Request(URL), timeout=10)[1]
+
+    for method_name, request_func in (
+        ("new connection per request", new_connection_per_request),
+        ("keep-alive connection pool", pooled_request),
+    ):
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(request_func, range(N_REQUESTS)))
+        elapsed_seconds = time.perf_counter() - start_time
+        print(f"{method_name}: {N_REQUESTS/elapsed_seconds:,.0f} requests per second")
+    print(benchmark_pool.stats())
@@ -1,5 +1,10 @@
 import urllib.request
 
+from joes_giant_toolbox.all.http_connection_pool import (
+    HTTPConnectionPool,
+    get_default_connection_pool,
+)
+
 
 def make_url_request(
     url: str,
@@ -7,6 +12,7 @@ def make_url_request(
     timeout: int = 10,
     decode_format: str = None,
     max_bytes: int = None,
+    connection_pool: HTTPConnectionPool = None,
 ) -> dict:
     """A convenience function for making API requests using the urllib library
 
@@ -20,7 +26,7 @@ def make_url_request(
         Headers to include in the request
     timeout: int = 10
         Timeout (in seconds) for blocking operations like the connection attempt
-        This parameter is passed directly to the urllib.request.urlopen() function
+        This parameter is passed directly to the connection (as in the urllib.request.urlopen() function)
         From urllib documentation: if not specified, the global default timeout setting will be used. This actually only works for HTTP, HTTPS and FTP connections.
     decode_format: str = None, optional
         Format to encode the returned result string to
@@ -29,6 +35,9 @@ def make_url_request(
     max_bytes: int = None, optional
         Limits the returned result to the first [max_bytes] bytes
         (can be used to deal with large websites)
+    connection_pool: HTTPConnectionPool = None, optional
+        Pool of keep-alive connections to make the request on, so that repeated requests to the same
+        host reuse their connection (by default, a pool shared by all calls in the process is used)
 
     Returns
     -------
@@ -83,16 +92,14 @@ def make_url_request(
     }
     """
     request = urllib.request.Request(url, headers=headers or {})
+    if connection_pool is None:
+        connection_pool = get_default_connection_pool()
     try:
-        if max_bytes is None:
-            with urllib.request.urlopen(request, timeout=timeout) as url_response:
-                returned_content = url_response.read()
-        else:
-            with urllib.request.urlopen(request, timeout=timeout) as url_response:
-                returned_content = url_response.read(max_bytes)
+        response_status_code, returned_content = connection_pool.urlopen(
+            request, timeout=timeout, max_bytes=max_bytes
+        )
         if decode_format is not None:
             returned_content = returned_content.decode("utf-8")
-        response_status_code = url_response.status
         status_desc = "success"
     except urllib.error.HTTPError as error:
         returned_content = None
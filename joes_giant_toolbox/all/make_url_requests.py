@@ -0,0 +1,256 @@
+"""
+Defines the function make_url_requests
+"""
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import urllib.parse
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Set, Tuple
+
+from joes_giant_toolbox.all.http_connection_pool import HTTPConnectionPool
+from joes_giant_toolbox.all.make_url_request import make_url_request
+
+
+def _request_or_error_dict(url: str, **kwargs) -> dict:
+    """make_url_request(), also returning a dict (rather than raising) for URLs which cannot be
+    requested at all (e.g. "www.example.com", which has no scheme)"""
+    try:
+        return make_url_request(url, **kwargs)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        return {
+            "returned_content": None,
+            "response_status_code": None,
+            "status_desc": error,
+        }
+
+
+async def make_url_requests(  # pylint: disable=too-many-arguments, too-many-locals
+    urls: Iterable[str],
+    max_concurrency: int = 50,
+    per_host_limit: int = 6,
+    timeout: float = 10,
+    headers: dict = None,
+    decode_format: str = None,
+    max_bytes: int = None,
+    ordered: bool = False,
+    connection_pool: HTTPConnectionPool = None,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Requests many URLs concurrently, yielding (url, response) pairs as the responses arrive, where
+    each response is the dictionary returned by make_url_request()
+
+    Requests are scheduled with asyncio: at most [max_concurrency] requests are in progress at once,
+    and at most [per_host_limit] to any 1 host. Hosts take turns, so that a long list of URLs on 1
+    host does not hold up the URLs on other hosts. The requests themselves are made by
+    make_url_request() on a pool of [max_concurrency] threads, reusing keep-alive connections
+
+    Parameters
+    ----------
+    urls: Iterable[str]
+        The URLs to request (duplicates are requested again)
+    max_concurrency: int = 50
+        Maximum number of requests in progress at once (in total)
+    per_host_limit: int = 6
+        Maximum number of requests in progress at once to the same host (scheme + host + port)
+    timeout: float = 10
+        Time (in seconds) allowed for each whole request, after which its response is
+        {"returned_content": None, "response_status_code": None, "status_desc": "request timed out"}
+        (also passed to make_url_request() as its socket timeout). A request which times out keeps
+        its place in the concurrency limits until its thread has actually stopped
+    headers: dict, optional
+        Headers to include in every request, passed to make_url_request()
+    decode_format: str, optional
+        Passed to make_url_request()
+    max_bytes: int, optional
+        Passed to make_url_request()
+    ordered: bool = False
+        If False, responses are yielded as they arrive
+        If True, responses are yielded in the order of [urls] (each as soon as all earlier ones have
+        been yielded)
+    connection_pool: HTTPConnectionPool, optional
+        Pool of keep-alive connections to use (by default, a new pool with [per_host_limit]
+        connections per host is used, and closed at the end)
+
+    Yields
+    ------
+    (str, dict)
+        (url, response) where response is the dictionary returned by make_url_request(). A URL which
+        cannot be requested at all (e.g. it has no scheme) gets response_status_code=None and the
+        error as its status_desc, rather than stopping the other requests
+
+    Example Usage
+    -------------
+    >>> async def fetch_product_pages(urls):
+    ...     async for url, response in make_url_requests(
+    ...         urls, max_concurrency=100, per_host_limit=8, timeout=5, decode_format="utf-8"
+    ...     ):
+    ...         if response["response_status_code"] == 200:
+    ...             save_page(url, response["returned_content"])
+    >>> asyncio.run(fetch_product_pages(product_urls))
+    >>> async def fetch_in_order(urls):
+    ...     return [response async for _, response in make_url_requests(urls, ordered=True)]
+    >>> responses = asyncio.run(fetch_in_order(["https://example.com", "https://example.org"]))
+    >>> responses[0]
+    {'returned_content': b'<!doctype html>\\n<html>\\n<head>\\n ...', 'response_status_code': 200, 'status_desc': 'success'}
+    """
+    if max_concurrency < 1 or per_host_limit < 1:
+        raise ValueError(
+            "`max_concurrency` and `per_host_limit` must be positive integers"
+        )
+    own_connection_pool: bool = connection_pool is None
+    if own_connection_pool:
+        connection_pool = HTTPConnectionPool(max_connections_per_host=per_host_limit)
+    request_func = functools.partial(
+        _request_or_error_dict,
+        headers=headers,
+        timeout=timeout,
+        decode_format=decode_format,
+        max_bytes=max_bytes,
+        connection_pool=connection_pool,
+    )
+
+    # queue the URLs per host #
+    urls = list(urls)
+    queued_per_host: Dict[str, Deque[int]] = collections.defaultdict(collections.deque)
+    for url_idx, url in enumerate(urls):
+        url_parts = urllib.parse.urlsplit(url)
+        queued_per_host[f"{url_parts.scheme}://{url_parts.netloc.lower()}"].append(
+            url_idx
+        )
+    # hosts with queued URLs and fewer than [per_host_limit] requests in progress, taking turns #
+    ready_hosts: Deque[str] = collections.deque(queued_per_host)
+    ready_hosts_set: Set[str] = set(ready_hosts)
+    in_progress_per_host: collections.Counter = collections.Counter()
+    n_in_progress: int = 0
+
+    loop = asyncio.get_running_loop()
+    completed: asyncio.Queue = asyncio.Queue()
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="make_url_requests"
+    )
+
+    waiting_tasks: Set[asyncio.Task] = set()
+    stopped: bool = False
+
+    async def wait_for_response(url_idx: int, request_future: asyncio.Future) -> None:
+        try:
+            response: dict = await asyncio.wait_for(
+                asyncio.shield(request_future), timeout
+            )
+        except asyncio.TimeoutError:
+            response = {
+                "returned_content": None,
+                "response_status_code": None,
+                "status_desc": "request timed out",
+            }
+        completed.put_nowait((url_idx, response))
+
+    def on_request_finished(host: str, _: asyncio.Future) -> None:
+        """Frees the request's place in the concurrency limits (once its thread has finished)"""
+        nonlocal n_in_progress
+        if stopped:
+            return
+        n_in_progress -= 1
+        in_progress_per_host[host] -= 1
+        if queued_per_host[host] and host not in ready_hosts_set:
+            ready_hosts.append(host)
+            ready_hosts_set.add(host)
+        start_requests()
+
+    def start_requests() -> None:
+        nonlocal n_in_progress
+        while n_in_progress < max_concurrency and ready_hosts:
+            host: str = ready_hosts.popleft()
+            url_idx: int = queued_per_host[host].popleft()
+            in_progress_per_host[host] += 1
+            n_in_progress += 1
+            request_future: asyncio.Future = loop.run_in_executor(
+                executor, request_func, urls[url_idx]
+            )
+            request_future.add_done_callback(
+                functools.partial(on_request_finished, host)
+            )
+            waiting_task: asyncio.Task = loop.create_task(
+                wait_for_response(url_idx, request_future)
+            )
+            waiting_tasks.add(waiting_task)
+            waiting_task.add_done_callback(waiting_tasks.discard)
+            if queued_per_host[host] and in_progress_per_host[host] < per_host_limit:
+                ready_hosts.append(host)
+            else:
+                ready_hosts_set.discard(host)
+
+    next_idx_to_yield: int = 0
+    waiting_to_yield: Dict[int, dict] = {}
+    try:
+        start_requests()
+        for _ in range(len(urls)):
+            url_idx, response = await completed.get()
+            if not ordered:
+                yield urls[url_idx], response
+                continue
+            waiting_to_yield[url_idx] = response
+            while next_idx_to_yield in waiting_to_yield:
+                yield urls[next_idx_to_yield], waiting_to_yield.pop(next_idx_to_yield)
+                next_idx_to_yield += 1
+    finally:
+        stopped = True
+        for waiting_task in list(waiting_tasks):
+            waiting_task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if own_connection_pool:
+            connection_pool.close()
+
+
+if __name__ == "__main__":
+    # compare fetching URLs from 4 local HTTP servers (each taking 20ms per response) one at a time
+    #   with make_url_request(), with fetching them concurrently with make_url_requests()
+    import http.server
+    import threading
+    import time
+
+    class _SlowHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            time.sleep(0.02)  # (e.g. a database query)
+            body = f'{{"path": "{self.path}"}}'.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    SERVER_URLS: List[str] = []
+    for _ in range(4):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        SERVER_URLS.append(f"http://127.0.0.1:{server.server_port}")
+    N_URLS = 2000
+    URLS = [f"{SERVER_URLS[x % 4]}/items/{x}" for x in range(N_URLS)]
+
+    start_time = time.perf_counter()
+    for url in URLS[:200]:
+        make_url_request(url)
+    print(
+        f"make_url_request() one at a time: {200/(time.perf_counter()-start_time):,.0f} URLs per second"
+    )
+
+    async def fetch_all(**kwargs) -> List[Tuple[str, dict]]:
+        return [x async for x in make_url_requests(URLS, **kwargs)]
+
+    for max_concurrency, per_host_limit in ((16, 4), (64, 16), (128, 32)):
+        start_time = time.perf_counter()
+        results = asyncio.run(
+            fetch_all(max_concurrency=max_concurrency, per_host_limit=per_host_limit)
+        )
+        elapsed_seconds = time.perf_counter() - start_time
+        n_success = sum(x[1]["status_desc"] == "success" for x in results)
+        print(
+            f"make_url_requests(max_concurrency={max_concurrency}, per_host_limit={per_host_limit}):",
+            f"{N_URLS/elapsed_seconds:,.0f} URLs per second ({n_success:,} successful)",
+        )
@@ -0,0 +1,424 @@
+"""
+This script defines the class MultiHostCoordinator and the function run_multi_host_worker()
+
+These implement parallel_method='multi_host' of run_python_function_in_parallel(): the coordinator
+(run within the calling python process) hands out tasks over TCP to worker processes on any number of
+machines, each of which runs run_multi_host_worker()
+
+Protocol (pickled python tuples over an authenticated multiprocessing.connection):
+    worker -> ("register", worker_name)                     <- ("registered", worker_id, func, heartbeat_seconds)
+    worker -> ("lease", worker_id)                          <- ("task", task_id, inputs) | ("wait", seconds) | ("stop",)
+    worker -> ("result", worker_id, task_id, outcomes)      <- ("ack",)
+    worker -> ("heartbeat", worker_id)                      <- ("ack",)
+
+A leased task is given back to the queue (and re-dispatched to another worker) if the connection of the
+worker holding it is lost, or if the worker sends no heartbeat for [lease_timeout_seconds]
+"""
+
+import collections
+import os
+import pickle
+import socket
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing import AuthenticationError
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from joes_giant_toolbox.custom_logging import get_logger
+
+_LOGGER = get_logger(__name__)
+
+
+class MultiHostCoordinator:
+    """Serves tasks (chunks of inputs to [func]) to remote workers, re-dispatching the tasks of workers
+    which are lost, and collects the results
+
+    Example Usage
+    -------------
+    >>> # on the coordinating machine #
+    >>> with MultiHostCoordinator(
+    ...     func=score_document,            # must be importable by the workers (defined in a module)
+    ...     inputs=documents,
+    ...     task_input_indices=[[0, 1], [2, 3], [4]],
+    ...     address=("0.0.0.0", 50_000),
+    ...     authkey=b"a long random secret",
+    ... ) as coordinator:
+    ...     scores = list(coordinator.results())
+    >>> # on each worker machine (1 process per core) #
+    >>> run_multi_host_worker(address=("coordinator.internal", 50_000), authkey=b"a long random secret")
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        inputs: Tuple[Any, ...],
+        task_input_indices: List[List[int]],
+        address: Tuple[str, int],
+        authkey: bytes,
+        lease_timeout_seconds: float = 30.0,
+        idle_timeout_seconds: Optional[float] = 600.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        func: Callable
+            The function to run on each input (it is pickled by reference, so it must be importable by
+            the workers e.g. defined at the top level of a module installed on every machine)
+        inputs: tuple
+            The inputs to [func]
+        task_input_indices: list of list of int
+            The positions (within [inputs]) of the inputs making up each task, in the order in which the
+            tasks should be handed out
+        address: tuple
+            The (host, port) to listen on for workers
+        authkey: bytes
+            Secret shared with the workers (connections which do not know it are refused)
+        lease_timeout_seconds: float, optional (default: 30.0)
+            A task is re-dispatched if the worker holding it has sent no heartbeat for this long
+        idle_timeout_seconds: float, optional (default: 600.0)
+            outcomes() (and results()) raise a TimeoutError if no worker has contacted the coordinator
+            for this long while results are still missing (None means wait forever). Working workers
+            send heartbeats, so this only happens if no workers are running
+        """
+        self.func = func
+        self.inputs = inputs
+        self.lease_timeout_seconds = lease_timeout_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._task_input_indices = task_input_indices
+        self._pending_tasks: Deque[int] = collections.deque(
+            range(len(task_input_indices))
+        )
+        # task_id -> (worker_id, lease expiry time) #
+        self._leases: Dict[int, Tuple[int, float]] = {}
+        self._completed_tasks: set = set()
+        # (task_id, outcomes) of completed tasks, not yet taken by results() #
+        self._unread_outcomes: Deque[
+            Tuple[int, List[Tuple[bool, Any]]]
+        ] = collections.deque()
+        self._worker_names: Dict[int, str] = {}
+        self._next_worker_id: int = 0
+        self._condition = threading.Condition()
+        self._is_closed: bool = False
+        self._last_worker_message_time: float = time.monotonic()
+        self._listener = Listener(address, authkey=authkey)
+        self.address: Tuple[str, int] = self._listener.address
+        self._accept_thread = threading.Thread(
+            target=self._accept_workers, name="multi_host_accept", daemon=True
+        )
+        self._accept_thread.start()
+        _LOGGER.info("waiting for workers on %s", self.address)
+
+    def _accept_workers(self) -> None:
+        while not self._is_closed:
+            try:
+                connection: Connection = self._listener.accept()
+            except AuthenticationError:
+                _LOGGER.warning("refused a worker connection (wrong authkey)")
+                continue
+            except (EOFError, ConnectionError):
+                continue  # the connection was dropped during the handshake
+            except OSError:
+                return  # the listener was closed
+            threading.Thread(
+                target=self._serve_worker,
+                args=(connection,),
+                name="multi_host_worker_connection",
+                daemon=True,
+            ).start()
+
+    def _serve_worker(self, connection: Connection) -> None:
+        """Answers the requests of 1 worker, until it disconnects"""
+        worker_id: Optional[int] = None
+        try:
+            while True:
+                message: tuple = connection.recv()
+                with self._condition:
+                    self._last_worker_message_time = time.monotonic()
+                    if message[0] == "register":
+                        worker_id = self._next_worker_id
+                        self._next_worker_id += 1
+                        self._worker_names[worker_id] = message[1]
+                        _LOGGER.info("worker %s registered (%s)", worker_id, message[1])
+                        reply: tuple = (
+                            "registered",
+                            worker_id,
+                            self.func,
+                            self.lease_timeout_seconds / 3,
+                        )
+                    elif message[0] == "lease":
+                        reply = self._lease_task(message[1])
+                    elif message[0] == "result":
+                        self._record_outcomes(*message[1:])
+                        reply = ("ack",)
+                    elif message[0] == "heartbeat":
+                        self._renew_leases(message[1])
+                        reply = ("ack",)
+                    else:
+                        raise ValueError(f"unknown message type '{message[0]}'")
+                connection.send(reply)
+        except (EOFError, OSError):
+            pass  # the worker disconnected
+        finally:
+            connection.close()
+            if worker_id is not None:
+                with self._condition:
+                    self._release_leases(worker_id, reason="disconnected")
+
+    def _lease_task(self, worker_id: int) -> tuple:
+        """Hands the next pending task to a worker (requires self._condition)"""
+        if self._is_closed or len(self._completed_tasks) == len(
+            self._task_input_indices
+        ):
+            return ("stop",)
+        self._requeue_expired_leases()
+        if not self._pending_tasks:
+            # every remaining task is leased: check back in case one of them is lost #
+            return ("wait", min(1.0, self.lease_timeout_seconds / 3))
+        task_id: int = self._pending_tasks.popleft()
+        self._leases[task_id] = (
+            worker_id,
+            time.monotonic() + self.lease_timeout_seconds,
+        )
+        return (
+            "task",
+            task_id,
+            [self.inputs[input_idx] for input_idx in self._task_input_indices[task_id]],
+        )
+
+    def _record_outcomes(
+        self, worker_id: int, task_id: int, outcomes: List[Tuple[bool, Any]]
+    ) -> None:
+        """Stores the (succeeded, result or exception) of each input of a task (requires self._condition)"""
+        self._leases.pop(task_id, None)
+        if (
+            task_id not in self._completed_tasks
+        ):  # (a re-dispatched task may be completed twice)
+            self._completed_tasks.add(task_id)
+            self._unread_outcomes.append((task_id, outcomes))
+            self._condition.notify_all()
+
+    def _renew_leases(self, worker_id: int) -> None:
+        """Extends the leases of every task held by a worker (requires self._condition)"""
+        new_expiry: float = time.monotonic() + self.lease_timeout_seconds
+        for task_id, (lease_worker_id, _) in self._leases.items():
+            if lease_worker_id == worker_id:
+                self._leases[task_id] = (worker_id, new_expiry)
+
+    def _release_leases(self, worker_id: int, reason: str) -> None:
+        """Puts the tasks held by a worker back at the front of the queue (requires self._condition)"""
+        for task_id in [
+            task_id
+            for task_id, (lease_worker_id, _) in self._leases.items()
+            if lease_worker_id == worker_id
+        ]:
+            del self._leases[task_id]
+            if task_id not in self._completed_tasks:
+                _LOGGER.warning(
+                    "re-dispatching task %s (worker %s %s)", task_id, worker_id, reason
+                )
+                self._pending_tasks.appendleft(task_id)
+
+    def _requeue_expired_leases(self) -> None:
+        """(requires self._condition)"""
+        now: float = time.monotonic()
+        for worker_id in {
+            lease_worker_id
+            for lease_worker_id, expiry_time in self._leases.values()
+            if expiry_time < now
+        }:
+            self._release_leases(worker_id, reason="stopped sending heartbeats")
+
+    def _raise_if_abandoned(self) -> None:
+        """Raises if results are being waited for which can never arrive (requires self._condition)"""
+        if self._is_closed:
+            raise RuntimeError(
+                "the coordinator was closed before all of the results arrived"
+            )
+        idle_seconds: float = time.monotonic() - self._last_worker_message_time
+        if (
+            self.idle_timeout_seconds is not None
+            and idle_seconds >= self.idle_timeout_seconds
+        ):
+            raise TimeoutError(
+                f"no worker has contacted the coordinator on {self.address} for {idle_seconds:.0f} seconds "
+                f"({len(self._completed_tasks)} of {len(self._task_input_indices)} tasks completed)"
+            )
+
+    def outcomes(self) -> Iterator[Tuple[bool, Any]]:
+        """Yields (succeeded, result or exception) for every input in input order (waiting for them as
+        necessary)
+
+        Raises a TimeoutError if no worker has contacted the coordinator for [idle_timeout_seconds],
+        and a RuntimeError if the coordinator is closed, while results are still missing"""
+        outcomes_by_input_idx: Dict[int, Tuple[bool, Any]] = {}
+        for next_input_idx in range(len(self.inputs)):
+            with self._condition:
+                while next_input_idx not in outcomes_by_input_idx:
+                    while self._unread_outcomes:
+                        task_id, task_outcomes = self._unread_outcomes.popleft()
+                        outcomes_by_input_idx.update(
+                            zip(self._task_input_indices[task_id], task_outcomes)
+                        )
+                    if next_input_idx not in outcomes_by_input_idx:
+                        self._raise_if_abandoned()
+                        self._requeue_expired_leases()
+                        self._condition.wait(timeout=1.0)
+            yield outcomes_by_input_idx.pop(next_input_idx)
+
+    def results(self) -> Iterator[Any]:
+        """Yields the result of every input in input order (waiting for them as necessary), raising the
+        exception of a failed input when it is reached"""
+        for succeeded, result in self.outcomes():
+            if not succeeded:
+                raise result
+            yield result
+
+    def close(self) -> None:
+        """Stops serving tasks (workers are told to stop at their next request)"""
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
+        self._listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _connect(
+    address: Tuple[str, int], authkey: bytes, connect_timeout_seconds: float
+) -> Connection:
+    """Connects to a coordinator, retrying until it is available (or [connect_timeout_seconds] passes)"""
+    give_up_time: float = time.monotonic() + connect_timeout_seconds
+    while True:
+        try:
+            return Client(address, authkey=authkey)
+        except (ConnectionRefusedError, FileNotFoundError, socket.timeout):
+            if time.monotonic() > give_up_time:
+                raise
+            time.sleep(0.2)
+
+
+def _run_inputs(func: Callable, inputs: List[Any]) -> List[Tuple[bool, Any]]:
+    """Returns (succeeded, result or exception) for each input"""
+    outcomes: List[Tuple[bool, Any]] = []
+    for x in inputs:
+        try:
+            outcomes.append((True, func(x)))
+        except Exception as error:  # pylint: disable=broad-except
+            outcomes.append((False, error))
+    return outcomes
+
+
+def run_multi_host_worker(
+    address: Tuple[str, int],
+    authkey: bytes,
+    connect_timeout_seconds: float = 60.0,
+    worker_name: Optional[str] = None,
+) -> int:
+    """Runs tasks handed out by a coordinator (a call to run_python_function_in_parallel() with
+    parallel_method='multi_host') until it has no more tasks, then returns
+
+    Each call runs 1 task at a time, so start 1 worker process per core that you want to use (on as many
+    machines as you like). Workers may be started before or after the coordinator, and may join or leave
+    at any time. Can also be run from the command line:
+        python -m joes_giant_toolbox.all.multi_host --host coordinator.internal --port 50000 --authkey secret
+
+    Parameters
+    ----------
+    address: tuple
+        The (host, port) of the coordinator
+    authkey: bytes
+        The secret given to the coordinator
+    connect_timeout_seconds: float, optional (default: 60.0)
+        How long to keep retrying to connect while the coordinator is not (yet) listening
+    worker_name: str, optional
+        Name shown in the coordinator's logs (defaults to "<hostname>:<process ID>")
+
+    Returns
+    -------
+    int
+        The number of tasks completed by this worker
+
+    Example Usage
+    -------------
+    >>> import multiprocessing
+    >>> for _ in range(multiprocessing.cpu_count()):
+    ...     multiprocessing.Process(
+    ...         target=run_multi_host_worker,
+    ...         args=(("coordinator.internal", 50_000), b"a long random secret"),
+    ...     ).start()
+    """
+    connection: Connection = _connect(address, authkey, connect_timeout_seconds)
+    connection_lock = threading.Lock()
+
+    def request(message: tuple) -> tuple:
+        with connection_lock:
+            connection.send(message)
+            return connection.recv()
+
+    stop_heartbeat = threading.Event()
+    n_tasks_completed: int = 0
+    try:
+        _, worker_id, func, heartbeat_seconds = request(
+            ("register", worker_name or f"{socket.gethostname()}:{os.getpid()}")
+        )
+
+        def send_heartbeats() -> None:
+            while not stop_heartbeat.wait(heartbeat_seconds):
+                try:
+                    request(("heartbeat", worker_id))
+                except (EOFError, OSError):
+                    return
+
+        threading.Thread(target=send_heartbeats, daemon=True).start()
+        while True:
+            reply: tuple = request(("lease", worker_id))
+            if reply[0] == "stop":
+                break
+            if reply[0] == "wait":
+                time.sleep(reply[1])
+                continue
+            _, task_id, task_inputs = reply
+            outcomes: List[Tuple[bool, Any]] = _run_inputs(func, task_inputs)
+            try:
+                request(("result", worker_id, task_id, outcomes))
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                # (a result or exception which cannot be pickled) #
+                request(
+                    (
+                        "result",
+                        worker_id,
+                        task_id,
+                        [(False, RuntimeError(f"could not send result: {error!r}"))]
+                        * len(task_inputs),
+                    )
+                )
+            n_tasks_completed += 1
+    except (EOFError, OSError):
+        pass  # the coordinator has gone away
+    finally:
+        stop_heartbeat.set()
+        connection.close()
+    return n_tasks_completed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        description="Runs a worker for run_python_function_in_parallel(parallel_method='multi_host')"
+    )
+    arg_parser.add_argument("--host", required=True)
+    arg_parser.add_argument("--port", required=True, type=int)
+    arg_parser.add_argument("--authkey", required=True)
+    arg_parser.add_argument("--connect_timeout_seconds", type=float, default=60.0)
+    args = arg_parser.parse_args()
+    run_multi_host_worker(
+        address=(args.host, args.port),
+        authkey=args.authkey.encode("utf-8"),
+        connect_timeout_seconds=args.connect_timeout_seconds,
+    )
@@ -0,0 +1,251 @@
+"""
+This script defines the class ParallelRunTelemetry
+"""
+
+import collections
+import json
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TaskTelemetry = collections.namedtuple(
+    "TaskTelemetry",
+    [
+        "input_idx",  # position of the input in input_tuple
+        "worker_id",  # "<process ID>:<thread ID>" of the worker which ran the task
+        "submitted_at",  # unix time at which the task was sent to the workers
+        "started_at",  # unix time at which a worker started running the task
+        "finished_at",  # unix time at which the worker finished running the task
+        "queue_wait_seconds",  # time from submission until a worker started the task
+        "wall_seconds",  # time the worker spent running the task
+        "cpu_seconds",  # CPU time used by the worker thread while running the task
+        "input_bytes",  # size of the pickled input (None unless parallel_method='multi_core')
+        "result_bytes",  # size of the pickled result (None unless parallel_method='multi_core')
+        "serialization_seconds",  # time spent measuring the pickled input and result (a proxy for the pickling overhead)
+    ],
+)
+
+
+class _TimedCall:
+    """Wraps a function taking x so that it takes a task stamped by ParallelRunTelemetry, and returns
+    (measurements, result)
+    (a class rather than a closure, so that it can be pickled and sent to worker processes)"""
+
+    def __init__(self, func: Callable, measure_serialization: bool) -> None:
+        self.func = func
+        self.measure_serialization = measure_serialization
+
+    def __call__(self, stamped_x: Tuple) -> Tuple[Tuple, Any]:
+        (
+            input_idx,
+            submitted_at,
+            input_bytes,
+            input_serialization_seconds,
+            x,
+        ) = stamped_x
+        started_at: float = time.time()
+        cpu_start: float = time.thread_time()
+        result: Any = self.func(x)
+        cpu_seconds: float = time.thread_time() - cpu_start
+        finished_at: float = time.time()
+        result_bytes: Optional[int] = None
+        serialization_seconds: Optional[float] = None
+        if self.measure_serialization:
+            serialization_start: float = time.perf_counter()
+            result_bytes = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            serialization_seconds = input_serialization_seconds + (
+                time.perf_counter() - serialization_start
+            )
+        return (
+            (
+                input_idx,
+                f"{os.getpid()}:{threading.get_native_id()}",
+                submitted_at,
+                started_at,
+                finished_at,
+                started_at - submitted_at,
+                finished_at - started_at,
+                cpu_seconds,
+                input_bytes,
+                result_bytes,
+                serialization_seconds,
+            ),
+            result,
+        )
+
+
+class ParallelRunTelemetry:
+    """Collects execution statistics of a run of run_python_function_in_parallel() (pass it as the
+    [telemetry] argument): the wall time, CPU time, queue wait, worker and pickled sizes of every task,
+    throughput over time and the overall utilisation of the workers
+
+    A TaskTelemetry record is added (and passed to [on_task_complete], if given) as each result is
+    consumed from the iterator returned by run_python_function_in_parallel()
+
+    Example Usage
+    -------------
+    >>> telemetry = ParallelRunTelemetry()
+    >>> results = list(
+    ...     run_python_function_in_parallel(
+    ...         func=parse_document,
+    ...         input_tuple=documents,
+    ...         parallel_method="multi_core",
+    ...         verbose=False,
+    ...         telemetry=telemetry,
+    ...     )
+    ... )
+    >>> telemetry.summary()
+    {'n_tasks': 5000, 'n_workers': 8, 'elapsed_seconds': 41.2, 'tasks_per_second': 121.4,
+     'worker_utilisation': 0.93, 'mean_queue_wait_seconds': 19.8, 'max_wall_seconds': 3.9, ...}
+    >>> telemetry.to_pandas().sort_values("wall_seconds").tail()     # the stragglers
+    >>> telemetry.throughput(bucket_seconds=5.0)
+    [(0.0, 98.2), (5.0, 131.0), ...]
+    >>> # or watch tasks as they complete #
+    >>> ParallelRunTelemetry(on_task_complete=lambda task: print(task.worker_id, task.wall_seconds))
+
+    run_python_function_in_parallel() records a run using start_run(), stamp(), wrap() and
+    collected_results() (in that order), which can also be used to measure other executors
+    """
+
+    def __init__(
+        self, on_task_complete: Optional[Callable[[TaskTelemetry], None]] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        on_task_complete: Callable, optional
+            Function called with the TaskTelemetry of each task, as its result is consumed
+        """
+        self.on_task_complete = on_task_complete
+        self.tasks: List[TaskTelemetry] = []
+        self.parallel_method: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def start_run(self, parallel_method: str) -> None:
+        """Called at the start of a run (the pickled sizes of inputs and results are only measured
+        when parallel_method='multi_core')"""
+        self.parallel_method = parallel_method
+
+    def stamp(self, input_idx: int, x: Any) -> Tuple:
+        """Labels an input with its position and submission time (and measures its pickled size),
+        as it is submitted to the workers"""
+        input_bytes: Optional[int] = None
+        serialization_seconds: float = 0.0
+        if self.parallel_method == "multi_core":
+            serialization_start: float = time.perf_counter()
+            input_bytes = len(pickle.dumps(x, protocol=pickle.HIGHEST_PROTOCOL))
+            serialization_seconds = time.perf_counter() - serialization_start
+        return (
+            input_idx,
+            time.time(),
+            input_bytes,
+            serialization_seconds,
+            x,
+        )
+
+    def wrap(self, func: Callable) -> Callable:
+        """Wraps [func] (the function run by the workers) so that it takes stamped inputs and returns
+        (measurements, result)"""
+        return _TimedCall(func, self.parallel_method == "multi_core")
+
+    def collected_results(
+        self, measured_results: Iterator[Tuple[Tuple, Any]]
+    ) -> Iterator[Any]:
+        """Yields the result of each (measurements, result) returned by the wrapped function,
+        recording the measurements as each result is consumed"""
+        try:
+            for measured_result in measured_results:
+                yield self._collect(measured_result)
+        finally:
+            if hasattr(measured_results, "close"):
+                measured_results.close()
+
+    def _collect(self, measured_result: Tuple[Tuple, Any]) -> Any:
+        """Records the measurements returned by a worker, and returns the result"""
+        measurements, result = measured_result
+        task = TaskTelemetry(*measurements)
+        with self._lock:
+            self.tasks.append(task)
+        if self.on_task_complete is not None:
+            self.on_task_complete(task)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns overall statistics of the tasks recorded so far"""
+        if not self.tasks:
+            return {"n_tasks": 0}
+        n_tasks: int = len(self.tasks)
+        n_workers: int = len({task.worker_id for task in self.tasks})
+        elapsed_seconds: float = max(task.finished_at for task in self.tasks) - min(
+            task.submitted_at for task in self.tasks
+        )
+        total_wall_seconds: float = sum(task.wall_seconds for task in self.tasks)
+        summary: Dict[str, Any] = {
+            "parallel_method": self.parallel_method,
+            "n_tasks": n_tasks,
+            "n_workers": n_workers,
+            "elapsed_seconds": elapsed_seconds,
+            "tasks_per_second": n_tasks / elapsed_seconds if elapsed_seconds else None,
+            # fraction of the elapsed time that the workers spent running tasks #
+            "worker_utilisation": total_wall_seconds / (n_workers * elapsed_seconds)
+            if elapsed_seconds
+            else None,
+            "total_wall_seconds": total_wall_seconds,
+            "total_cpu_seconds": sum(task.cpu_seconds for task in self.tasks),
+            "mean_wall_seconds": total_wall_seconds / n_tasks,
+            "max_wall_seconds": max(task.wall_seconds for task in self.tasks),
+            "mean_queue_wait_seconds": sum(
+                task.queue_wait_seconds for task in self.tasks
+            )
+            / n_tasks,
+            "max_queue_wait_seconds": max(
+                task.queue_wait_seconds for task in self.tasks
+            ),
+            "tasks_per_worker": dict(
+                collections.Counter(task.worker_id for task in self.tasks)
+            ),
+        }
+        if self.parallel_method == "multi_core":
+            summary["total_input_bytes"] = sum(task.input_bytes for task in self.tasks)
+            summary["total_result_bytes"] = sum(
+                task.result_bytes for task in self.tasks
+            )
+            summary["total_serialization_seconds"] = sum(
+                task.serialization_seconds for task in self.tasks
+            )
+        return summary
+
+    def throughput(self, bucket_seconds: float = 1.0) -> List[Tuple[float, float]]:
+        """Returns the number of tasks completed per second within consecutive time buckets, as
+        (seconds since the start of the run, tasks per second) pairs"""
+        if not self.tasks:
+            return []
+        run_start: float = min(task.submitted_at for task in self.tasks)
+        completed_per_bucket: collections.Counter = collections.Counter(
+            int((task.finished_at - run_start) // bucket_seconds) for task in self.tasks
+        )
+        return [
+            (
+                bucket_num * bucket_seconds,
+                completed_per_bucket[bucket_num] / bucket_seconds,
+            )
+            for bucket_num in range(max(completed_per_bucket) + 1)
+        ]
+
+    def to_json(self, **kwargs) -> str:
+        """Returns the summary and every task record as a JSON string (kwargs are passed to json.dumps())"""
+        return json.dumps(
+            {
+                "summary": self.summary(),
+                "tasks": [task._asdict() for task in self.tasks],
+            },
+            **kwargs,
+        )
+
+    def to_pandas(self):
+        """Returns the task records as a pandas.DataFrame (1 row per task)"""
+        import pandas as pd
+
+        return pd.DataFrame(self.tasks, columns=TaskTelemetry._fields)
@@ -0,0 +1,167 @@
+"""
+This script defines the class ParallelWorkerPool and the function get_default_worker_pool()
+"""
+
+import atexit
+import concurrent.futures
+import os
+import threading
+import time
+from multiprocessing import resource_tracker
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+PARALLEL_METHODS: Tuple[str, ...] = ("multi_core", "multi_thread")
+
+
+def _warm_up_worker(hold_seconds: float) -> Tuple[int, int]:
+    """Occupies a worker briefly (so that other tasks have to start other workers), and identifies it"""
+    time.sleep(hold_seconds)
+    return os.getpid(), threading.get_ident()
+
+
+class ParallelWorkerPool:
+    """A long-lived pool of worker processes or threads, which can be reused by many calls to
+    run_python_function_in_parallel() (avoiding the cost of starting workers, and of loading
+    expensive state in them, on every call)
+
+    Example Usage
+    -------------
+    >>> def load_model():
+    ...     global MODEL
+    ...     MODEL = expensive_model_load()     # runs once in each worker
+    >>> def predict(x):
+    ...     return MODEL.predict(x)
+    >>> with ParallelWorkerPool("multi_core", max_workers=4, initializer=load_model) as pool:
+    ...     for input_batch in many_input_batches:
+    ...         predictions = list(
+    ...             run_python_function_in_parallel(
+    ...                 func=predict,
+    ...                 input_tuple=input_batch,
+    ...                 parallel_method="multi_core",
+    ...                 verbose=False,
+    ...                 pool=pool,
+    ...             )
+    ...         )
+    >>> # or reuse a lazily created module-level pool (shut down automatically at exit) #
+    >>> run_python_function_in_parallel(..., parallel_method="multi_thread", pool="default")
+    """
+
+    def __init__(
+        self,
+        parallel_method: str,
+        max_workers: Optional[int] = None,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = (),
+        warm_up: bool = True,
+        **kwargs,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        parallel_method: str
+            The method to use for parallelisation: one of ['multi_core', 'multi_thread']
+        max_workers: int, optional
+            Number of workers (defaults to the default of the underlying concurrent.futures executor)
+        initializer: Callable, optional
+            A function run once in each worker when the worker starts (e.g. to load a model or compile
+            regexes into global variables). It must be picklable if parallel_method='multi_core'
+        initargs: tuple, optional
+            Arguments passed to [initializer]
+        warm_up: bool, optional (default: True)
+            If True, all of the workers are started (and have run [initializer]) before __init__ returns.
+            Otherwise, workers are started as tasks arrive
+        **kwargs
+            Additional keyword arguments to pass to concurrent.futures.ProcessPoolExecutor() or
+            concurrent.futures.ThreadPoolExecutor()
+        """
+        if parallel_method not in PARALLEL_METHODS:
+            raise ValueError(f"parallel_method must be one of {list(PARALLEL_METHODS)}")
+        self.parallel_method = parallel_method
+        if parallel_method == "multi_core" and os.name == "posix":
+            # forked workers share the resource tracker of this process only if it is already running
+            # (otherwise each worker starts its own, which would unlink the shared memory of
+            # SharedArrays attached to by the worker when the worker exits) #
+            resource_tracker.ensure_running()
+        executor_class = (
+            concurrent.futures.ProcessPoolExecutor
+            if parallel_method == "multi_core"
+            else concurrent.futures.ThreadPoolExecutor
+        )
+        self.executor: concurrent.futures.Executor = executor_class(
+            max_workers=max_workers,
+            initializer=initializer,
+            initargs=initargs,
+            **kwargs,
+        )
+        # both executor classes store their (possibly defaulted) number of workers here #
+        self.max_workers: int = self.executor._max_workers
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self, timeout_seconds: float = 60.0) -> int:
+        """Starts every worker of the pool (each of which runs the initializer), waiting until they are ready
+
+        Returns
+        -------
+        int
+            The number of distinct workers which responded
+        """
+        worker_ids: set = set()
+        hold_seconds: float = 0.01
+        give_up_time: float = time.monotonic() + timeout_seconds
+        while len(worker_ids) < self.max_workers and time.monotonic() < give_up_time:
+            worker_ids.update(
+                self.executor.map(_warm_up_worker, [hold_seconds] * self.max_workers)
+            )
+            hold_seconds = min(hold_seconds * 2, 1.0)
+        return len(worker_ids)
+
+    def submit(self, func: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Schedules func(*args, **kwargs) to run on a worker"""
+        return self.executor.submit(func, *args, **kwargs)
+
+    def map(self, func: Callable, iterable: Iterable, **kwargs) -> Iterator:
+        """Same as concurrent.futures.Executor.map(), run on the workers of this pool"""
+        return self.executor.map(func, iterable, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the workers (after they have finished their current tasks, if [wait] is True)"""
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(wait=True)
+
+
+_DEFAULT_WORKER_POOLS: Dict[str, ParallelWorkerPool] = {}
+_DEFAULT_WORKER_POOLS_LOCK = threading.Lock()
+
+
+def get_default_worker_pool(parallel_method: str) -> ParallelWorkerPool:
+    """Returns the module-level ParallelWorkerPool for [parallel_method], creating it on first use
+    (with the default number of workers). These pools are shut down automatically when python exits
+
+    Example Usage
+    -------------
+    >>> pool = get_default_worker_pool("multi_thread")
+    >>> pool is get_default_worker_pool("multi_thread")
+    True
+    """
+    if parallel_method not in PARALLEL_METHODS:
+        raise ValueError(f"parallel_method must be one of {list(PARALLEL_METHODS)}")
+    with _DEFAULT_WORKER_POOLS_LOCK:
+        if parallel_method not in _DEFAULT_WORKER_POOLS:
+            _DEFAULT_WORKER_POOLS[parallel_method] = ParallelWorkerPool(
+                parallel_method, warm_up=False
+            )
+        return _DEFAULT_WORKER_POOLS[parallel_method]
+
+
+@atexit.register
+def _shutdown_default_worker_pools() -> None:
+    with _DEFAULT_WORKER_POOLS_LOCK:
+        for worker_pool in _DEFAULT_WORKER_POOLS.values():
+            worker_pool.shutdown(wait=False)
+        _DEFAULT_WORKER_POOLS.clear()
@@ -0,0 +1,124 @@
+"""
+This script defines the class ResultCheckpoint
+"""
+
+import pickle
+import sqlite3
+import time
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+
+class ResultCheckpoint:
+    """An on-disk (SQLite) record of the results of completed tasks, keyed by their input index, so that
+    a long run which is interrupted (crash, preemption, Ctrl+C) can be restarted without redoing them
+
+    Results are pickled and written in batches (1 transaction per [commit_every] results, or per
+    [commit_interval_seconds], whichever comes first), so that the cost per task stays in microseconds.
+    At most the results of 1 uncommitted batch are lost if the process dies
+
+    Example Usage
+    -------------
+    >>> checkpoint = ResultCheckpoint("my_run.sqlite")
+    >>> completed_indices = checkpoint.completed_indices()
+    >>> for input_idx, x in enumerate(inputs):
+    ...     if input_idx not in completed_indices:
+    ...         checkpoint.record(input_idx, expensive_func(x))
+    >>> checkpoint.flush()
+    >>> results = list(checkpoint.stored_results())     # in input order
+    >>> checkpoint.close()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        commit_every: int = 1_000,
+        commit_interval_seconds: float = 5.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            Path of the SQLite database file (created if it does not exist)
+        commit_every: int, optional (default: 1_000)
+            Number of recorded results after which they are written to disk
+        commit_interval_seconds: float, optional (default: 5.0)
+            Recorded results are also written to disk once the oldest of them has waited this long
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval_seconds = commit_interval_seconds
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (input_idx INTEGER PRIMARY KEY, result BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self._uncommitted: List[Tuple[int, bytes]] = []
+        self._oldest_uncommitted_time: float = 0.0
+
+    def completed_indices(self) -> Set[int]:
+        """Returns the input indices whose results are stored"""
+        return {
+            row[0] for row in self._connection.execute("SELECT input_idx FROM results")
+        }
+
+    def record(self, input_idx: int, result: Any) -> None:
+        """Adds the result of input [input_idx] (written to disk with the rest of its batch)"""
+        if not self._uncommitted:
+            self._oldest_uncommitted_time = time.monotonic()
+        self._uncommitted.append(
+            (input_idx, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        if (
+            len(self._uncommitted) >= self.commit_every
+            or time.monotonic() - self._oldest_uncommitted_time
+            >= self.commit_interval_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes all recorded results to disk"""
+        if not self._uncommitted:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO results (input_idx, result) VALUES (?, ?)",
+                self._uncommitted,
+            )
+        self._uncommitted = []
+
+    def get(self, input_idx: int) -> Any:
+        """Returns the stored result of input [input_idx]"""
+        row = self._connection.execute(
+            "SELECT result FROM results WHERE input_idx = ?", (input_idx,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"no result stored for input {input_idx}")
+        return pickle.loads(row[0])
+
+    def stored_results(self, n_inputs: Optional[int] = None) -> Iterator[Any]:
+        """Yields every stored result (or those of the first [n_inputs] inputs), in input order (without
+        loading them all into memory at once)"""
+        self.flush()
+        cursor = self._connection.execute(
+            "SELECT result FROM results WHERE input_idx < ? ORDER BY input_idx",
+            (n_inputs if n_inputs is not None else float("inf"),),
+        )
+        while True:
+            rows = cursor.fetchmany(1_000)
+            if not rows:
+                return
+            for row in rows:
+                yield pickle.loads(row[0])
+
+    def close(self) -> None:
+        """Writes any remaining recorded results to disk, and closes the database"""
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
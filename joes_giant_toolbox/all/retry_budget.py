@@ -0,0 +1,137 @@
+"""
+Defines class RetryBudget
+"""
+import multiprocessing
+import time
+from typing import Dict
+
+# positions of the budget's state within its shared memory array #
+_BALANCE = 0  # retries currently available
+_BALANCE_UPDATED_AT = 1  # time.monotonic() of the last refill of the balance
+_BUCKET_TOKENS = 2  # tokens currently in the rate limiter's bucket
+_BUCKET_UPDATED_AT = 3  # time.monotonic() of the last refill of the bucket
+_N_SUCCESSES = 4
+_N_GRANTED = 5
+_N_DENIED_BUDGET = 6
+_N_DENIED_RATE_LIMIT = 7
+_STATE_SIZE = 8
+
+
+class RetryBudget:
+    """
+    A cap on the total retry traffic of many callers (threads, coroutines or processes), so that during
+    an outage retries do not multiply the load on the failing dependency
+
+    Every successful call earns `retry_ratio` retries (e.g. 0.1 means at most 1 retry per 10 successful
+    calls), and `min_retries_per_second` retries are earned over time regardless (so that callers can
+    still retry while there are no successful calls at all). At most `max_saved_retries` can be saved up.
+    Independently, a token bucket limits retries to `max_retries_per_second` (with bursts of up to
+    `max_burst`). A retry is granted only if both allow it
+
+    The state lives in shared memory, so 1 RetryBudget can be shared by threads, coroutines and by
+    child processes (pass it to them when they are created e.g. as a Process argument, or through the
+    initializer of a ProcessPoolExecutor / ParallelWorkerPool)
+
+    Example:
+        >>> search_api_budget = RetryBudget(retry_ratio=0.1, max_retries_per_second=20)
+        >>> retry_function_call(
+        ...     search_api,
+        ...     func_args=(query,),
+        ...     retry_pattern_seconds=(0.1, (0.5, 1), (2, 4)),
+        ...     exceptions_to_handle=(ConnectionError,),
+        ...     retry_budget=search_api_budget,
+        ... )
+        >>> search_api_budget.stats()
+        {'successes': 18211, 'retries_granted': 1603, 'retries_denied_budget': 242,
+         'retries_denied_rate_limit': 17, 'available_retries': 3.4}
+    """
+
+    def __init__(
+        self,
+        retry_ratio: float = 0.1,
+        min_retries_per_second: float = 1.0,
+        max_saved_retries: float = 100.0,
+        max_retries_per_second: float | None = None,
+        max_burst: float | None = None,
+    ) -> None:
+        """
+        Args:
+            retry_ratio (float): Retries earned per successful call
+            min_retries_per_second (float): Retries earned per second, regardless of successful calls
+            max_saved_retries (float): Maximum number of earned retries which can be saved up
+            max_retries_per_second (float): Rate limit on retries (None means no rate limit)
+            max_burst (float): Maximum number of retries allowed at once by the rate limit
+                (defaults to `max_retries_per_second`)
+        """
+        if retry_ratio < 0 or min_retries_per_second < 0:
+            raise ValueError(
+                "`retry_ratio` and `min_retries_per_second` cannot be negative"
+            )
+        self.retry_ratio = retry_ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_saved_retries = max_saved_retries
+        self.max_retries_per_second = max_retries_per_second
+        self.max_burst = (
+            max_burst if max_burst is not None else max_retries_per_second or 0.0
+        )
+        self._state = multiprocessing.Array("d", _STATE_SIZE)
+        now: float = time.monotonic()
+        # (start with 1 second's worth of retries) #
+        self._state[_BALANCE] = min(max_saved_retries, min_retries_per_second)
+        self._state[_BALANCE_UPDATED_AT] = now
+        self._state[_BUCKET_TOKENS] = self.max_burst
+        self._state[_BUCKET_UPDATED_AT] = now
+
+    def _refill(self, now: float) -> None:
+        """Adds the retries earned over time, and the rate limiter's tokens (requires the state's lock)"""
+        state = self._state
+        state[_BALANCE] = min(
+            self.max_saved_retries,
+            state[_BALANCE]
+            + (now - state[_BALANCE_UPDATED_AT]) * self.min_retries_per_second,
+        )
+        state[_BALANCE_UPDATED_AT] = now
+        if self.max_retries_per_second is not None:
+            state[_BUCKET_TOKENS] = min(
+                self.max_burst,
+                state[_BUCKET_TOKENS]
+                + (now - state[_BUCKET_UPDATED_AT]) * self.max_retries_per_second,
+            )
+            state[_BUCKET_UPDATED_AT] = now
+
+    def record_success(self) -> None:
+        """Registers a successful call (which earns `retry_ratio` retries)"""
+        with self._state.get_lock():
+            self._state[_N_SUCCESSES] += 1
+            self._state[_BALANCE] = min(
+                self.max_saved_retries, self._state[_BALANCE] + self.retry_ratio
+            )
+
+    def try_acquire_retry(self) -> bool:
+        """Returns True (using up 1 retry) if a retry is allowed right now, otherwise False"""
+        with self._state.get_lock():
+            state = self._state
+            self._refill(time.monotonic())
+            if state[_BALANCE] < 1:
+                state[_N_DENIED_BUDGET] += 1
+                return False
+            if self.max_retries_per_second is not None and state[_BUCKET_TOKENS] < 1:
+                state[_N_DENIED_RATE_LIMIT] += 1
+                return False
+            state[_BALANCE] -= 1
+            if self.max_retries_per_second is not None:
+                state[_BUCKET_TOKENS] -= 1
+            state[_N_GRANTED] += 1
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the counts of successful calls and of granted and denied retries (across all sharers)"""
+        with self._state.get_lock():
+            self._refill(time.monotonic())
+            return {
+                "successes": int(self._state[_N_SUCCESSES]),
+                "retries_granted": int(self._state[_N_GRANTED]),
+                "retries_denied_budget": int(self._state[_N_DENIED_BUDGET]),
+                "retries_denied_rate_limit": int(self._state[_N_DENIED_RATE_LIMIT]),
+                "available_retries": self._state[_BALANCE],
+            }
@@ -3,9 +3,15 @@ Defines function retry_function_call
 """
 import random
 import time
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
-from joes_giant_toolbox.custom_exceptions import MaxRetriesExceededError
+from joes_giant_toolbox.all.retry_budget import RetryBudget
+from joes_giant_toolbox.custom_exceptions import (
+    MaxRetriesExceededError,
+    RetryBudgetExhaustedError,
+)
+
+_NO_MORE_ATTEMPTS = object()  # marks the end of retry_pattern_seconds
 
 
 def retry_function_call(  # pylint: disable=too-many-arguments
@@ -15,6 +21,7 @@ def retry_function_call(  # pylint: disable=too-many-arguments
     func_args: tuple | None = None,
     func_kwargs: dict | None = None,
     verbose: bool = False,
+    retry_budget: RetryBudget | None = None,
 ) -> Any:
     """
     Retries function (if it fails) according to retry pattern
@@ -24,6 +31,8 @@ def retry_function_call(  # pylint: disable=too-many-arguments
         func_args (tuple): (unnamed) arguments to pass to the function
         func_kwargs (dict): keyword (named) arguments to pass to the function
         retry_pattern_seconds (Iterable): Number of seconds to wait between failed function calls
+                                          The function is called (at most) once per entry, and there
+                                          is no wait after the final attempt
                                           Each entry in this Iterable can be an integer, float or tuple
                                           Integer or float results in a deterministic wait time
                                           If tuple, then a random wait time is drawn (uniformly) from the range defined in the tuple
@@ -31,12 +40,15 @@ def retry_function_call(  # pylint: disable=too-many-arguments
                                             number of seconds between 2 and 10
         exceptions_to_handle (tuple): Exceptions which trigger a retry (others simply raise)
         verbose (bool): Print debugging information to standard out
+        retry_budget (RetryBudget): Optional budget shared with other callers, which caps their combined
+                                    retries (each retry must be granted by the budget)
 
     Returns:
         Any: If function executes without error, returns the function result
 
     Raises:
         MaxRetriesExceededError: if `retry_pattern_seconds` exhausted before successful function call # pylint: disable=line-too-long
+        RetryBudgetExhaustedError: if `retry_budget` did not allow a retry (a subclass of MaxRetriesExceededError)
 
     Example:
         >>> def random_failer(fail_prob: float) -> str:
@@ -59,17 +71,31 @@ def retry_function_call(  # pylint: disable=too-many-arguments
     if func_kwargs is None:
         func_kwargs = {}
 
-    for wait_n_seconds in retry_pattern_seconds:
+    retry_pattern_iter: Iterator = iter(retry_pattern_seconds)
+    next_wait_n_seconds = next(retry_pattern_iter, _NO_MORE_ATTEMPTS)
+    while next_wait_n_seconds is not _NO_MORE_ATTEMPTS:
+        wait_n_seconds = next_wait_n_seconds
+        next_wait_n_seconds = next(retry_pattern_iter, _NO_MORE_ATTEMPTS)
         try:
-            return func(*func_args, **func_kwargs)
+            result = func(*func_args, **func_kwargs)
+            if retry_budget is not None:
+                retry_budget.record_success()
+            return result
         except Exception as err:  # pylint: disable=broad-exception-caught
             if verbose:
                 print(f"received error {type(err)}")
             if type(err) in exceptions_to_handle:
+                if next_wait_n_seconds is _NO_MORE_ATTEMPTS:
+                    # this was the last attempt, so there is no point waiting #
+                    break
                 if isinstance(wait_n_seconds, tuple):
                     sleep_n_seconds = random.uniform(*wait_n_seconds)
                 else:
                     sleep_n_seconds = wait_n_seconds
+                if retry_budget is not None and not retry_budget.try_acquire_retry():
+                    raise RetryBudgetExhaustedError(
+                        "retry budget does not allow another retry"
+                    ) from err
                 if verbose:
                     print(f"waiting {sleep_n_seconds:,} seconds then retrying")
                 time.sleep(sleep_n_seconds)
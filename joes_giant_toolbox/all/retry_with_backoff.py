@@ -0,0 +1,339 @@
+"""
+Defines the decorator retry_with_backoff and the function call_with_retries
+"""
+import asyncio
+import functools
+import inspect
+import random
+import time
+from typing import Any, Callable, Iterator
+
+from joes_giant_toolbox.all.circuit_breaker import CircuitBreaker
+from joes_giant_toolbox.all.retry_budget import RetryBudget
+from joes_giant_toolbox.custom_exceptions import (
+    MaxRetriesExceededError,
+    RetryBudgetExhaustedError,
+)
+from joes_giant_toolbox.custom_logging import enable_verbose_logging, get_logger
+
+_LOGGER = get_logger(__name__)
+
+
+def _decorrelated_jitter_delays(
+    base_delay_seconds: float, max_delay_seconds: float
+) -> Iterator[float]:
+    """Yields successive wait times: each one is drawn uniformly between `base_delay_seconds` and 3 times
+    the previous one (capped at `max_delay_seconds`), so that callers which failed at the same moment
+    spread their retries out instead of retrying in lockstep ("decorrelated jitter")"""
+    delay_seconds: float = base_delay_seconds
+    while True:
+        delay_seconds = min(
+            max_delay_seconds, random.uniform(base_delay_seconds, delay_seconds * 3)
+        )
+        yield delay_seconds
+
+
+def _call_sync(
+    func: Callable,
+    func_args: tuple,
+    func_kwargs: dict,
+    max_attempts: int,
+    base_delay_seconds: float,
+    max_delay_seconds: float,
+    exceptions_to_handle: tuple,
+    circuit_breaker: CircuitBreaker | None,
+    retry_budget: RetryBudget | None,
+) -> Any:
+    delays: Iterator[float] = _decorrelated_jitter_delays(
+        base_delay_seconds, max_delay_seconds
+    )
+    for attempt_num in range(1, max_attempts + 1):
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        try:
+            result: Any = func(*func_args, **func_kwargs)
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            if circuit_breaker is not None:
+                circuit_breaker.record_outcome(error)
+            if not isinstance(error, exceptions_to_handle):
+                raise
+            if attempt_num == max_attempts:
+                raise MaxRetriesExceededError(
+                    f"{func.__name__} failed on all {max_attempts} attempts"
+                ) from error
+            if retry_budget is not None and not retry_budget.try_acquire_retry():
+                raise RetryBudgetExhaustedError(
+                    f"retry budget does not allow another call to {func.__name__}"
+                ) from error
+            delay_seconds: float = next(delays)
+            _LOGGER.info(
+                "attempt %s of %s failed (%s): retrying in %.3f seconds",
+                attempt_num,
+                max_attempts,
+                type(error).__name__,
+                delay_seconds,
+            )
+            time.sleep(delay_seconds)
+        else:
+            if circuit_breaker is not None:
+                circuit_breaker.record_success()
+            if retry_budget is not None:
+                retry_budget.record_success()
+            return result
+    raise ValueError("`max_attempts` must be a positive integer")
+
+
+async def _call_async(
+    func: Callable,
+    func_args: tuple,
+    func_kwargs: dict,
+    max_attempts: int,
+    base_delay_seconds: float,
+    max_delay_seconds: float,
+    exceptions_to_handle: tuple,
+    circuit_breaker: CircuitBreaker | None,
+    retry_budget: RetryBudget | None,
+) -> Any:
+    delays: Iterator[float] = _decorrelated_jitter_delays(
+        base_delay_seconds, max_delay_seconds
+    )
+    for attempt_num in range(1, max_attempts + 1):
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        try:
+            result: Any = await func(*func_args, **func_kwargs)
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            if circuit_breaker is not None:
+                circuit_breaker.record_outcome(error)
+            if not isinstance(error, exceptions_to_handle):
+                raise
+            if attempt_num == max_attempts:
+                raise MaxRetriesExceededError(
+                    f"{func.__name__} failed on all {max_attempts} attempts"
+                ) from error
+            if retry_budget is not None and not retry_budget.try_acquire_retry():
+                raise RetryBudgetExhaustedError(
+                    f"retry budget does not allow another call to {func.__name__}"
+                ) from error
+            delay_seconds: float = next(delays)
+            _LOGGER.info(
+                "attempt %s of %s failed (%s): retrying in %.3f seconds",
+                attempt_num,
+                max_attempts,
+                type(error).__name__,
+                delay_seconds,
+            )
+            # (waiting does not block the event loop, nor a thread) #
+            await asyncio.sleep(delay_seconds)
+        else:
+            if circuit_breaker is not None:
+                circuit_breaker.record_success()
+            if retry_budget is not None:
+                retry_budget.record_success()
+            return result
+    raise ValueError("`max_attempts` must be a positive integer")
+
+
+def call_with_retries(  # pylint: disable=too-many-arguments
+    func: Callable,
+    func_args: tuple | None = None,
+    func_kwargs: dict | None = None,
+    max_attempts: int = 5,
+    base_delay_seconds: float = 0.1,
+    max_delay_seconds: float = 20.0,
+    exceptions_to_handle: tuple = (Exception,),
+    circuit_breaker: CircuitBreaker | None = None,
+    retry_budget: RetryBudget | None = None,
+    verbose: bool = False,
+) -> Any:
+    """
+    Calls a function, retrying it (if it fails) after randomised exponentially growing waits
+
+    The waits use "decorrelated jitter": each is drawn uniformly between `base_delay_seconds` and 3
+    times the previous wait (capped at `max_delay_seconds`), so that many callers which failed at the
+    same moment do not all retry at the same moment. If `func` is a coroutine function, this returns a
+    coroutine (to be awaited), which waits using asyncio.sleep() instead of blocking a thread
+
+    Args:
+        func (Callable): The function (or coroutine function) to call
+        func_args (tuple): (unnamed) arguments to pass to the function
+        func_kwargs (dict): keyword (named) arguments to pass to the function
+        max_attempts (int): Maximum number of calls (including the first one)
+        base_delay_seconds (float): Minimum wait between calls
+        max_delay_seconds (float): Maximum wait between calls
+        exceptions_to_handle (tuple): Exceptions (including their subclasses) which trigger a retry
+            (others simply raise)
+        circuit_breaker (CircuitBreaker): Optional breaker shared with other callers of the same dependency.
+            While it is open, calls fail immediately with CircuitOpenError (they are not retried)
+        retry_budget (RetryBudget): Optional budget shared with other callers, which caps their combined
+            retries (each retry must be granted by the budget)
+        verbose (bool): Log each failed attempt (to the logger "joes_giant_toolbox.all.retry_with_backoff")
+
+    Returns:
+        Any: The function result (or a coroutine returning it, if `func` is a coroutine function)
+
+    Raises:
+        MaxRetriesExceededError: if all `max_attempts` calls failed (raised from the last error)
+        CircuitOpenError: if `circuit_breaker` is open
+        RetryBudgetExhaustedError: if `retry_budget` did not allow a retry (a subclass of
+            MaxRetriesExceededError)
+
+    Example:
+        >>> call_with_retries(
+        ...     requests.get,
+        ...     func_args=("https://api.example.com/items",),
+        ...     func_kwargs={"timeout": 5},
+        ...     max_attempts=4,
+        ...     exceptions_to_handle=(requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+        ... )
+        <Response [200]>
+        >>> await call_with_retries(fetch_json_async, func_args=("https://api.example.com/items",))
+    """
+    if verbose:
+        enable_verbose_logging(_LOGGER)
+    call = _call_async if inspect.iscoroutinefunction(func) else _call_sync
+    return call(
+        func,
+        func_args or tuple(),
+        func_kwargs or {},
+        max_attempts,
+        base_delay_seconds,
+        max_delay_seconds,
+        exceptions_to_handle,
+        circuit_breaker,
+        retry_budget,
+    )
+
+
+def retry_with_backoff(  # pylint: disable=too-many-arguments
+    max_attempts: int = 5,
+    base_delay_seconds: float = 0.1,
+    max_delay_seconds: float = 20.0,
+    exceptions_to_handle: tuple = (Exception,),
+    circuit_breaker: CircuitBreaker | None = None,
+    retry_budget: RetryBudget | None = None,
+    verbose: bool = False,
+) -> Callable[[Callable], Callable]:
+    """
+    Decorator which retries a function or coroutine function (if it fails) after randomised exponentially
+    growing waits (see call_with_retries() for the arguments)
+
+    Example:
+        >>> inventory_breaker = CircuitBreaker(failure_threshold=10, recovery_timeout_seconds=15)
+        >>> @retry_with_backoff(
+        ...     max_attempts=5,
+        ...     exceptions_to_handle=(aiohttp.ClientError, asyncio.TimeoutError),
+        ...     circuit_breaker=inventory_breaker,
+        ... )
+        ... async def get_stock_level(session, sku):
+        ...     async with session.get(f"https://inventory.internal/sku/{sku}") as response:
+        ...         response.raise_for_status()
+        ...         return await response.json()
+        >>> await asyncio.gather(*(get_stock_level(session, sku) for sku in skus))
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await call_with_retries(
+                    func,
+                    args,
+                    kwargs,
+                    max_attempts,
+                    base_delay_seconds,
+                    max_delay_seconds,
+                    exceptions_to_handle,
+                    circuit_breaker,
+                    retry_budget,
+                    verbose,
+                )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return call_with_retries(
+                func,
+                args,
+                kwargs,
+                max_attempts,
+                base_delay_seconds,
+                max_delay_seconds,
+                exceptions_to_handle,
+                circuit_breaker,
+                retry_budget,
+                verbose,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    # compare the retry traffic hitting a dependency during a 1 second outage, from 200 concurrent
+    #   callers: retry_function_call() with a fixed pattern vs decorrelated jitter plus a circuit breaker
+    import collections
+    import threading
+
+    from joes_giant_toolbox.all.retry_function_call import retry_function_call
+
+    OUTAGE_END = time.monotonic() + 1.0
+    calls_per_100ms: collections.Counter = collections.Counter()
+    counter_lock = threading.Lock()
+
+    def flaky_dependency() -> str:
+        """Fails until the outage ends"""
+        now = time.monotonic()
+        with counter_lock:
+            calls_per_100ms[int((now - OUTAGE_END + 1.0) * 10)] += 1
+        if now < OUTAGE_END:
+            raise ConnectionError("dependency is down")
+        return "ok"
+
+    def run_callers(call_once: Callable) -> None:
+        callers = [threading.Thread(target=call_once) for _ in range(200)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+    def fixed_pattern_caller() -> None:
+        try:
+            retry_function_call(
+                flaky_dependency,
+                retry_pattern_seconds=(0.2,) * 10,
+                exceptions_to_handle=(ConnectionError,),
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+    run_callers(fixed_pattern_caller)
+    print("fixed retry pattern:   ", sum(calls_per_100ms.values()), "calls")
+    print("    calls per 100ms:", [calls_per_100ms[x] for x in range(12)])
+
+    OUTAGE_END = time.monotonic() + 1.0
+    calls_per_100ms.clear()
+    shared_breaker = CircuitBreaker(failure_threshold=20, recovery_timeout_seconds=0.2)
+
+    def jittered_caller() -> None:
+        for _ in range(10):  # (callers rejected by the open breaker come back later)
+            try:
+                call_with_retries(
+                    flaky_dependency,
+                    max_attempts=10,
+                    base_delay_seconds=0.05,
+                    max_delay_seconds=1.0,
+                    exceptions_to_handle=(ConnectionError,),
+                    circuit_breaker=shared_breaker,
+                )
+                return
+            except Exception:  # pylint: disable=broad-exception-caught
+                time.sleep(random.uniform(0.1, 0.3))
+
+    run_callers(jittered_caller)
+    print("jitter + circuit breaker:", sum(calls_per_100ms.values()), "calls")
+    print("    calls per 100ms:", [calls_per_100ms[x] for x in range(12)])
+    print("    breaker:", shared_breaker.stats())
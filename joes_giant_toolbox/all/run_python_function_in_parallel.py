@@ -2,11 +2,429 @@
 This script defines the function run_python_function_in_parallel()
 """
 
+import asyncio
+import collections
 import concurrent.futures
-from typing import Any, Callable, Tuple, Iterator
+import inspect
+import itertools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
 import os
 import threading
-import functools
+
+from joes_giant_toolbox.all.parallel_worker_pool import (
+    ParallelWorkerPool,
+    get_default_worker_pool,
+)
+from joes_giant_toolbox.all.multi_host import MultiHostCoordinator
+from joes_giant_toolbox.all.parallel_run_telemetry import ParallelRunTelemetry
+from joes_giant_toolbox.all.result_checkpoint import ResultCheckpoint
+from joes_giant_toolbox.all.shared_array import (
+    LargeArraySharer,
+    resolve_shared_arrays,
+)
+from joes_giant_toolbox.custom_logging import enable_verbose_logging, get_logger
+
+_LOGGER = get_logger(__name__)
+
+
+class _LoggedCall:
+    """Wraps a function so that each call logs process and thread information before and after running
+    (a class rather than a closure, so that it can be pickled and sent to worker processes)"""
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+
+    def __call__(self, *args, **kwargs) -> Any:
+        _LOGGER.info(
+            "STARTED: process_ID=%s thread_ID=%s",
+            os.getpid(),
+            threading.get_native_id(),
+        )
+        result: Any = self.func(*args, **kwargs)
+        _LOGGER.info(
+            "COMPLETED: process_ID=%s thread_ID=%s",
+            os.getpid(),
+            threading.get_native_id(),
+        )
+        return result
+
+
+class _SharedArrayResolvingCall:
+    """Wraps a function so that each SharedArray in its input is replaced by the (read-only) array itself
+    (a class rather than a closure, so that it can be pickled and sent to worker processes)"""
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+
+    def __call__(self, x: Any) -> Any:
+        return self.func(resolve_shared_arrays(x))
+
+
+class _IndexedCall:
+    """Wraps a function taking x so that it takes (input_idx, x) and returns (input_idx, result)
+    (a class rather than a closure, so that it can be pickled and sent to worker processes)"""
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+
+    def __call__(self, indexed_x: Tuple[int, Any]) -> Tuple[int, Any]:
+        input_idx, x = indexed_x
+        return input_idx, self.func(x)
+
+
+def _record_results(
+    checkpoint: ResultCheckpoint, new_results: Iterator[Tuple[int, Any]]
+) -> None:
+    """Stores every (input_idx, result) in [new_results] in the checkpoint"""
+    try:
+        for input_idx, result in new_results:
+            checkpoint.record(input_idx, result)
+    finally:
+        checkpoint.flush()
+
+
+class _CountedInputs:
+    """Iterates over (input_idx, x) pairs, counting them (so that the number of inputs of the run is known
+    once they have been consumed, and stored results of inputs beyond it are not returned)"""
+
+    def __init__(self, numbered_inputs: Iterable[Tuple[int, Any]]) -> None:
+        self._numbered_inputs: Iterator[Tuple[int, Any]] = iter(numbered_inputs)
+        self.n_seen: int = 0
+
+    def __iter__(self) -> "_CountedInputs":
+        return self
+
+    def __next__(self) -> Tuple[int, Any]:
+        numbered_input: Tuple[int, Any] = next(self._numbered_inputs)
+        self.n_seen += 1
+        return numbered_input
+
+
+def _stored_results_then_close(
+    checkpoint: ResultCheckpoint, n_inputs: int
+) -> Iterator[Any]:
+    """Yields the stored results of the first [n_inputs] inputs in input order, closing the checkpoint
+    afterwards"""
+    try:
+        yield from checkpoint.stored_results(n_inputs)
+    finally:
+        checkpoint.close()
+
+
+def _stream_checkpointed_results(
+    checkpoint: ResultCheckpoint,
+    completed_indices: Iterable[int],
+    counted_inputs: _CountedInputs,
+    new_results: Iterator[Tuple[int, Any]],
+    ordered: bool,
+) -> Iterator[Any]:
+    """Stores each new (input_idx, result) in the checkpoint as it arrives, and yields it along with the
+    results which were already stored (in input order if [ordered], otherwise each stored one as soon as
+    the inputs have been consumed past it). Stored results of inputs beyond the inputs of this run (left
+    by an earlier run with more inputs) are not yielded"""
+    stored_indices: Iterator[int] = iter(sorted(completed_indices))
+    next_stored_idx: Optional[int] = next(stored_indices, None)
+    try:
+        for input_idx, result in new_results:
+            yield_before_idx: int = input_idx if ordered else counted_inputs.n_seen
+            while next_stored_idx is not None and next_stored_idx < yield_before_idx:
+                yield checkpoint.get(next_stored_idx)
+                next_stored_idx = next(stored_indices, None)
+            checkpoint.record(input_idx, result)
+            yield result
+        while next_stored_idx is not None and next_stored_idx < counted_inputs.n_seen:
+            yield checkpoint.get(next_stored_idx)
+            next_stored_idx = next(stored_indices, None)
+    finally:
+        checkpoint.close()
+
+
+def _release_when_done(results: Iterator[Any], release: Callable[[], None]):
+    """Yields [results], calling [release] once they are exhausted (or iteration stops early)"""
+    try:
+        yield from results
+    finally:
+        release()
+
+
+def _run_chunk(func: Callable, chunk: List[Any]) -> List[Any]:
+    """Runs [func] on each input in [chunk] (in 1 worker, so that the chunk costs 1 round trip)"""
+    return [func(x) for x in chunk]
+
+
+def _largest_cost_first(
+    inputs: Sequence[Any],
+    cost_func: Optional[Callable[[Any], float]],
+    weights: Optional[Sequence[float]],
+) -> List[int]:
+    """Returns the positions of [inputs] ordered from most to least costly (ties keep their input order)"""
+    costs: Sequence[float] = (
+        weights if weights is not None else [cost_func(x) for x in inputs]  # type: ignore
+    )
+    if len(costs) != len(inputs):
+        raise ValueError(
+            f"received {len(costs)} weights for {len(inputs)} inputs (there must be 1 weight per input)"
+        )
+    return sorted(range(len(inputs)), key=costs.__getitem__, reverse=True)
+
+
+def _submit_in_order(
+    executor: concurrent.futures.Executor,
+    func: Callable,
+    inputs: Sequence[Any],
+    submission_order: List[int],
+    chunksize: int,
+) -> List[Tuple[concurrent.futures.Future, int]]:
+    """Submits the inputs to the executor in [submission_order] (in chunks of [chunksize])
+
+    Returns:
+        The (future, position within the future's chunk) of the result of each input, in input order
+    """
+    placements: List[Any] = [None] * len(inputs)
+    for chunk_start in range(0, len(submission_order), chunksize):
+        chunk_positions: List[int] = submission_order[
+            chunk_start : chunk_start + chunksize
+        ]
+        future = executor.submit(
+            _run_chunk, func, [inputs[input_idx] for input_idx in chunk_positions]
+        )
+        for position_in_chunk, input_idx in enumerate(chunk_positions):
+            placements[input_idx] = (future, position_in_chunk)
+    return placements
+
+
+def _results_in_input_order(
+    placements: List[Tuple[concurrent.futures.Future, int]]
+) -> Iterator[Any]:
+    """Yields the results in input order, raising an exception when it is reached (like Executor.map())"""
+    for future, position_in_chunk in placements:
+        yield future.result()[position_in_chunk]
+
+
+def _stream_results(
+    get_executor: Callable[[], concurrent.futures.Executor],
+    owns_executor: bool,
+    func: Callable,
+    inputs: Iterable[Any],
+    chunksize: int,
+    ordered: bool,
+    max_in_flight: int,
+    on_finish: Optional[Callable[[], None]] = None,
+) -> Iterator[Any]:
+    """Lazily submits chunks of [inputs] to the executor (at most [max_in_flight] chunks at a time),
+    yielding results as they become available ([on_finish] is called once streaming has stopped)"""
+    executor: concurrent.futures.Executor = get_executor()
+    inputs_iterator: Iterator[Any] = iter(inputs)
+    chunks: Iterator[List[Any]] = iter(
+        lambda: list(itertools.islice(inputs_iterator, chunksize)), []
+    )
+    in_flight: collections.deque = collections.deque()
+
+    def completed_results() -> Iterator[Any]:
+        """Waits for the next chunk (the oldest one, or else the first one to finish)"""
+        if ordered:
+            yield from in_flight.popleft().result()
+            return
+        done, _ = concurrent.futures.wait(
+            in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        for future in done:
+            in_flight.remove(future)
+        for future in done:
+            yield from future.result()
+
+    try:
+        for chunk in chunks:
+            while len(in_flight) >= max_in_flight:
+                yield from completed_results()
+            in_flight.append(executor.submit(_run_chunk, func, chunk))
+        while in_flight:
+            yield from completed_results()
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=True)
+        if on_finish is not None:
+            on_finish()
+
+
+async def _run_coroutines(
+    func: Callable,
+    inputs: Iterable[Any],
+    max_concurrency: int,
+    verbose: bool,
+    submission_order: Optional[List[int]] = None,
+) -> List[Tuple[bool, Any]]:
+    """Runs func(x) for every x in [inputs] on the current event loop, with at most [max_concurrency]
+    calls in progress at once (starting them in [submission_order], if it is given)
+
+    Returns:
+        A (succeeded, result or exception) pair for each input, in input order
+    """
+    outcomes: Dict[int, Tuple[bool, Any]] = {}
+    numbered_inputs: Iterator[Tuple[int, Any]] = (
+        enumerate(inputs)
+        if submission_order is None
+        else ((input_idx, inputs[input_idx]) for input_idx in submission_order)  # type: ignore
+    )
+
+    async def worker(worker_num: int) -> None:
+        # the workers share 1 iterator, so each takes the next input as soon as it is free #
+        for input_idx, x in numbered_inputs:
+            if verbose:
+                _LOGGER.info(
+                    "STARTED: coroutine_worker=%s input=%s", worker_num, input_idx
+                )
+            try:
+                result: Any = func(x)
+                if inspect.isawaitable(result):
+                    result = await result
+                outcomes[input_idx] = (True, result)
+            except Exception as error:  # pylint: disable=broad-except
+                outcomes[input_idx] = (False, error)
+            if verbose:
+                _LOGGER.info(
+                    "COMPLETED: coroutine_worker=%s input=%s", worker_num, input_idx
+                )
+
+    await asyncio.gather(*(worker(worker_num) for worker_num in range(max_concurrency)))
+    return [outcomes[input_idx] for input_idx in range(len(outcomes))]
+
+
+def _run_until_complete(coroutine) -> Any:
+    """Runs [coroutine] to completion from synchronous code (also when called from within a running
+    event loop, e.g. in a jupyter notebook, in which case a new event loop is run in a helper thread)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _unpack_outcomes(outcomes: List[Tuple[bool, Any]]) -> Iterator[Any]:
+    """Yields the results in order, raising a stored exception when it is reached (like Executor.map())"""
+    for succeeded, result in outcomes:
+        if not succeeded:
+            raise result
+        yield result
+
+
+def _run_on_executor(
+    func: Callable,
+    inputs: Iterable[Any],
+    parallel_method: str,
+    pool: Optional[ParallelWorkerPool],
+    executor_kwargs: Dict[str, Any],
+    chunksize: int,
+    stream: bool,
+    ordered: bool,
+    max_in_flight: Optional[int],
+    submission_order: Optional[List[int]],
+    release: Optional[Callable[[], None]],
+) -> Iterator[Any]:
+    """Runs [func] on every input, using [pool] or else a new executor (for the arguments, refer to
+    run_python_function_in_parallel()). [release] is called once the results are no longer needed"""
+    get_executor: Callable[[], concurrent.futures.Executor] = (
+        (lambda: pool.executor)  # type: ignore
+        if pool is not None
+        else lambda: (
+            concurrent.futures.ProcessPoolExecutor
+            if parallel_method == "multi_core"
+            else concurrent.futures.ThreadPoolExecutor
+        )(**executor_kwargs)
+    )
+
+    if submission_order is not None:
+        try:
+            if pool is not None:
+                placements = _submit_in_order(
+                    pool.executor,  # type: ignore
+                    func,
+                    inputs,
+                    submission_order,
+                    chunksize,
+                )
+            else:
+                with (
+                    concurrent.futures.ProcessPoolExecutor
+                    if parallel_method == "multi_core"
+                    else concurrent.futures.ThreadPoolExecutor
+                )(**executor_kwargs) as executor:
+                    placements = _submit_in_order(
+                        executor, func, inputs, submission_order, chunksize
+                    )
+        except BaseException:
+            if release is not None:
+                release()
+            raise
+        if release is None:
+            return _results_in_input_order(placements)
+        if pool is None:
+            release()
+            return _results_in_input_order(placements)
+        return _release_when_done(_results_in_input_order(placements), release)
+
+    if stream:
+        if max_in_flight is None:
+            n_workers: int = (
+                pool.max_workers
+                if pool is not None
+                else executor_kwargs.get("max_workers") or os.cpu_count() or 1
+            )
+            max_in_flight = 2 * n_workers
+        return _stream_results(
+            get_executor,
+            pool is None,
+            func,
+            inputs,
+            chunksize,
+            ordered,
+            max_in_flight,
+            on_finish=release,
+        )
+
+    if pool is not None:
+        try:
+            pool_results: Iterator = pool.map(func, inputs, chunksize=chunksize)
+        except BaseException:
+            if release is not None:
+                release()
+            raise
+        if release is None:
+            return pool_results
+        return _release_when_done(pool_results, release)
+
+    if parallel_method == "multi_core":
+        try:
+            with concurrent.futures.ProcessPoolExecutor(**executor_kwargs) as executor:
+                result: Iterator = executor.map(func, inputs, chunksize=chunksize)
+        finally:
+            if release is not None:
+                release()
+
+    elif parallel_method == "multi_thread":
+        with concurrent.futures.ThreadPoolExecutor(**executor_kwargs) as executor:  # type: ignore
+            result: Iterator = executor.map(func, inputs)  # type: ignore
+
+    else:
+        raise ValueError(
+            "parameter 'parallel_method' must be one of ['multi_core', 'multi_thread']"
+        )
+
+    return result
 
 
 def run_python_function_in_parallel(
@@ -14,9 +432,19 @@ def run_python_function_in_parallel(
     input_tuple: Tuple[Any],
     parallel_method: str,
     verbose: bool,
+    pool: Optional[Union[ParallelWorkerPool, str]] = None,
+    chunksize: int = 1,
+    stream: bool = False,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    share_arrays_min_bytes: Optional[int] = 1_000_000,
+    cost_func: Optional[Callable[[Any], float]] = None,
+    weights: Optional[Sequence[float]] = None,
+    checkpoint_path: Optional[str] = None,
+    telemetry: Optional[ParallelRunTelemetry] = None,
     **kwargs,
 ) -> Iterator:
-    """Convenience function for running a python function in parallel on multiple cores or threads\n
+    """Convenience function for running a python function in parallel on multiple cores, threads or coroutines\n
     Notes
     -----
     If your function has multiple input parameters, you need to wrap these within the single
@@ -28,15 +456,77 @@ def run_python_function_in_parallel(
     ----------
     func: Callable
         A function taking a single argument (x)
+        If parallel_method='multi_async', a coroutine function (async def) taking a single argument (x)
     input_tuple: tuple
         A tuple (immutable list) containing the list of input objects (x) to process by the function
     parallel_method: str
-        The method to use for parallelisation: one of ['multi_core', 'multi_thread']
+        The method to use for parallelisation: one of ['multi_core', 'multi_thread', 'multi_async', 'multi_host']
+        'multi_async' runs the coroutines concurrently on an event loop (ideal for I/O such as web
+        requests), with at most [max_workers] of them in progress at once (keyword argument, default 100).
+        This function remains synchronous (it runs the event loop itself), and [pool], [chunksize] and
+        [stream] do not apply
+        'multi_host' hands out the inputs (in chunks of [chunksize]) over TCP to worker processes on any
+        number of machines, each running joes_giant_toolbox.convenience.run_multi_host_worker(). Requires
+        the keyword arguments address=(host, port) to listen on and authkey=<bytes secret shared with the
+        workers>, and optionally lease_timeout_seconds (default 30: the inputs held by a worker which
+        disconnects, or sends no heartbeat for this long, are handed to another worker) and
+        idle_timeout_seconds (default 600: a TimeoutError is raised if no worker contacts the coordinator
+        for this long before all of the results have arrived). [func] is pickled
+        by reference, so it must be importable by the workers. [pool], [stream], [checkpoint_path] and
+        [telemetry] do not apply
     verbose: bool
-        Whether to print worker information during the run or not
+        Whether to log worker information during the run or not
+        (at INFO level, to the logger "joes_giant_toolbox.all.run_python_function_in_parallel")
+    pool: ParallelWorkerPool or str, optional (default: None)
+        Existing workers to run the tasks on, instead of starting (and stopping) new ones for this call:
+            - a ParallelWorkerPool (its parallel_method must match [parallel_method])
+            - "default", to use a module-level pool which is created on first use and then reused
+              (see joes_giant_toolbox.convenience.get_default_worker_pool)
+        When a pool is used, this function returns immediately and the results are computed in the
+        background (the returned iterator waits for each result in turn)
+    chunksize: int, optional (default: 1)
+        Number of inputs sent to a worker at a time (larger chunks mean fewer round trips between
+        processes, which matters when there are very many small tasks)
+    stream: bool, optional (default: False)
+        If True, returns a generator which reads [input_tuple] lazily (it can be any iterable, including
+        a generator) and yields results as they become available. At most [max_in_flight] chunks are
+        submitted at a time, so that memory use stays flat however many inputs there are
+    ordered: bool, optional (default: True)
+        Only used if [stream] is True. If False, results are yielded in the order in which they complete
+        (rather than in the order of the inputs)
+    max_in_flight: int, optional (default: 2 x the number of workers, or 2 x os.cpu_count() if
+        max_workers is not given)
+        Only used if [stream] is True. Maximum number of chunks submitted but not yet yielded
+    share_arrays_min_bytes: int, optional (default: 1_000_000)
+        Only used if parallel_method='multi_core'. Every numpy array of at least this many bytes which is
+        an input (x), or a value directly within an input which is a dict, list or tuple, is placed in
+        shared memory (once, however many inputs contain it) instead of being copied to each worker.
+        [func] receives a read-only view of the array. The shared memory is released when the run
+        finishes. Set to None to always copy arrays
+        Arrays can also be shared explicitly, by passing joes_giant_toolbox.convenience.SharedArray handles
+        within the inputs (with any parallel_method)
+    cost_func: Callable, optional (default: None)
+        A function returning an estimate of the cost (e.g. run time) of func(x), such as
+        lambda x: len(x["document"]). If given, the inputs are started from most to least costly
+        (longest processing time first scheduling): each worker takes the most costly remaining input as
+        soon as it is free, so that large inputs are not left until the end while other workers sit idle.
+        The results are still returned in the order of [input_tuple]. Cannot be combined with [stream]
+    weights: sequence of float, optional (default: None)
+        Costs of the inputs, given directly instead of [cost_func] (1 per input, in the same order)
+    checkpoint_path: str, optional (default: None)
+        Path of a SQLite file in which each completed result is stored (in batches, costing a few
+        microseconds per task). If the run is interrupted, calling this function again with the same
+        [checkpoint_path] (and the same inputs) only runs the inputs which have no stored result. The
+        results (stored and new) are returned as usual, and must be picklable. Use a new path for each
+        different run. Not available with parallel_method='multi_async'
+    telemetry: ParallelRunTelemetry, optional (default: None)
+        Collects the wall time, CPU time, queue wait, worker and pickled sizes of every task, as its
+        result is consumed (see joes_giant_toolbox.convenience.ParallelRunTelemetry). Measuring the
+        pickled sizes (parallel_method='multi_core' only) pickles each input and result 1 extra time.
+        Not available with parallel_method='multi_async'
     **kwargs
         Additional keyword arguments to pass to concurrent.futures.ProcessPoolExecutor() or
-        concurrent.futures.ThreadPoolExecutor()\n
+        concurrent.futures.ThreadPoolExecutor() (cannot be combined with [pool])\n
     Returns
     -------
     Iterator
@@ -87,52 +577,230 @@ def run_python_function_in_parallel(
     COMPLETED: process_ID=19874 thread_ID=1849254
     >>> list(run_test)
     [3, 9, 27, 81, 243]
+    >>> for result in run_python_function_in_parallel(
+    ...     func = sum_squares,
+    ...     input_tuple = ([x, x+1] for x in range(20_000_000)),   # never held in memory all at once
+    ...     parallel_method = "multi_core",
+    ...     verbose = False,
+    ...     chunksize = 10_000,
+    ...     stream = True,
+    ... ):
+    ...     process(result)
+    >>> # a few documents are 100x larger than the rest: start the largest first, to finish sooner #
+    >>> word_counts = run_python_function_in_parallel(
+    ...     func = count_words,
+    ...     input_tuple = documents,
+    ...     parallel_method = "multi_core",
+    ...     verbose = False,
+    ...     cost_func = len,
+    ... )
+    >>> # a days-long run, which can be restarted (skipping completed inputs) if it is interrupted #
+    >>> embeddings = run_python_function_in_parallel(
+    ...     func = embed_document,
+    ...     input_tuple = documents,
+    ...     parallel_method = "multi_core",
+    ...     verbose = False,
+    ...     checkpoint_path = "embed_documents_2023_06.sqlite",
+    ... )
+    >>> async def fetch_status(url):
+    ...     async with http_session.get(url) as response:
+    ...         return response.status
+    >>> list(
+    ...     run_python_function_in_parallel(
+    ...         func = fetch_status,
+    ...         input_tuple = tuple(urls),
+    ...         parallel_method = "multi_async",
+    ...         verbose = False,
+    ...         max_workers = 200,
+    ...     )
+    ... )
+    [200, 200, 404, ...]
+    >>> # on each worker machine: python -m joes_giant_toolbox.all.multi_host --host 10.0.0.5 --port 50000 --authkey secret
+    >>> embeddings = run_python_function_in_parallel(
+    ...     func = embed_document,         # must be importable on the worker machines
+    ...     input_tuple = documents,
+    ...     parallel_method = "multi_host",
+    ...     verbose = True,
+    ...     chunksize = 100,
+    ...     address = ("0.0.0.0", 50_000),
+    ...     authkey = b"secret",
+    ... )
     """
     if parallel_method not in [
         "multi_core",
         "multi_thread",
+        "multi_async",
+        "multi_host",
     ]:
         raise ValueError(
-            "parallel_method must be one of ['multi_core', 'multi_thread']"
+            "parallel_method must be one of ['multi_core', 'multi_thread', 'multi_async', 'multi_host']"
         )
 
-    def make_verbose(func):
-        """A decorator to make a function print process and thread information
-        before and after running"""
+    submission_order: Optional[List[int]] = None
+    if cost_func is not None or weights is not None:
+        if cost_func is not None and weights is not None:
+            raise ValueError("specify at most one of [cost_func] and [weights]")
+        if stream:
+            raise ValueError(
+                "[cost_func] and [weights] need all of the inputs up front, so cannot be combined with [stream]"
+            )
+        input_tuple = tuple(input_tuple)
+        submission_order = _largest_cost_first(input_tuple, cost_func, weights)
 
-        @functools.wraps(func)
-        def verbose_func(*args, **kwargs):
-            print(
-                f"\nSTARTED: process_ID={os.getpid()} thread_ID={threading.get_native_id()}"
+    if parallel_method == "multi_host":
+        if (
+            pool is not None
+            or stream
+            or checkpoint_path is not None
+            or telemetry is not None
+        ):
+            raise ValueError(
+                "[pool], [stream], [checkpoint_path] and [telemetry] are not available with parallel_method='multi_host'"
             )
-            result: Any = func(*args, **kwargs)
-            print(
-                f"\nCOMPLETED: process_ID={os.getpid()} thread_ID={threading.get_native_id()}"
+        if "address" not in kwargs or "authkey" not in kwargs:
+            raise ValueError(
+                "parallel_method='multi_host' requires the keyword arguments [address] and [authkey]"
             )
-            return result
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+        if verbose:
+            enable_verbose_logging(get_logger(MultiHostCoordinator.__module__))
+        input_tuple = tuple(input_tuple)
+        if submission_order is None:
+            submission_order = list(range(len(input_tuple)))
+        with MultiHostCoordinator(
+            func=func,
+            inputs=input_tuple,
+            task_input_indices=[
+                submission_order[chunk_start : chunk_start + chunksize]
+                for chunk_start in range(0, len(submission_order), chunksize)
+            ],
+            **kwargs,
+        ) as coordinator:
+            # (all results are collected before the workers are released, as with the other methods) #
+            return _unpack_outcomes(list(coordinator.outcomes()))
 
-        return verbose_func
+    if parallel_method == "multi_async":
+        if (
+            pool is not None
+            or stream
+            or chunksize != 1
+            or checkpoint_path is not None
+            or telemetry is not None
+        ):
+            raise ValueError(
+                "[pool], [chunksize], [stream], [checkpoint_path] and [telemetry] are not available with parallel_method='multi_async'"
+            )
+        max_concurrency: int = kwargs.pop("max_workers", None) or 100
+        if kwargs:
+            raise ValueError(
+                f"unexpected keyword arguments for parallel_method='multi_async': {list(kwargs)}"
+            )
+        if verbose:
+            enable_verbose_logging(_LOGGER)
+        return _unpack_outcomes(
+            _run_until_complete(
+                _run_coroutines(
+                    func, input_tuple, max_concurrency, verbose, submission_order
+                )
+            )
+        )
 
     if verbose:
+        enable_verbose_logging(_LOGGER)
+        wrapped_func: Callable = _SharedArrayResolvingCall(_LoggedCall(func))
+    else:
+        wrapped_func = _SharedArrayResolvingCall(func)
 
-        @make_verbose
-        def wrapped_func(*args, **kwargs):
-            return func(*args, **kwargs)
+    if pool is not None:
+        if kwargs:
+            raise ValueError(
+                "executor keyword arguments cannot be combined with [pool] (configure the pool instead)"
+            )
+        if pool == "default":
+            pool = get_default_worker_pool(parallel_method)
+        if pool.parallel_method != parallel_method:
+            raise ValueError(
+                f"pool uses parallel_method='{pool.parallel_method}', but parallel_method='{parallel_method}' was requested"
+            )
 
-    else:
-        wrapped_func = func
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
 
-    if parallel_method == "multi_core":
-        with concurrent.futures.ProcessPoolExecutor(**kwargs) as executor:
-            result: Iterator = executor.map(wrapped_func, input_tuple)
+    array_sharer: Optional[LargeArraySharer] = None
+    if parallel_method == "multi_core" and share_arrays_min_bytes is not None:
+        array_sharer = LargeArraySharer(share_arrays_min_bytes)
+        input_tuple = map(array_sharer.share, input_tuple)  # type: ignore
 
-    elif parallel_method == "multi_thread":
-        with concurrent.futures.ThreadPoolExecutor(**kwargs) as executor:  # type: ignore
-            result: Iterator = executor.map(wrapped_func, input_tuple)  # type: ignore
+    if telemetry is not None:
+        telemetry.start_run(parallel_method)
 
-    else:
-        raise ValueError(
-            "parameter 'parallel_method' must be one of ['multi_core', 'multi_thread']"
+    if checkpoint_path is not None:
+        checkpoint = ResultCheckpoint(checkpoint_path)
+        completed_indices: set = checkpoint.completed_indices()
+        if submission_order is not None:
+            input_tuple = tuple(input_tuple)
+        counted_inputs = _CountedInputs(
+            enumerate(input_tuple)
+            if submission_order is None
+            else ((input_idx, input_tuple[input_idx]) for input_idx in submission_order)  # type: ignore
+        )
+        pending_inputs: Iterable[Tuple[int, Any]] = (
+            (input_idx, x)
+            for input_idx, x in counted_inputs
+            if input_idx not in completed_indices
+        )
+        indexed_func: Callable = _IndexedCall(wrapped_func)
+        if telemetry is not None:
+            indexed_func = telemetry.wrap(indexed_func)
+            pending_inputs = (
+                telemetry.stamp(input_idx, (input_idx, x))
+                for input_idx, x in pending_inputs
+            )
+        new_results: Iterator[Tuple[int, Any]] = _run_on_executor(
+            indexed_func,
+            pending_inputs,
+            parallel_method,
+            pool,  # type: ignore
+            kwargs,
+            chunksize,
+            True,
+            stream and ordered,
+            max_in_flight,
+            None,
+            array_sharer.unlink_all if array_sharer else None,
         )
+        if telemetry is not None:
+            new_results = telemetry.collected_results(new_results)
+        if stream:
+            return _stream_checkpointed_results(
+                checkpoint, completed_indices, counted_inputs, new_results, ordered
+            )
+        try:
+            _record_results(checkpoint, new_results)
+        except BaseException:
+            checkpoint.close()
+            raise
+        return _stored_results_then_close(checkpoint, counted_inputs.n_seen)
 
-    return result
+    if telemetry is not None:
+        wrapped_func = telemetry.wrap(wrapped_func)
+        input_tuple = itertools.starmap(telemetry.stamp, enumerate(input_tuple))  # type: ignore
+    if submission_order is not None:
+        input_tuple = tuple(input_tuple)
+    results: Iterator = _run_on_executor(
+        wrapped_func,
+        input_tuple,
+        parallel_method,
+        pool,  # type: ignore
+        kwargs,
+        chunksize,
+        stream,
+        ordered,
+        max_in_flight,
+        submission_order,
+        array_sharer.unlink_all if array_sharer else None,
+    )
+    if telemetry is None:
+        return results
+    return telemetry.collected_results(results)
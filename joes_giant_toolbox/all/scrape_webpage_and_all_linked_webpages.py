@@ -5,6 +5,9 @@ import bs4
 
 from joes_giant_toolbox.all.make_url_request import make_url_request
 from joes_giant_toolbox.all.string_cleaner import StringCleaner
+from joes_giant_toolbox.custom_logging import enable_verbose_logging, get_logger
+
+_LOGGER = get_logger(__name__)
 
 
 def scrape_webpage_and_all_linked_webpages(
@@ -34,7 +37,7 @@ def scrape_webpage_and_all_linked_webpages(
         Higher priority hyperlinks are scraped first
         If set to None (default), then hyperlinks are scraped in a random order
     verbose: bool, optional (default=True)
-        If set to True, the function will print logging information while it is running
+        If set to True, the function will log progress information (at INFO level) while it is running
     **kwargs
         Additional named parameters to pass to the make_url_request() function
     Returns
@@ -71,38 +74,40 @@ def scrape_webpage_and_all_linked_webpages(
     started request: https://www.imdb.com ...
     ..completed request (status code: 200)
     extracting hyperlinks.....110 hyperlinks found
-    pausing for 4.25 seconds.....done
+    pausing for 4.25 seconds...
     started request: https://www.imdb.com/superheroes/streaming-stars/rg3853097728/mediaviewer/rm389100801?ref_=hm_edcft_ft_g_streamtan_3_t ...
     ..completed request (status code: 200)
-    pausing for 4.30 seconds.....done
+    pausing for 4.30 seconds...
     started request: https://www.imdb.com/privacy/adpreferences/ ...
     ..completed request (status code: 200)
-    pausing for 2.72 seconds.....done
+    pausing for 2.72 seconds...
     started request: https://www.imdb.com/calendar/?ref_=nv_mv_cal ...
     ..completed request (status code: 200)
-    pausing for 3.44 seconds.....done
+    pausing for 3.44 seconds...
     started request: https://www.imdb.com/video/vi2436219929/?listId=ls025720609&ref_=hm_edcio_og_ots_ted_5_t ...
     ..completed request (status code: 200)
-    pausing for 2.28 seconds.....done
+    pausing for 2.28 seconds...
     started request: https://help.imdb.com/article/imdb/general-information/imdb-site-index/GNCX7BHNSPBTFALQ#so ...
     ..completed request (status code: 200)
     """
     string_cleaner_inst = StringCleaner(verbose=False)
     base_url = string_cleaner_inst.operations["extract_domain_from_url"](url)
 
+    if verbose:
+        enable_verbose_logging(_LOGGER)
+
     # request initial HTML #
     if verbose:
-        print(f"started request: {url} ...")
-    url_response = make_url_request.make_url_request(url=url, **kwargs)
+        _LOGGER.info("started request: %s ...", url)
+    url_response = make_url_request(url=url, **kwargs)
     if verbose:
-        print(
-            f"..completed request (status code: {url_response['response_status_code']})"
+        _LOGGER.info(
+            "..completed request (status code: %s)",
+            url_response["response_status_code"],
         )
     all_results_dict = {url: url_response}
 
     # fetch hyperlinks in initial HTML #
-    if verbose:
-        print("extracting hyperlinks...", end="")
     soup_obj = bs4.BeautifulSoup(url_response["returned_content"], "html.parser")
     hyperlinks_found_list = [x["href"] for x in soup_obj.findAll("a", href=True)]
     clean_hyperlinks_list = []
@@ -116,25 +121,24 @@ def scrape_webpage_and_all_linked_webpages(
             clean_hyperlinks_list.append(hyperlink)
     clean_hyperlinks_list = list(set(clean_hyperlinks_list))  # remove duplicates
     if verbose:
-        print(f"..{len(clean_hyperlinks_list)} hyperlinks found")
+        _LOGGER.info(
+            "extracting hyperlinks.....%s hyperlinks found", len(clean_hyperlinks_list)
+        )
     random.shuffle(clean_hyperlinks_list)
 
     # scrape hyperlink pages #
     for hyperlink_url in clean_hyperlinks_list[:max_additional_urls]:
         pause_secs = random.uniform(scrape_pause_seconds[0], scrape_pause_seconds[1])
         if verbose:
-            print(f"pausing for {pause_secs:.2f} seconds...", end="")
+            _LOGGER.info("pausing for %.2f seconds...", pause_secs)
         time.sleep(pause_secs)
         if verbose:
-            print("..done")
-        if verbose:
-            print(f"started request: {hyperlink_url} ...")
-        hyperlink_url_response = make_url_request.make_url_request(
-            url=hyperlink_url, **kwargs
-        )
+            _LOGGER.info("started request: %s ...", hyperlink_url)
+        hyperlink_url_response = make_url_request(url=hyperlink_url, **kwargs)
         if verbose:
-            print(
-                f"..completed request (status code: {hyperlink_url_response['response_status_code']})"
+            _LOGGER.info(
+                "..completed request (status code: %s)",
+                hyperlink_url_response["response_status_code"],
             )
         all_results_dict[hyperlink_url] = hyperlink_url_response
 
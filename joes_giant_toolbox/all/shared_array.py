@@ -0,0 +1,201 @@
+"""
+This script defines the class SharedArray
+"""
+
+import collections
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+# shared memory segments attached to by this process (e.g. a worker), kept open for reuse by later tasks #
+# (least recently used first, and limited in number so that long-lived workers release old segments) #
+_ATTACHED_SEGMENTS: "collections.OrderedDict[str, Tuple[shared_memory.SharedMemory, Any]]" = (
+    collections.OrderedDict()
+)
+_MAX_ATTACHED_SEGMENTS = 16
+
+
+class SharedArray:
+    """A handle to a numpy array placed in shared memory, so that worker processes can read it without it
+    being copied (only the handle is pickled and sent to the workers, and each worker attaches to the
+    shared memory once and then reuses it)
+
+    Within workers, the array is read-only. The process which created the SharedArray owns the shared
+    memory, and must release it using unlink() (or by using the SharedArray as a context manager)
+
+    Example Usage
+    -------------
+    >>> import numpy as np
+    >>> def row_means(x):
+    ...     # run_python_function_in_parallel() gives [func] the read-only array in place of the SharedArray #
+    ...     return x["features"][x["rows"]].mean(axis=1)
+    >>> feature_matrix = np.random.rand(5_000_000, 50)        # 2 GB
+    >>> with SharedArray(feature_matrix) as shared_features:
+    ...     results = list(
+    ...         run_python_function_in_parallel(
+    ...             func=row_means,
+    ...             input_tuple=tuple(
+    ...                 {"features": shared_features, "rows": slice(i, i + 100_000)}
+    ...                 for i in range(0, 5_000_000, 100_000)
+    ...             ),
+    ...             parallel_method="multi_core",
+    ...             verbose=False,
+    ...         )
+    ...     )
+    """
+
+    def __init__(self, array) -> None:
+        """
+        Parameters
+        ----------
+        array: numpy.ndarray
+            The array to copy into shared memory (it must not have dtype=object)
+        """
+        numpy_module = sys.modules.get("numpy")
+        if numpy_module is None or not isinstance(array, numpy_module.ndarray):
+            raise TypeError("SharedArray requires a numpy array")
+        if array.dtype.hasobject:
+            raise ValueError(
+                "arrays of python objects cannot be placed in shared memory"
+            )
+        self.shape: Tuple[int, ...] = array.shape
+        self.dtype: str = array.dtype.str
+        self._shared_memory: Optional[
+            shared_memory.SharedMemory
+        ] = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.name: str = self._shared_memory.name
+        self._array = numpy_module.ndarray(
+            self.shape, dtype=array.dtype, buffer=self._shared_memory.buf
+        )
+        self._array[...] = array
+        self._array.flags.writeable = False
+        self._is_owner: bool = True
+
+    @property
+    def array(self):
+        """The (read-only) numpy array in shared memory"""
+        if self._array is None:
+            if self.name not in _ATTACHED_SEGMENTS:
+                attached_memory = shared_memory.SharedMemory(name=self.name)
+                attached_array = sys.modules["numpy"].ndarray(
+                    self.shape, dtype=self.dtype, buffer=attached_memory.buf
+                )
+                attached_array.flags.writeable = False
+                _ATTACHED_SEGMENTS[self.name] = (attached_memory, attached_array)
+                while len(_ATTACHED_SEGMENTS) > _MAX_ATTACHED_SEGMENTS:
+                    _, (oldest_memory, _) = _ATTACHED_SEGMENTS.popitem(last=False)
+                    try:
+                        oldest_memory.close()
+                    except BufferError:
+                        pass  # still in use: it is closed once its views are garbage collected
+            _ATTACHED_SEGMENTS.move_to_end(self.name)
+            self._array = _ATTACHED_SEGMENTS[self.name][1]
+        return self._array
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # only the handle is pickled (never the data) #
+        return {"name": self.name, "shape": self.shape, "dtype": self.dtype}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.name = state["name"]
+        self.shape = state["shape"]
+        self.dtype = state["dtype"]
+        self._shared_memory = None
+        self._array = None
+        self._is_owner = False
+
+    def unlink(self) -> None:
+        """Releases the shared memory (only has an effect in the process which created the SharedArray)"""
+        if not self._is_owner or self._shared_memory is None:
+            return
+        self._array = None
+        try:
+            self._shared_memory.close()
+        except BufferError:
+            pass  # views of the array still exist: the memory is freed once they are garbage collected
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.unlink()
+
+    def __repr__(self) -> str:
+        return (
+            f"SharedArray(name='{self.name}', shape={self.shape}, dtype='{self.dtype}')"
+        )
+
+
+class LargeArraySharer:
+    """Replaces large numpy arrays within inputs by SharedArrays (an input can be an array itself, or a
+    dict, list or tuple directly containing arrays). An array which appears in many inputs is only placed
+    in shared memory once. unlink_all() releases all of the shared memory created
+
+    Example Usage
+    -------------
+    >>> array_sharer = LargeArraySharer(min_bytes=1_000_000)
+    >>> shared_inputs = [array_sharer.share(x) for x in inputs]
+    >>> ...send shared_inputs to worker processes, which call resolve_shared_arrays() on each input...
+    >>> array_sharer.unlink_all()
+    """
+
+    def __init__(self, min_bytes: int) -> None:
+        self.min_bytes = min_bytes
+        if os.name == "posix":
+            # worker processes forked later share the resource tracker of this process only if it is
+            # already running (otherwise each worker starts its own, which unlinks the shared memory
+            # that the worker attached to when the worker exits) #
+            resource_tracker.ensure_running()
+        self._shared_arrays: Dict[int, Tuple[Any, SharedArray]] = {}
+
+    def _share_if_large(self, obj: Any) -> Any:
+        numpy_module = sys.modules.get("numpy")
+        if (
+            numpy_module is None
+            or not isinstance(obj, numpy_module.ndarray)
+            or obj.nbytes < self.min_bytes
+            or obj.dtype.hasobject
+        ):
+            return obj
+        if id(obj) not in self._shared_arrays:
+            # (the original array is kept referenced, so that its id() cannot be reused) #
+            self._shared_arrays[id(obj)] = (obj, SharedArray(obj))
+        return self._shared_arrays[id(obj)][1]
+
+    def share(self, x: Any) -> Any:
+        """Returns [x] with its large arrays replaced by SharedArrays"""
+        if isinstance(x, dict):
+            return {key: self._share_if_large(value) for key, value in x.items()}
+        if type(x) in (list, tuple):
+            return type(x)(self._share_if_large(value) for value in x)
+        return self._share_if_large(x)
+
+    def unlink_all(self) -> None:
+        """Releases the shared memory of every SharedArray created"""
+        for _, shared_array in self._shared_arrays.values():
+            shared_array.unlink()
+        self._shared_arrays.clear()
+
+
+def resolve_shared_arrays(x: Any) -> Any:
+    """Replaces the SharedArrays in 1 input (as created by LargeArraySharer, or explicitly by the user)
+    by their read-only arrays"""
+    if isinstance(x, SharedArray):
+        return x.array
+    if isinstance(x, dict):
+        return {
+            key: value.array if isinstance(value, SharedArray) else value
+            for key, value in x.items()
+        }
+    if type(x) in (list, tuple):
+        return type(x)(
+            value.array if isinstance(value, SharedArray) else value for value in x
+        )
+    return x
@@ -1,7 +1,478 @@
+import collections
+import concurrent.futures
+import functools
+import itertools
+import logging
+import mmap
+import operator
+import os
 import re
 import string
+import sys
 import typing
 
+from joes_giant_toolbox.all.url_domain_extractor import UrlDomainExtractor
+from joes_giant_toolbox.custom_logging import (
+    ShortRepr,
+    enable_verbose_logging,
+    get_logger,
+)
+
+_LOGGER = get_logger(__name__)
+
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+_DIGITS = frozenset(string.digits)
+_ALPHANUMERIC_OR_SPACE = _ASCII_LETTERS | _DIGITS | {" "}
+_LETTERS_SPACE_OR_NEWLINE = _ASCII_LETTERS | {" ", "\n"}
+_PRINTABLE_ASCII_CHARS = frozenset(string.printable)
+
+# string-cleaning operations which act on each character independently #
+# (each is written as a function mapping 1 input character to its output string) #
+_CHARACTER_OPERATIONS: typing.Dict[str, typing.Callable[[str], str]] = {
+    "newlines_to_spaces": lambda char: " " if char == "\n" else char,
+    "non_letters_to_spaces": lambda char: char if char in _ASCII_LETTERS else " ",
+    "numbers_to_spaces": lambda char: " " if char in _DIGITS else char,
+    "remove_non_letters": lambda char: (
+        char if char in _LETTERS_SPACE_OR_NEWLINE else ""
+    ),
+    "remove_non_printable_ascii_chars": lambda char: (
+        char if char in _PRINTABLE_ASCII_CHARS else ""
+    ),
+    "remove_numbers": lambda char: "" if char in _DIGITS else char,
+    "remove_punctuation": lambda char: char if char in _ALPHANUMERIC_OR_SPACE else "",
+    "remove_spaces": lambda char: "" if char == " " else char,
+    "to_lowercase": lambda char: char.lower(),
+}
+
+# unicode-aware versions of the same operations (letters, numbers etc. from any script) #
+_UNICODE_CHARACTER_OPERATIONS: typing.Dict[str, typing.Callable[[str], str]] = {
+    "newlines_to_spaces": _CHARACTER_OPERATIONS["newlines_to_spaces"],
+    "non_letters_to_spaces": lambda char: char if char.isalpha() else " ",
+    "numbers_to_spaces": lambda char: " " if char.isnumeric() else char,
+    "remove_non_letters": lambda char: (
+        char if char.isalpha() or char in " \n" else ""
+    ),
+    "remove_non_printable_ascii_chars": lambda char: (
+        char if char.isprintable() or char in string.whitespace else ""
+    ),
+    "remove_numbers": lambda char: "" if char.isnumeric() else char,
+    "remove_punctuation": lambda char: char if char.isalnum() or char == " " else "",
+    "remove_spaces": _CHARACTER_OPERATIONS["remove_spaces"],
+    "to_lowercase": _CHARACTER_OPERATIONS["to_lowercase"],
+}
+
+_URL_DOMAIN_EXTRACTOR = UrlDomainExtractor()
+_PUNCTUATION_RUN_REGEX = re.compile(r"[^A-Za-z0-9 ]+")
+_UNICODE_PUNCTUATION_RUN_REGEX = re.compile(r"(?:[^\w ]|_)+")
+_MULTIPLE_SPACES_REGEX = re.compile(" +")
+_SINGLE_SPACE_SEPARATED_LETTERS_REGEX = re.compile(r"\b([a-zA-Z]) (?=[a-zA-Z]\b)")
+_UNICODE_SINGLE_SPACE_SEPARATED_LETTERS_REGEX = re.compile(
+    r"\b([^\W\d_]) (?=[^\W\d_]\b)"
+)
+
+
+class _LazyTranslationTable(dict):
+    """A str.translate() table which works out (and then remembers) the mapping of
+    each character the first time that character is seen
+
+    This allows a single table to cover the full unicode range while only ever
+    storing the characters which actually occur in the text
+
+    Deleted characters are stored as None (rather than as an empty string) since this
+    keeps str.translate() on its fast path for ASCII text
+    """
+
+    def __init__(self, char_func: typing.Callable[[str], str]) -> None:
+        super().__init__()
+        self._char_func = char_func
+        for codepoint in range(128):
+            self.__missing__(codepoint)
+
+    def __missing__(self, codepoint: int) -> typing.Optional[str]:
+        mapped_chars: typing.Optional[str] = self._char_func(chr(codepoint)) or None
+        self[codepoint] = mapped_chars
+        return mapped_chars
+
+
+def _chain_character_operations(
+    char_funcs: typing.List[typing.Callable[[str], str]]
+) -> typing.Callable[[str], str]:
+    """Combines a sequence of per-character operations into a single per-character operation"""
+
+    def chained_char_func(char: str) -> str:
+        chars = char
+        for char_func in char_funcs:
+            chars = "".join([char_func(x) for x in chars])
+        return chars
+
+    return chained_char_func
+
+
+# translation tables for each individual per-character operation (shared by all StringCleaner instances) #
+_TRANSLATION_TABLES: typing.Dict[str, _LazyTranslationTable] = {
+    op_name: _LazyTranslationTable(char_func)
+    for op_name, char_func in _CHARACTER_OPERATIONS.items()
+}
+_UNICODE_TRANSLATION_TABLES: typing.Dict[str, _LazyTranslationTable] = {
+    op_name: _LazyTranslationTable(char_func)
+    for op_name, char_func in _UNICODE_CHARACTER_OPERATIONS.items()
+}
+
+
+def _remove_words_or_phrases_regex(
+    remove_list: typing.List[str], enforce_word_boundaries: bool
+) -> typing.Pattern:
+    """Builds the regex used by the string-cleaning operation 'remove_words_or_phrases'"""
+    if enforce_word_boundaries:
+        return re.compile("|".join([f"(\\b{re.escape(x)}\\b)" for x in remove_list]))
+    return re.compile("|".join([f"({re.escape(x)})" for x in remove_list]))
+
+
+_PHRASE_END = ""  # key marking the end of a phrase in a _PhraseRemover trie
+
+
+class _PhraseRemover:
+    """Removes all occurrences of a fixed list of words/phrases from strings, giving exactly the same
+    result as the regex alternation "(phrase_1)|(phrase_2)|..." (optionally with word boundaries) but
+    with a cost per string which does not grow with the number of phrases
+
+    The phrases are stored in a trie (prefix tree). The trie is also converted into a single regex
+    (in which phrases sharing a prefix share a branch) which quickly finds the next position at which
+    any phrase matches. At each such position, the trie is walked to find the phrase which the
+    original alternation would have chosen (i.e. the first matching phrase in [remove_list])
+    """
+
+    def __init__(
+        self, remove_list: typing.Sequence[str], enforce_word_boundaries: bool
+    ) -> None:
+        self._enforce_word_boundaries = enforce_word_boundaries
+        self._fallback_regex: typing.Optional[typing.Pattern] = None
+        if any(len(phrase) == 0 for phrase in remove_list):
+            # an empty phrase matches everywhere, so just use the original regex #
+            self._fallback_regex = _remove_words_or_phrases_regex(
+                list(remove_list), enforce_word_boundaries
+            )
+            return
+        self._trie: dict = {}
+        for phrase_idx, phrase in enumerate(remove_list):
+            node = self._trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node.setdefault(_PHRASE_END, phrase_idx)
+        word_boundary: str = r"\b" if enforce_word_boundaries else ""
+        self._search_regex: typing.Optional[typing.Pattern] = (
+            re.compile(f"{word_boundary}(?:{self._trie_to_regex(self._trie)})")
+            if self._trie
+            else None
+        )
+
+    def _trie_to_regex(self, root_node: dict) -> str:
+        """Converts the trie into an equivalent regex pattern
+
+        The trie is walked with an explicit stack (rather than recursively) since it is as deep as
+        the longest phrase
+        """
+        node_patterns: typing.Dict[int, str] = {}
+        stack: typing.List[typing.Tuple[dict, bool]] = [(root_node, False)]
+        while stack:
+            node, children_done = stack.pop()
+            child_nodes: typing.List[typing.Tuple[str, dict]] = [
+                (char, child_node)
+                for char, child_node in node.items()
+                if char != _PHRASE_END
+            ]
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child_node, False) for _, child_node in child_nodes)
+                continue
+            alternatives: typing.List[str] = [
+                re.escape(char) + node_patterns.pop(id(child_node))
+                for char, child_node in child_nodes
+            ]
+            if _PHRASE_END in node:
+                alternatives.append(r"\b" if self._enforce_word_boundaries else "")
+            node_patterns[id(node)] = (
+                alternatives[0]
+                if len(alternatives) == 1
+                else "(?:" + "|".join(alternatives) + ")"
+            )
+        return node_patterns[id(root_node)]
+
+    @staticmethod
+    def _is_word_boundary(raw_str: str, position: int) -> bool:
+        """Replicates the regex word boundary assertion \\b at [position] in [raw_str]"""
+        word_char_before: bool = position > 0 and (
+            raw_str[position - 1].isalnum() or raw_str[position - 1] == "_"
+        )
+        word_char_after: bool = position < len(raw_str) and (
+            raw_str[position].isalnum() or raw_str[position] == "_"
+        )
+        return word_char_before != word_char_after
+
+    def _match_end(self, raw_str: str, start: int) -> int:
+        """Returns the end position of the highest priority phrase matching [raw_str] at position [start]"""
+        best_phrase_idx: typing.Optional[int] = None
+        best_match_end: int = start
+        node: typing.Optional[dict] = self._trie
+        position: int = start
+        while node is not None:
+            if (
+                _PHRASE_END in node
+                and (best_phrase_idx is None or node[_PHRASE_END] < best_phrase_idx)
+                and (
+                    not self._enforce_word_boundaries
+                    or self._is_word_boundary(raw_str, position)
+                )
+            ):
+                best_phrase_idx = node[_PHRASE_END]
+                best_match_end = position
+            if position == len(raw_str):
+                break
+            node = node.get(raw_str[position])
+            position += 1
+        return best_match_end
+
+    def remove(self, raw_str: str) -> str:
+        """Returns [raw_str] with all occurrences of the phrases removed"""
+        if self._fallback_regex is not None:
+            return self._fallback_regex.sub("", raw_str)
+        if self._search_regex is None:
+            return raw_str
+        kept_parts: typing.List[str] = []
+        kept_from: int = 0
+        match = self._search_regex.search(raw_str)
+        while match is not None:
+            kept_parts.append(raw_str[kept_from : match.start()])
+            kept_from = self._match_end(raw_str, match.start())
+            match = self._search_regex.search(raw_str, kept_from)
+        if kept_from == 0:
+            return raw_str
+        kept_parts.append(raw_str[kept_from:])
+        return "".join(kept_parts)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_phrase_remover(
+    remove_tuple: typing.Tuple[str, ...], enforce_word_boundaries: bool
+) -> _PhraseRemover:
+    """Builds the _PhraseRemover for a given remove list only once (and reuses it thereafter)"""
+    return _PhraseRemover(remove_tuple, enforce_word_boundaries)
+
+
+_BYTES_LIKE = (bytes, bytearray, memoryview)
+_ASCII_WHITESPACE_BYTES = bytes(
+    [byte for byte in range(128) if chr(byte).isspace()]
+)  # the characters removed by str.strip() from ASCII text
+_URL_DOMAIN_BYTES_REGEX = re.compile(rb"(?P<url>https?://[^/?]+)")
+_PUNCTUATION_RUN_BYTES_REGEX = re.compile(rb"[^A-Za-z0-9 ]+")
+_MULTIPLE_SPACES_BYTES_REGEX = re.compile(rb" +")
+_SINGLE_SPACE_SEPARATED_LETTERS_BYTES_REGEX = re.compile(
+    rb"\b([a-zA-Z]) (?=[a-zA-Z]\b)"
+)
+
+
+def _bytes_translation(
+    char_func: typing.Callable[[str], str]
+) -> typing.Tuple[bytes, bytes]:
+    """Converts a per-character (ASCII) operation into the (table, delete) arguments of bytes.translate()
+
+    Bytes 128-255 are treated in the same way as any other non-ASCII character
+    """
+    table = bytearray(range(256))
+    delete = bytearray()
+    for byte in range(256):
+        char: str = chr(byte) if byte < 128 else "\x80"
+        mapped_char: str = char_func(char)
+        if mapped_char == "":
+            delete.append(byte)
+        elif mapped_char != char:
+            table[byte] = ord(mapped_char)
+    return bytes(table), bytes(delete)
+
+
+def _remove_words_or_phrases_from_bytes(
+    raw_bytes: typing.Union[bytes, bytearray],
+    remove_list: typing.List[typing.Union[str, bytes]],
+    enforce_word_boundaries: bool,
+    **kwargs,  # pylint: disable=unused-argument
+) -> bytes:
+    """Bytes version of the string-cleaning operation 'remove_words_or_phrases'
+
+    Latin-1 maps each byte to exactly 1 character (and back), so this decode/encode is lossless
+    """
+    remove_tuple: typing.Tuple[str, ...] = tuple(
+        phrase.decode("latin-1") if isinstance(phrase, bytes) else phrase
+        for phrase in remove_list
+    )
+    return (
+        _get_phrase_remover(remove_tuple, enforce_word_boundaries)
+        .remove(raw_bytes.decode("latin-1"))
+        .encode("latin-1")
+    )
+
+
+# bytes versions of each string-cleaning operation (with ASCII semantics) #
+_BYTES_OPERATIONS: typing.Dict[str, typing.Callable[..., bytes]] = {
+    op_name: operator.methodcaller("translate", *_bytes_translation(char_func))
+    for op_name, char_func in _CHARACTER_OPERATIONS.items()
+}
+_BYTES_OPERATIONS.update(
+    {
+        "extract_domain_from_url": lambda raw_bytes: b" ".join(
+            _URL_DOMAIN_BYTES_REGEX.findall(raw_bytes)
+        ),
+        "join_single_space_separated_letters_together": functools.partial(
+            _SINGLE_SPACE_SEPARATED_LETTERS_BYTES_REGEX.sub, rb"\1"
+        ),
+        "multiple_spaces_to_single_spaces": functools.partial(
+            _MULTIPLE_SPACES_BYTES_REGEX.sub, b" "
+        ),
+        "punctuation_to_spaces": functools.partial(
+            _PUNCTUATION_RUN_BYTES_REGEX.sub, b" "
+        ),
+        "remove_whitespace_at_start_and_end": operator.methodcaller(
+            "strip", _ASCII_WHITESPACE_BYTES
+        ),
+        "remove_words_or_phrases": _remove_words_or_phrases_from_bytes,
+    }
+)
+
+
+def _apply_bytes_operation(
+    bytes_op_func: typing.Callable[..., bytes],
+    raw_bytes: typing.Union[bytes, bytearray, memoryview],
+    *args,
+    **kwargs,
+) -> typing.Union[bytes, bytearray]:
+    """Applies a bytes operation, returning a bytearray if given a bytearray (otherwise bytes)"""
+    if isinstance(raw_bytes, memoryview):
+        raw_bytes = raw_bytes.tobytes()
+    cleaned_bytes = bytes_op_func(raw_bytes, *args, **kwargs)
+    if isinstance(raw_bytes, bytearray) and not isinstance(cleaned_bytes, bytearray):
+        return bytearray(cleaned_bytes)
+    return cleaned_bytes
+
+
+def _accept_bytes(
+    op_func: typing.Callable[..., str], bytes_op_func: typing.Callable[..., bytes]
+) -> typing.Callable:
+    """Wraps a string-cleaning operation so that bytes-like input is sent to [bytes_op_func]
+    (so is never decoded into a str)"""
+
+    @functools.wraps(op_func)
+    def op_func_accepting_bytes(raw_str, *args, **kwargs):
+        if isinstance(raw_str, _BYTES_LIKE):
+            return _apply_bytes_operation(bytes_op_func, raw_str, *args, **kwargs)
+        return op_func(raw_str, *args, **kwargs)
+
+    return op_func_accepting_bytes
+
+
+# compiled string cleaner used by each worker process in StringCleaner.clean_many() and StringCleaner.clean_file() #
+_worker_compiled_string_cleaner: typing.Optional["CompiledStringCleaner"] = None
+
+
+def _init_string_cleaner_worker(
+    operation_names_list: typing.List[str],
+    operation_params_dict: dict,
+    unicode_aware: bool,
+) -> None:
+    """Compiles the string cleaning pipeline once in each worker process"""
+    global _worker_compiled_string_cleaner  # pylint: disable=global-statement
+    _worker_compiled_string_cleaner = StringCleaner(
+        verbose=False, unicode_aware=unicode_aware
+    ).compile(operation_names_list, operation_params_dict)
+
+
+def _clean_chunk_in_worker(raw_strs: typing.List[str]) -> typing.List[str]:
+    """Cleans a chunk of strings using the worker's compiled string cleaner"""
+    return list(map(_worker_compiled_string_cleaner, raw_strs))
+
+
+def _clean_lines(
+    text_bytes: bytes,
+    compiled_string_cleaner: "CompiledStringCleaner",
+    encoding: str,
+    errors: str,
+) -> bytes:
+    """Cleans each line (separated by "\\n") of a block of encoded text, keeping the line breaks"""
+    text: str = text_bytes.decode(encoding, errors)
+    ends_with_newline: bool = text.endswith("\n")
+    if ends_with_newline:
+        text = text[:-1]
+    cleaned_text: str = "\n".join(map(compiled_string_cleaner, text.split("\n")))
+    if ends_with_newline:
+        cleaned_text += "\n"
+    return cleaned_text.encode(encoding, errors)
+
+
+def _clean_file_chunk_in_worker(
+    in_path: str, start: int, end: int, encoding: str, errors: str
+) -> bytes:
+    """Reads bytes [start, end) of file [in_path] and cleans each line in them, using the
+    worker's compiled string cleaner"""
+    with open(in_path, "rb") as in_file:
+        in_file.seek(start)
+        text_bytes: bytes = in_file.read(end - start)
+    return _clean_lines(text_bytes, _worker_compiled_string_cleaner, encoding, errors)
+
+
+def _file_chunks_on_line_boundaries(
+    in_path: str, chunk_bytes: int
+) -> typing.Iterator[typing.Tuple[int, int]]:
+    """Splits a file into consecutive (start, end) byte ranges of roughly [chunk_bytes] bytes,
+    with every range ending just after a newline (or at the end of the file)
+
+    The file is memory-mapped, so only the bytes around each chunk boundary are ever read
+    """
+    with open(in_path, "rb") as in_file:
+        file_size: int = os.fstat(in_file.fileno()).st_size
+        if file_size == 0:
+            return
+        with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as file_mmap:
+            start: int = 0
+            while start < file_size:
+                newline_position: int = file_mmap.find(
+                    b"\n", min(start + chunk_bytes, file_size) - 1
+                )
+                end: int = file_size if newline_position == -1 else newline_position + 1
+                yield start, end
+                start = end
+
+
+def _map_in_worker_processes(
+    worker_func: typing.Callable,
+    worker_args: typing.Iterable[tuple],
+    n_workers: int,
+    initargs: tuple,
+) -> typing.Iterator[typing.Any]:
+    """Generator which runs worker_func(*args) for each args in [worker_args] in a pool of worker
+    processes (each holding a compiled string cleaner) and yields the results in input order
+
+    At most 2*[n_workers] tasks are in progress at any one time, so memory use is bounded
+    no matter how many tasks there are
+    """
+    worker_args_iter = iter(worker_args)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_string_cleaner_worker,
+        initargs=initargs,
+    ) as executor:
+        tasks_in_progress: typing.Deque[concurrent.futures.Future] = collections.deque()
+        try:
+            while True:
+                while len(tasks_in_progress) < 2 * n_workers:
+                    args = next(worker_args_iter, None)
+                    if args is None:
+                        break
+                    tasks_in_progress.append(executor.submit(worker_func, *args))
+                if not tasks_in_progress:
+                    return
+                yield tasks_in_progress.popleft().result()
+        finally:
+            for future in tasks_in_progress:
+                future.cancel()
+
 
 class StringCleaner:
     """
@@ -16,13 +487,28 @@ class StringCleaner:
     ----------
     operations: dict
         A dictionary containing each individual string cleaning function
-    verbose: str, optional (default: True)
+    verbose: bool, optional (default: None)
         A global parameter dictating the verbosity of the output
+        Unless verbose=False, each operation call is logged (at DEBUG level) to the logger
+        "joes_giant_toolbox.all.string_cleaner", with long inputs truncated. Messages are only formatted
+        if that logger is enabled, so that verbose output can be routed or silenced using the standard
+        logging module. Logging is only configured (DEBUG level for this logger, and printing to standard
+        out if the application has not set up logging) if verbose=True is passed explicitly
+    unicode_aware: bool, optional (default: False)
+        If False, "letters" means A-Z/a-z and "numbers" means 0-9 (all other characters are punctuation)
+        If True, letters and numbers from every script are recognised
+        (e.g. "remove_punctuation" keeps "é" and "日", and "remove_numbers" removes "٣" and "½")
 
     Methods
     -------
     apply_sequential_operations
         Sequentially applies multiple string cleaning operations to the same string
+    clean_file
+        Applies a sequence of string cleaning operations to every line of a (possibly huge) text file
+    clean_many
+        Applies a sequence of string cleaning operations to every string in a collection (optionally in parallel)
+    compile
+        Prepares a fixed sequence of string cleaning operations once, for fast repeated use
 
     Notes
     -----
@@ -36,12 +522,47 @@ class StringCleaner:
         ...or called via a chain consisting of only that 1 operation:
     >>> string_cleaner.apply_sequential_operations("j!o@e#i$s%t^h&e&b*e(s)t", operation_names_list=["remove_punctuation"])
     joeisthebest
+
+    All of the operations which act on each character independently are single str.translate() passes
+    over precomputed translation tables
+
+    Every operation (and every compiled cleaner) also accepts bytes, bytearray or memoryview input, which
+    is cleaned directly as ASCII (using bytes regexes and bytes.translate()) without ever creating a str.
+    For ASCII text, the result is exactly the encoded result of cleaning the equivalent str
+    (a bytearray input gives a bytearray output, otherwise bytes are returned):
+    >>> string_cleaner.operations["remove_punctuation"](b"j!o@e#i$s%t^h&e&b*e(s)t")
+    b'joeisthebest'
     """
 
-    def __init__(self, verbose: bool = True) -> None:
+    def __init__(
+        self, verbose: typing.Optional[bool] = None, unicode_aware: bool = False
+    ) -> None:
         self.operations = {}
+        setup_verbose_logging: bool = verbose is True
+        verbose = verbose is not False
         self.verbose = verbose
+        self.unicode_aware = unicode_aware
         self.printable_ascii_chars = string.printable
+        # the _PhraseRemover last used for each remove list (keyed by id(remove_list)) #
+        self._phrase_removers: typing.Dict[
+            typing.Tuple[int, bool],
+            typing.Tuple[typing.Sequence[str], int, _PhraseRemover],
+        ] = {}
+        if unicode_aware:
+            self._character_operations = _UNICODE_CHARACTER_OPERATIONS
+            self._translation_tables = _UNICODE_TRANSLATION_TABLES
+            self._punctuation_run_regex = _UNICODE_PUNCTUATION_RUN_REGEX
+            self._single_space_separated_letters_regex = (
+                _UNICODE_SINGLE_SPACE_SEPARATED_LETTERS_REGEX
+            )
+        else:
+            self._character_operations = _CHARACTER_OPERATIONS
+            self._translation_tables = _TRANSLATION_TABLES
+            self._punctuation_run_regex = _PUNCTUATION_RUN_REGEX
+            self._single_space_separated_letters_regex = (
+                _SINGLE_SPACE_SEPARATED_LETTERS_REGEX
+            )
+        translation_tables = self._translation_tables
 
         def extract_domain_from_url(raw_str: str) -> str:
             """Extracts the base domain from a given website URL
@@ -51,25 +572,15 @@ class StringCleaner:
             >>> string_cleaner = StringCleaner()
             >>> string_cleaner.operations["extract_domain_from_url"]("https://www.google.co.uk/media/contact-us.php")
             'https://www.google.co.uk'
+
+            Repeated URLs are memoised (see joes_giant_toolbox.web.UrlDomainExtractor, which can also
+            extract the registrable domain e.g. 'google.co.uk')
             """
             if self.verbose:
-                print(
-                    f"""
-# extract domain from URL #
-" ".join(
-    re.findall(
-        "(?P<url>https?://[^/?]+)",
-        "{raw_str}",
-    )     
-)           
-"""
+                _LOGGER.debug(
+                    "UrlDomainExtractor().scheme_and_host(%s)", ShortRepr(raw_str)
                 )
-            return " ".join(
-                re.findall(
-                    "(?P<url>https?://[^/?]+)",
-                    raw_str,
-                )
-            )
+            return _URL_DOMAIN_EXTRACTOR.scheme_and_host(raw_str)
 
         def remove_words_or_phrases(
             raw_str: str,
@@ -79,6 +590,10 @@ class StringCleaner:
         ) -> str:
             """Removes specific 'words' or 'phrases' (i.e. specific characters in a specific order) from a given string, possibly observing word boundaries
 
+            The phrase matcher built from [remove_list] is reused for as long as the same list object is
+            passed (phrases added to or removed from it are noticed, but after replacing a phrase in place
+            pass a new list, a tuple, or use StringCleaner.compile())
+
             Example Usage
             -------------
             >>> string_cleaner = StringCleaner()
@@ -97,33 +612,20 @@ class StringCleaner:
             """
             if enforce_word_boundaries:
                 if self.verbose:
-                    print(
-                        f"""
-re.sub(
-    "|".join([f"(\\\\b{{re.escape(x)}}\\\\b)" for x in {remove_list}]),
-    "",
-    "{raw_str}",
-)"""
+                    _LOGGER.debug(
+                        "remove_words_or_phrases(%s, remove_list=%s, enforce_word_boundaries=True)",
+                        ShortRepr(raw_str),
+                        ShortRepr(remove_list),
                     )
-                return re.sub(
-                    "|".join([f"(\\b{re.escape(x)}\\b)" for x in remove_list]),
-                    "",
-                    raw_str,
-                )
+                return self._phrase_remover_for(remove_list, True).remove(raw_str)
             else:
                 if self.verbose:
-                    print(
-                        f"""
-re.sub( 
-    "|".join( [f"({{re.escape(x)}})" for x in {remove_list}] ), 
-    "", 
-    "{raw_str}"
-)                    
-"""
+                    _LOGGER.debug(
+                        "remove_words_or_phrases(%s, remove_list=%s, enforce_word_boundaries=False)",
+                        ShortRepr(raw_str),
+                        ShortRepr(remove_list),
                     )
-                return re.sub(
-                    "|".join([f"({re.escape(x)})" for x in remove_list]), "", raw_str
-                )
+                return self._phrase_remover_for(remove_list, False).remove(raw_str)
 
         def to_lowercase(raw_str):
             """Converts all upper case characters in a given string to lower case
@@ -135,7 +637,7 @@ re.sub(
             'i am shouting'
             """
             if verbose:
-                print(f'"{raw_str}".to_lower()')
+                _LOGGER.debug("%s.lower()", ShortRepr(raw_str))
             return raw_str.lower()
 
         def punctuation_to_spaces(raw_str):
@@ -148,8 +650,10 @@ re.sub(
             ' Joe is the best '
             """
             if verbose:
-                print(f're.sub(r"[^A-Za-z0-9]+", " ", "{raw_str}")')
-            return re.sub(r"[^A-Za-z0-9 ]+", " ", raw_str)
+                _LOGGER.debug(
+                    '%s.sub(" ", %s)', self._punctuation_run_regex, ShortRepr(raw_str)
+                )
+            return self._punctuation_run_regex.sub(" ", raw_str)
 
         def remove_punctuation(raw_str):
             """Removes any character which is not a letter or a number
@@ -161,8 +665,11 @@ re.sub(
             'Joe is the best'
             """
             if verbose:
-                print(f're.sub(r"[^A-Za-z0-9]+", "", "{raw_str}")')
-            return re.sub(r"[^A-Za-z0-9 ]+", "", raw_str)
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["remove_punctuation"])',
+                    ShortRepr(raw_str),
+                )
+            return raw_str.translate(translation_tables["remove_punctuation"])
 
         def numbers_to_spaces(raw_str):
             """Turns all number characters in a given string into space characters
@@ -174,12 +681,11 @@ re.sub(
             'time go number   street'
             """
             if verbose:
-                print(
-                    f'"{raw_str}".translate(str.maketrans("0123456789", " " * len("0123456789")))'
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["numbers_to_spaces"])',
+                    ShortRepr(raw_str),
                 )
-            return raw_str.translate(
-                str.maketrans("0123456789", " " * len("0123456789"))
-            )
+            return raw_str.translate(translation_tables["numbers_to_spaces"])
 
         def remove_numbers(raw_str):
             """Removes all number characters from a given string
@@ -191,8 +697,11 @@ re.sub(
             'timegonumberstreet'
             """
             if verbose:
-                print(f'"{raw_str}".translate(str.maketrans("", "", "0123456789"))')
-            return raw_str.translate(str.maketrans("", "", "0123456789"))
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["remove_numbers"])',
+                    ShortRepr(raw_str),
+                )
+            return raw_str.translate(translation_tables["remove_numbers"])
 
         def remove_spaces(raw_str):
             """Removes all spaces from a given string
@@ -204,8 +713,8 @@ re.sub(
             'USA'
             """
             if verbose:
-                print(f're.sub(" ", "", "{raw_str}")')
-            return re.sub(" ", "", raw_str)
+                _LOGGER.debug('%s.replace(" ", "")', ShortRepr(raw_str))
+            return raw_str.replace(" ", "")
 
         def newlines_to_spaces(raw_str):
             """Turn newline characters ("\\n") into space characters in a given string
@@ -217,7 +726,7 @@ re.sub(
             ' U S S R '
             """
             if verbose:
-                print(f'"{raw_str}".replace("\\n", " ")')
+                _LOGGER.debug('%s.replace("\\n", " ")', ShortRepr(raw_str))
             return raw_str.replace("\n", " ")
 
         def multiple_spaces_to_single_spaces(raw_str):
@@ -230,8 +739,10 @@ re.sub(
             'the quick brown fox jumped over'
             """
             if verbose:
-                print(f're.sub(" +", " ", "{raw_str}")')
-            return re.sub(" +", " ", raw_str)
+                _LOGGER.debug(
+                    '%s.sub(" ", %s)', _MULTIPLE_SPACES_REGEX, ShortRepr(raw_str)
+                )
+            return _MULTIPLE_SPACES_REGEX.sub(" ", raw_str)
 
         def remove_whitespace_at_start_and_end(raw_str):
             """Remove all space and newline characters at the start and end of a string
@@ -243,7 +754,7 @@ re.sub(
             'text of interest'
             """
             if verbose:
-                print(f'"{raw_str}".strip()')
+                _LOGGER.debug("%s.strip()", ShortRepr(raw_str))
             return raw_str.strip()
 
         def non_letters_to_spaces(raw_str):
@@ -256,8 +767,11 @@ re.sub(
             '  joe   is  the     best  '
             """
             if verbose:
-                print(f're.sub("[^a-zA-Z]", " ", "{raw_str}")')
-            return re.sub("[^a-zA-Z]", " ", raw_str)
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["non_letters_to_spaces"])',
+                    ShortRepr(raw_str),
+                )
+            return raw_str.translate(translation_tables["non_letters_to_spaces"])
 
         def remove_non_letters(raw_str):
             """Remove all non-letter (i.e. not A-Z) characters in given string
@@ -271,8 +785,11 @@ re.sub(
             '  joe is the best  '
             """
             if verbose:
-                print(f're.sub("[^a-zA-Z \\n]", "", "{raw_str}")')
-            return re.sub(r"[^a-zA-Z \n]", "", raw_str)
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["remove_non_letters"])',
+                    ShortRepr(raw_str),
+                )
+            return raw_str.translate(translation_tables["remove_non_letters"])
 
         def join_single_space_separated_letters_together(raw_str):
             """Removes the space characters between sequences of single letter characters separated by a single space
@@ -285,21 +802,31 @@ re.sub(
             'a  BcD ef  gh  '
             """
             if verbose:
-                print(f're.sub(r"\\b([a-zA-Z]) (?=[a-zA-Z]\\b)", r"\\1", "{raw_str}")')
-            return re.sub(r"\b([a-zA-Z]) (?=[a-zA-Z]\b)", r"\1", raw_str)
+                _LOGGER.debug(
+                    '%s.sub(r"\\1", %s)',
+                    self._single_space_separated_letters_regex,
+                    ShortRepr(raw_str),
+                )
+            return self._single_space_separated_letters_regex.sub(r"\1", raw_str)
 
         def remove_non_printable_ascii_chars(raw_str):
             """Removes all characters from a given string which are not in the python constant 'string.printable'
+            (if unicode_aware=True, then only removes characters which are neither printable nor whitespace)
 
             Example Usage
             -------------
-            TODO
+            >>> string_cleaner = StringCleaner()
+            >>> string_cleaner.operations["remove_non_printable_ascii_chars"]("caf\\xe9\\x00 \\u200bbar")
+            'caf bar'
             """
             if verbose:
-                print(
-                    f'"".join(filter(lambda x: x in self.printable_ascii_chars, {raw_str}))'
+                _LOGGER.debug(
+                    '%s.translate(translation_tables["remove_non_printable_ascii_chars"])',
+                    ShortRepr(raw_str),
                 )
-            return "".join(filter(lambda x: x in self.printable_ascii_chars, raw_str))
+            return raw_str.translate(
+                translation_tables["remove_non_printable_ascii_chars"]
+            )
 
         self.operations["extract_domain_from_url"] = extract_domain_from_url
         self.operations[
@@ -324,12 +851,49 @@ re.sub(
         ] = remove_whitespace_at_start_and_end
         self.operations["remove_words_or_phrases"] = remove_words_or_phrases
         self.operations["to_lowercase"] = to_lowercase
+        for op_name, op_func in self.operations.items():
+            self.operations[op_name] = _accept_bytes(
+                op_func, _BYTES_OPERATIONS[op_name]
+            )
+        self._builtin_operations = dict(self.operations)
 
+        if setup_verbose_logging:
+            enable_verbose_logging(_LOGGER, logging.DEBUG)
         if self.verbose:
-            print("-- Initiated StringCleaner() --")
-            print("available string-cleaning operations:")
-            for op_name in self.operations:
-                print(f"\to {op_name}")
+            _LOGGER.info(
+                "-- Initiated StringCleaner() --\navailable string-cleaning operations:\n%s",
+                "\n".join(f"\to {op_name}" for op_name in self.operations),
+            )
+
+    def _phrase_remover_for(
+        self, remove_list: typing.Sequence[str], enforce_word_boundaries: bool
+    ) -> _PhraseRemover:
+        """Returns the _PhraseRemover for [remove_list], building it only once per remove list
+
+        The same remove list is usually passed for every string, so (rather than copying and hashing
+        a possibly very long list for every string) the remover is reused while the same list object,
+        of the same length, is passed. This check costs the same however long the list is, so it does
+        not notice a phrase being replaced in place (e.g. remove_list[0] = "ltd")
+        """
+        cache_key: typing.Tuple[int, bool] = (id(remove_list), enforce_word_boundaries)
+        cached = self._phrase_removers.get(cache_key)
+        if (
+            cached is not None
+            and cached[0] is remove_list
+            and cached[1] == len(remove_list)
+        ):
+            return cached[2]
+        remove_tuple: typing.Tuple[str, ...] = tuple(remove_list)
+        phrase_remover = _get_phrase_remover(remove_tuple, enforce_word_boundaries)
+        if isinstance(remove_list, (list, tuple)):
+            if len(self._phrase_removers) >= 32:
+                self._phrase_removers.clear()
+            self._phrase_removers[cache_key] = (
+                remove_list,
+                len(remove_tuple),
+                phrase_remover,
+            )
+        return phrase_remover
 
     def apply_sequential_operations(
         self,
@@ -367,3 +931,512 @@ re.sub(
                 raw_str = self.operations[op_name](raw_str)
 
         return raw_str
+
+    def compile(
+        self,
+        operation_names_list: typing.List[str],
+        operation_params_dict: typing.Optional[dict] = None,
+    ) -> "CompiledStringCleaner":
+        """Builds a reusable string cleaner which applies a fixed sequence of operations
+
+        The output is identical to that of apply_sequential_operations(), but all of the work
+        which does not depend on the input string is done once upfront:
+            - regex patterns are precompiled
+            - consecutive operations which act on each character independently (e.g. "remove_numbers",
+                "remove_punctuation", "to_lowercase") are merged into a single str.translate() pass
+            - no verbose output is printed per call
+
+        Parameters
+        ----------
+        operation_names_list: List[str]
+            A list containing the names of the operations to apply (in the order in which they will be applied)
+        operation_params_dict: dict, optional
+            Named parameters for string cleaning functions which require specific parameters
+            (same format as in apply_sequential_operations())
+
+        Returns
+        -------
+        CompiledStringCleaner
+            A callable object which takes a raw string and returns the cleaned string
+
+        Example Usage
+        -------------
+        >>> string_cleaner = StringCleaner(verbose=False)
+        >>> clean_company_name = string_cleaner.compile(
+        ...     ["remove_numbers", "remove_punctuation", "to_lowercase", "multiple_spaces_to_single_spaces"]
+        ... )
+        >>> clean_company_name("Stinc  Inc. (Est. 1985)")
+        'stinc inc est '
+        """
+        if operation_params_dict is None:
+            operation_params_dict = {}
+        steps: typing.List[typing.Callable[[str], str]] = []
+        char_funcs: typing.List[typing.Callable[[str], str]] = []
+        bytes_steps: typing.List[typing.Callable[[bytes], bytes]] = []
+        bytes_char_funcs: typing.List[typing.Callable[[str], str]] = []
+
+        def flush_char_funcs() -> None:
+            if char_funcs:
+                translation_table = _LazyTranslationTable(
+                    _chain_character_operations(list(char_funcs))
+                )
+                steps.append(operator.methodcaller("translate", translation_table))
+                char_funcs.clear()
+            if bytes_char_funcs:
+                bytes_steps.append(
+                    operator.methodcaller(
+                        "translate",
+                        *_bytes_translation(
+                            _chain_character_operations(list(bytes_char_funcs))
+                        ),
+                    )
+                )
+                bytes_char_funcs.clear()
+
+        for op_name in operation_names_list:
+            if op_name not in self.operations:
+                raise ValueError(
+                    f"unknown string cleaning operation '{op_name}'. Available operations are {list(self.operations)}"
+                )
+            op_params: dict = operation_params_dict.get(op_name, {})
+            if op_name in self._character_operations and self._is_builtin_operation(
+                op_name
+            ):
+                if (
+                    op_name == "to_lowercase"
+                    and _chain_character_operations(char_funcs)("\u03a3") == "\u03a3"
+                ):
+                    # str.lower() is context-dependent for capital sigma (it becomes final
+                    #   sigma at the end of a word) so it can't be done 1 character at a time #
+                    flush_char_funcs()
+                    steps.append(str.lower)
+                else:
+                    char_funcs.append(self._character_operations[op_name])
+                # bytes are always ASCII, so to_lowercase can always be merged #
+                bytes_char_funcs.append(_CHARACTER_OPERATIONS[op_name])
+                continue
+            flush_char_funcs()
+            steps.append(self._compile_operation(op_name, op_params))
+            if self._is_builtin_operation(op_name):
+                bytes_steps.append(
+                    functools.partial(_BYTES_OPERATIONS[op_name], **op_params)
+                )
+            else:
+                bytes_steps.append(
+                    functools.partial(self.operations[op_name], **op_params)
+                )
+        flush_char_funcs()
+
+        return CompiledStringCleaner(steps, operation_names_list, bytes_steps)
+
+    def _compile_operation(
+        self, op_name: str, op_params: dict
+    ) -> typing.Callable[[str], str]:
+        """Returns a fast single-argument version of the string cleaning operation [op_name]"""
+        if not self._is_builtin_operation(op_name):
+            # user-supplied operation #
+            return functools.partial(self.operations[op_name], **op_params)
+        if op_name == "extract_domain_from_url":
+            return _URL_DOMAIN_EXTRACTOR.scheme_and_host
+        if op_name == "join_single_space_separated_letters_together":
+            return functools.partial(
+                self._single_space_separated_letters_regex.sub, r"\1"
+            )
+        if op_name == "multiple_spaces_to_single_spaces":
+            return functools.partial(_MULTIPLE_SPACES_REGEX.sub, " ")
+        if op_name == "punctuation_to_spaces":
+            return functools.partial(self._punctuation_run_regex.sub, " ")
+        if op_name == "remove_whitespace_at_start_and_end":
+            return str.strip
+        if op_name == "remove_words_or_phrases":
+            if "remove_list" not in op_params:
+                raise ValueError(
+                    "operation 'remove_words_or_phrases' requires parameters 'remove_list' and 'enforce_word_boundaries' in operation_params_dict"
+                )
+            return _get_phrase_remover(
+                tuple(op_params["remove_list"]), op_params["enforce_word_boundaries"]
+            ).remove
+        return functools.partial(self.operations[op_name], **op_params)
+
+    def clean_many(  # pylint: disable=too-many-arguments
+        self,
+        strings: typing.Iterable[str],
+        operation_names_list: typing.List[str],
+        operation_params_dict: typing.Optional[dict] = None,
+        n_workers: int = 1,
+        chunksize: int = 10_000,
+        stream: bool = False,
+    ) -> typing.Union[list, typing.Iterator[str], typing.Any]:
+        """Applies the same sequence of string cleaning operations to every string in a collection
+
+        The operations are compiled once (see StringCleaner.compile()) and then applied to each string.
+        Results are always returned in the same order as the input strings.
+
+        Parameters
+        ----------
+        strings: Iterable[str]
+            Any iterable of strings (e.g. list, tuple, generator, numpy object array, pandas Series)
+        operation_names_list: List[str]
+            A list containing the names of the operations to apply (in the order in which they will be applied)
+        operation_params_dict: dict, optional
+            Named parameters for string cleaning functions which require specific parameters
+            (same format as in apply_sequential_operations())
+        n_workers: int, optional (default: 1)
+            Number of processes to split the work across
+            If 1, all of the work is done in the current process
+            Only the built-in string cleaning operations are available when n_workers > 1
+        chunksize: int, optional (default: 10,000)
+            Number of strings sent to a worker process at a time (ignored when n_workers=1)
+        stream: bool, optional (default: False)
+            If True, returns a generator which cleans the strings lazily as it is consumed, so that
+            memory use does not grow with the size of the input
+            (when n_workers > 1, at most 2*n_workers chunks are in progress at any one time)
+
+        Returns
+        -------
+        list, Iterator[str], numpy.ndarray or pandas.Series
+            If stream=True, a generator of cleaned strings
+            Otherwise, a container of the cleaned strings matching the input type:
+                a pandas.Series (with the same index and name) if a pandas.Series was provided,
+                a numpy object array if a numpy array was provided,
+                else a list
+
+        Example Usage
+        -------------
+        >>> string_cleaner = StringCleaner(verbose=False)
+        >>> string_cleaner.clean_many(
+        ...     ["Joe IS the best!!", "  Cat's pyjamas 123 "],
+        ...     operation_names_list=["to_lowercase", "remove_punctuation", "remove_numbers"],
+        ... )
+        ['joe is the best', '  cats pyjamas  ']
+        >>> for clean_str in string_cleaner.clean_many(
+        ...     open("huge_text_file.txt"),
+        ...     operation_names_list=["to_lowercase", "remove_punctuation"],
+        ...     n_workers=8,
+        ...     stream=True,
+        ... ):
+        ...     do_something(clean_str)
+        """
+        if operation_params_dict is None:
+            operation_params_dict = {}
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        compiled_string_cleaner: CompiledStringCleaner = self.compile(
+            operation_names_list, operation_params_dict
+        )
+        if n_workers == 1:
+            cleaned_strs: typing.Iterator[str] = map(compiled_string_cleaner, strings)
+        else:
+            self._raise_if_custom_operations(operation_names_list)
+            strings_iter: typing.Iterator[str] = iter(strings)
+            chunks: typing.Iterator[typing.List[str]] = iter(
+                lambda: list(itertools.islice(strings_iter, chunksize)), []
+            )
+            cleaned_strs = itertools.chain.from_iterable(
+                _map_in_worker_processes(
+                    _clean_chunk_in_worker,
+                    ((chunk,) for chunk in chunks),
+                    n_workers,
+                    initargs=(
+                        operation_names_list,
+                        operation_params_dict,
+                        self.unicode_aware,
+                    ),
+                )
+            )
+        if stream:
+            return cleaned_strs
+
+        pandas_module = sys.modules.get("pandas")
+        if pandas_module is not None and isinstance(strings, pandas_module.Series):
+            return pandas_module.Series(
+                list(cleaned_strs), index=strings.index, name=strings.name
+            )
+        numpy_module = sys.modules.get("numpy")
+        if numpy_module is not None and isinstance(strings, numpy_module.ndarray):
+            cleaned_array = numpy_module.empty(len(strings), dtype=object)
+            cleaned_array[:] = list(cleaned_strs)
+            return cleaned_array
+        return list(cleaned_strs)
+
+    def clean_file(  # pylint: disable=too-many-arguments
+        self,
+        in_path: str,
+        out_path: str,
+        operation_names_list: typing.List[str],
+        operation_params_dict: typing.Optional[dict] = None,
+        n_workers: int = 1,
+        chunk_bytes: int = 4 * 1024 * 1024,
+        encoding: str = "utf-8",
+        errors: str = "strict",
+    ) -> None:
+        """Applies the same sequence of string cleaning operations to every line of a text file,
+        writing the cleaned lines (in the same order) to a new file
+
+        The input file is memory-mapped and split into chunks of roughly [chunk_bytes] bytes (always
+        on line boundaries). The chunks are cleaned in parallel by [n_workers] processes (which each
+        read their own chunks directly from the input file) and written out in order. Peak memory use
+        depends on [chunk_bytes] and [n_workers], not on the size of the file.
+
+        Notes
+        -----
+        Lines are split on "\\n" (so any "\\r" of a "\\r\\n" line ending is treated as part of the line)
+        The file encoding must be ASCII-compatible (e.g. utf-8, latin-1) so that "\\n" is always the byte b"\\n"
+        Only the built-in string cleaning operations are available when n_workers > 1
+
+        Parameters
+        ----------
+        in_path: str
+            Path to the text file to clean
+        out_path: str
+            Path to write the cleaned text file to (must be different to [in_path])
+        operation_names_list: List[str]
+            A list containing the names of the operations to apply to each line
+            (in the order in which they will be applied)
+        operation_params_dict: dict, optional
+            Named parameters for string cleaning functions which require specific parameters
+            (same format as in apply_sequential_operations())
+        n_workers: int, optional (default: 1)
+            Number of processes to split the work across
+            If 1, all of the work is done in the current process
+        chunk_bytes: int, optional (default: 4MiB)
+            Approximate size of each chunk of the input file processed at a time
+        encoding: str, optional (default: "utf-8")
+            Encoding of the input file (the output file is written in the same encoding)
+        errors: str, optional (default: "strict")
+            How to handle encoding/decoding errors (passed to bytes.decode() and str.encode())
+
+        Example Usage
+        -------------
+        >>> string_cleaner = StringCleaner(verbose=False)
+        >>> string_cleaner.clean_file(
+        ...     in_path="raw_text_dump.txt",
+        ...     out_path="clean_text_dump.txt",
+        ...     operation_names_list=["to_lowercase", "remove_punctuation", "multiple_spaces_to_single_spaces"],
+        ...     n_workers=8,
+        ... )
+        """
+        if operation_params_dict is None:
+            operation_params_dict = {}
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        if chunk_bytes < 1:
+            raise ValueError("chunk_bytes must be at least 1")
+        if os.path.abspath(in_path) == os.path.abspath(out_path):
+            raise ValueError("in_path and out_path must be different files")
+        compiled_string_cleaner: CompiledStringCleaner = self.compile(
+            operation_names_list, operation_params_dict
+        )
+        file_chunks = _file_chunks_on_line_boundaries(in_path, chunk_bytes)
+        if n_workers == 1:
+
+            def clean_file_chunk(start: int, end: int) -> bytes:
+                with open(in_path, "rb") as in_file:
+                    in_file.seek(start)
+                    text_bytes: bytes = in_file.read(end - start)
+                return _clean_lines(
+                    text_bytes, compiled_string_cleaner, encoding, errors
+                )
+
+            cleaned_chunks: typing.Iterator[bytes] = itertools.starmap(
+                clean_file_chunk, file_chunks
+            )
+        else:
+            self._raise_if_custom_operations(operation_names_list)
+            cleaned_chunks = _map_in_worker_processes(
+                _clean_file_chunk_in_worker,
+                ((in_path, start, end, encoding, errors) for start, end in file_chunks),
+                n_workers,
+                initargs=(
+                    operation_names_list,
+                    operation_params_dict,
+                    self.unicode_aware,
+                ),
+            )
+        with open(out_path, "wb") as out_file:
+            for cleaned_chunk in cleaned_chunks:
+                out_file.write(cleaned_chunk)
+
+    def _is_builtin_operation(self, op_name: str) -> bool:
+        """Whether [op_name] is still the built-in string cleaning operation of that name
+        (False for a built-in operation replaced by the user, and for a newly named user operation)"""
+        return self.operations[op_name] is self._builtin_operations.get(op_name)
+
+    def _raise_if_custom_operations(
+        self, operation_names_list: typing.List[str]
+    ) -> None:
+        """Raises an error if any of the operations in [operation_names_list] are user-supplied functions
+        (replaced or newly added, which can't be sent to worker processes)"""
+        custom_op_names = [
+            op_name
+            for op_name in operation_names_list
+            if not self._is_builtin_operation(op_name)
+        ]
+        if custom_op_names:
+            raise ValueError(
+                f"custom operations {custom_op_names} can only be used with n_workers=1"
+            )
+
+
+class CompiledStringCleaner:
+    """A fixed sequence of string-cleaning operations, prepared once by StringCleaner.compile()
+    and then applied to as many strings as required
+
+    Example Usage
+    -------------
+    >>> string_cleaner = StringCleaner(verbose=False)
+    >>> clean = string_cleaner.compile(["to_lowercase", "remove_punctuation"])
+    >>> clean("J!o@e#")
+    'joe'
+    >>> clean.operation_names_list
+    ['to_lowercase', 'remove_punctuation']
+    >>> clean(b"J!o@e#")
+    b'joe'
+    >>> record = bytearray(b"J!o@e#")
+    >>> clean.clean_inplace(record)
+    >>> record
+    bytearray(b'joe')
+    """
+
+    def __init__(
+        self,
+        steps: typing.List[typing.Callable[[str], str]],
+        operation_names_list: typing.List[str],
+        bytes_steps: typing.List[typing.Callable[[bytes], bytes]],
+    ) -> None:
+        self._steps = tuple(steps)
+        self._bytes_steps = tuple(bytes_steps)
+        self.operation_names_list = list(operation_names_list)
+
+    def __call__(self, raw_str: typing.Union[str, bytes, bytearray, memoryview]):
+        """Applies the compiled sequence of string-cleaning operations to [raw_str]
+
+        bytes-like input is cleaned as ASCII without being decoded (see StringCleaner)
+        """
+        if isinstance(raw_str, _BYTES_LIKE):
+            return _apply_bytes_operation(self._clean_bytes, raw_str)
+        for step in self._steps:
+            raw_str = step(raw_str)
+        return raw_str
+
+    def _clean_bytes(self, raw_bytes: typing.Union[bytes, bytearray]) -> bytes:
+        """Applies the compiled sequence of bytes operations to [raw_bytes]"""
+        for bytes_step in self._bytes_steps:
+            raw_bytes = bytes_step(raw_bytes)
+        return raw_bytes
+
+    def clean_inplace(self, buffer: bytearray) -> None:
+        """Cleans the contents of [buffer], replacing its contents with the cleaned bytes
+
+        This allows a reusable buffer (e.g. a record read with file.readinto()) to be cleaned
+        without creating any str objects
+        """
+        buffer[:] = self._clean_bytes(buffer)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompiledStringCleaner(operation_names_list={self.operation_names_list})"
+        )
+
+
+if __name__ == "__main__":
+    # benchmark the translation-table operations against their original implementations #
+    import random
+    import timeit
+
+    legacy_operations: typing.Dict[str, typing.Callable[[str], str]] = {
+        "non_letters_to_spaces": lambda raw_str: re.sub("[^a-zA-Z]", " ", raw_str),
+        "numbers_to_spaces": lambda raw_str: raw_str.translate(
+            str.maketrans("0123456789", " " * len("0123456789"))
+        ),
+        "remove_non_letters": lambda raw_str: re.sub(r"[^a-zA-Z \n]", "", raw_str),
+        "remove_non_printable_ascii_chars": lambda raw_str: "".join(
+            filter(lambda x: x in string.printable, raw_str)
+        ),
+        "remove_numbers": lambda raw_str: raw_str.translate(
+            str.maketrans("", "", "0123456789")
+        ),
+        "remove_punctuation": lambda raw_str: re.sub(r"[^A-Za-z0-9 ]+", "", raw_str),
+        "remove_spaces": lambda raw_str: re.sub(" ", "", raw_str),
+    }
+    benchmark_chain: typing.List[str] = [
+        "newlines_to_spaces",
+        "remove_non_printable_ascii_chars",
+        "remove_numbers",
+        "remove_punctuation",
+        "to_lowercase",
+    ]
+    random.seed(69)
+    documents: typing.Dict[str, str] = {
+        "1MB ascii": "".join(random.choices(string.printable, k=1_000_000)),
+        "1MB mixed unicode": "".join(
+            random.choices(string.printable + "éüßΣ日本語€\u200b", k=1_000_000)
+        ),
+    }
+    string_cleaner = StringCleaner(verbose=False)
+    compiled_chain = string_cleaner.compile(benchmark_chain)
+    for doc_name, document in documents.items():
+        print(f"\n-- {doc_name} document (mean seconds per call) --")
+        for op_name, legacy_op in legacy_operations.items():
+            legacy_secs = timeit.timeit(lambda: legacy_op(document), number=5) / 5
+            table_secs = (
+                timeit.timeit(
+                    lambda: string_cleaner.operations[op_name](document), number=5
+                )
+                / 5
+            )
+            print(
+                f"{op_name:<35} original: {legacy_secs:.5f}  translation table: {table_secs:.5f}  ({legacy_secs/table_secs:.1f}x)"
+            )
+        legacy_chain_secs = (
+            timeit.timeit(
+                lambda: functools.reduce(
+                    lambda raw_str, op_name: legacy_operations.get(
+                        op_name, string_cleaner.operations[op_name]
+                    )(raw_str),
+                    benchmark_chain,
+                    document,
+                ),
+                number=5,
+            )
+            / 5
+        )
+        compiled_chain_secs = (
+            timeit.timeit(lambda: compiled_chain(document), number=5) / 5
+        )
+        print(
+            f"{'chain of ' + str(len(benchmark_chain)) + ' operations':<35} original: {legacy_chain_secs:.5f}  compiled (1 pass): {compiled_chain_secs:.5f}  ({legacy_chain_secs/compiled_chain_secs:.1f}x)"
+        )
+
+    # benchmark the hot-path overhead of (lazy) verbose logging #
+    short_document: str = documents["1MB ascii"][:100]
+    string_cleaner_verbose = StringCleaner(verbose=True)
+    _LOGGER.setLevel(logging.WARNING)  # verbose=True, but DEBUG logging switched off
+    n_calls: int = 100_000
+    print("\n-- logging overhead of 1 operation (mean microseconds per call) --")
+    for doc_name, document in (
+        ("100 char", short_document),
+        ("1MB ascii", documents["1MB ascii"]),
+    ):
+        n_doc_calls: int = n_calls if len(document) < 1_000 else 20
+        raw_secs = timeit.timeit(lambda: document.strip(), number=n_doc_calls)
+        quiet_secs = timeit.timeit(
+            lambda: string_cleaner.operations["remove_whitespace_at_start_and_end"](
+                document
+            ),
+            number=n_doc_calls,
+        )
+        logging_off_secs = timeit.timeit(
+            lambda: string_cleaner_verbose.operations[
+                "remove_whitespace_at_start_and_end"
+            ](document),
+            number=n_doc_calls,
+        )
+        eager_format_secs = timeit.timeit(
+            lambda: f'"{document}".strip()', number=n_doc_calls
+        )
+        print(
+            f"{doc_name + ' input':<15} str.strip(): {1e6*raw_secs/n_doc_calls:.3f}  verbose=False: {1e6*quiet_secs/n_doc_calls:.3f}  verbose=True (DEBUG off): {1e6*logging_off_secs/n_doc_calls:.3f}  (eager f-string message alone: {1e6*eager_format_secs/n_doc_calls:.3f})"
+        )
@@ -0,0 +1,208 @@
+"""Defines class UrlDomainExtractor"""
+
+import functools
+import re
+import sys
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_SCHEME_AND_HOST_REGEX = re.compile("(?P<url>https?://[^/?]+)")
+# (a "scheme:" followed only by digits is the host:port of a URL without a scheme, e.g. "localhost:8000") #
+_HOST_REGEX = re.compile(
+    r"^\s*(?:[a-zA-Z][a-zA-Z0-9+.\-]*:(?!\d+(?:[/?#\s]|$)))?(?://)?(?:[^@/?#\s]*@)?(\[[^\]]*\]|[^:/?#\s]+)"
+)
+_MAX_CACHED_URL_LENGTH = 2_048  # longer inputs (e.g. whole documents) are not memoised
+
+# A compact bundled subset of the public suffix list (https://publicsuffix.org/), covering the
+#   most common multi-label public suffixes. Any top-level domain not listed here is treated as
+#   a public suffix (the public suffix list's default rule). For full accuracy, download the full
+#   list and pass its path to UrlDomainExtractor(public_suffix_list_path=...)
+_BUNDLED_PUBLIC_SUFFIXES: FrozenSet[str] = frozenset(
+    """
+    ac.il ac.in ac.jp ac.kr ac.nz ac.uk ac.za
+    co.id co.il co.in co.jp co.ke co.kr co.nz co.th co.uk co.za
+    com.ar com.au com.br com.cn com.co com.eg com.hk com.mx com.my com.ng com.pe com.ph
+    com.pk com.sa com.sg com.tr com.tw com.ua com.vn
+    edu.au edu.cn edu.sg gob.mx go.jp gov.au gov.br gov.cn gov.in gov.sg gov.uk gov.za govt.nz
+    ltd.uk me.uk ne.jp net.au net.br net.cn net.in net.nz net.uk net.za nhs.uk or.jp or.kr
+    org.au org.br org.cn org.il org.in org.mx org.nz org.uk org.za plc.uk police.uk sch.uk web.za
+    appspot.com azurewebsites.net blogspot.com cloudfront.net firebaseapp.com github.io gitlab.io
+    herokuapp.com netlify.app pages.dev vercel.app web.app workers.dev
+    """.split()
+)
+
+
+class UrlDomainExtractor:
+    """High-throughput extraction of the scheme+host, host or registrable domain from URLs
+
+    Results are memoised in bounded LRU caches, so that repeated URLs (and repeated hosts) are
+    only ever processed once. The registrable domain (e.g. "bbc.co.uk" for "https://www.bbc.co.uk/news")
+    is found using a public suffix index (a compact bundled one by default, or the full list from a file)
+
+    Example:
+        >>> extractor = UrlDomainExtractor()
+        >>> extractor.scheme_and_host("https://www.google.co.uk/media/contact-us.php")
+        'https://www.google.co.uk'
+        >>> extractor.host("https://joe@www.google.co.uk:8080/media")
+        'www.google.co.uk'
+        >>> extractor.registrable_domain("https://www.google.co.uk/media/contact-us.php")
+        'google.co.uk'
+        >>> extractor.extract_many(
+        ...     ["https://a.b.github.io/x", "http://news.bbc.co.uk", "https://192.168.0.1/admin"],
+        ...     part="registrable_domain",
+        ... )
+        ['b.github.io', 'bbc.co.uk', None]
+        >>> import pandas as pd
+        >>> extractor.extract_many(pd.Series(["https://www.google.com/a", "https://maps.google.com/b"]), part="registrable_domain")
+        0    google.com
+        1    google.com
+        dtype: object
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 65_536,
+        public_suffix_list_path: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            cache_size (int): Maximum number of entries in each of the LRU caches (of URLs and of hosts)
+            public_suffix_list_path (str, optional): Path to a file in the format of the public suffix
+                list (https://publicsuffix.org/list/public_suffix_list.dat), including wildcard (*.) and
+                exception (!) rules. If omitted, a compact bundled subset of the list is used
+        """
+        self._public_suffixes: FrozenSet[str] = _BUNDLED_PUBLIC_SUFFIXES
+        self._wildcard_suffixes: FrozenSet[str] = frozenset()
+        self._exception_suffixes: FrozenSet[str] = frozenset()
+        if public_suffix_list_path is not None:
+            (
+                self._public_suffixes,
+                self._wildcard_suffixes,
+                self._exception_suffixes,
+            ) = self._read_public_suffix_list(public_suffix_list_path)
+        self._cached_scheme_and_host: Callable[[str], str] = functools.lru_cache(
+            maxsize=cache_size
+        )(self._scheme_and_host)
+        self._cached_host: Callable[[str], Optional[str]] = functools.lru_cache(
+            maxsize=cache_size
+        )(self._host)
+        self._cached_registrable_domain_of_host: Callable[
+            [str], Optional[str]
+        ] = functools.lru_cache(maxsize=cache_size)(self._registrable_domain_of_host)
+
+    @staticmethod
+    def _read_public_suffix_list(
+        public_suffix_list_path: str,
+    ) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+        """Reads the (normal, wildcard, exception) rules from a public suffix list file"""
+        public_suffixes: set = set()
+        wildcard_suffixes: set = set()
+        exception_suffixes: set = set()
+        with open(public_suffix_list_path, "r", encoding="utf-8") as file:
+            for line in file:
+                rule: str = line.strip().split(" ")[0].lower()
+                if not rule or rule.startswith("//"):
+                    continue
+                if rule.startswith("!"):
+                    exception_suffixes.add(rule[1:])
+                elif rule.startswith("*."):
+                    wildcard_suffixes.add(rule[2:])
+                else:
+                    public_suffixes.add(rule)
+        return (
+            frozenset(public_suffixes),
+            frozenset(wildcard_suffixes),
+            frozenset(exception_suffixes),
+        )
+
+    @staticmethod
+    def _scheme_and_host(url: str) -> str:
+        return " ".join(_SCHEME_AND_HOST_REGEX.findall(url))
+
+    @staticmethod
+    def _host(url: str) -> Optional[str]:
+        host_match = _HOST_REGEX.match(url)
+        if host_match is None:
+            return None
+        return host_match.group(1).rstrip(".").lower() or None
+
+    def _registrable_domain_of_host(self, host: str) -> Optional[str]:
+        """Returns the public suffix of [host] plus 1 more label (None if there isn't one)"""
+        if host.startswith("[") or host.replace(".", "").isdigit():
+            return None  # IP address
+        labels: List[str] = host.split(".")
+        # default rule: every top-level domain is a public suffix #
+        n_public_suffix_labels: int = 1
+        for label_idx in range(len(labels)):
+            candidate_suffix: str = ".".join(labels[label_idx:])
+            if candidate_suffix in self._exception_suffixes:
+                n_public_suffix_labels = len(labels) - label_idx - 1
+                break
+            if candidate_suffix in self._public_suffixes or (
+                label_idx + 1 < len(labels)
+                and ".".join(labels[label_idx + 1 :]) in self._wildcard_suffixes
+            ):
+                n_public_suffix_labels = len(labels) - label_idx
+                break
+        if len(labels) <= n_public_suffix_labels:
+            return None
+        return ".".join(labels[-(n_public_suffix_labels + 1) :])
+
+    def scheme_and_host(self, url: str) -> str:
+        """Returns the scheme and host (e.g. "https://www.google.co.uk") of every http(s) URL in [url]
+        (separated by spaces if there are multiple URLs in [url])"""
+        if len(url) > _MAX_CACHED_URL_LENGTH:
+            return self._scheme_and_host(url)
+        return self._cached_scheme_and_host(url)
+
+    def host(self, url: str) -> Optional[str]:
+        """Returns the (lowercase) host of [url] (the scheme is optional), without any user info or port"""
+        if len(url) > _MAX_CACHED_URL_LENGTH:
+            return self._host(url)
+        return self._cached_host(url)
+
+    def registrable_domain(self, url: str) -> Optional[str]:
+        """Returns the registrable domain of [url] (the public suffix plus 1 more label) e.g. "bbc.co.uk"
+        Returns None if the host is an IP address or is itself a public suffix"""
+        host: Optional[str] = self.host(url)
+        if host is None:
+            return None
+        return self._cached_registrable_domain_of_host(host)
+
+    def extract_many(self, urls: Iterable[str], part: str = "scheme_and_host") -> Any:
+        """Extracts the same part from every URL in a collection
+
+        Args:
+            urls (Iterable[str]): Any iterable of URLs (e.g. list, generator, pandas Series)
+            part (str): One of ["scheme_and_host", "host", "registrable_domain"]
+
+        Returns:
+            list or pandas.Series: The extracted parts, in input order
+                If [urls] is a pandas Series, a Series with the same index is returned. Each distinct
+                URL in the Series is only processed once (and missing values stay missing)
+        """
+        part_funcs: Dict[str, Callable[[str], Optional[str]]] = {
+            "scheme_and_host": self.scheme_and_host,
+            "host": self.host,
+            "registrable_domain": self.registrable_domain,
+        }
+        if part not in part_funcs:
+            raise ValueError(f"part must be one of {list(part_funcs)}")
+        part_func = part_funcs[part]
+        pandas_module = sys.modules.get("pandas")
+        if pandas_module is not None and isinstance(urls, pandas_module.Series):
+            numpy_module = sys.modules["numpy"]
+            codes, unique_urls = pandas_module.factorize(urls)
+            unique_results = numpy_module.empty(len(unique_urls) + 1, dtype=object)
+            unique_results[:-1] = [part_func(url) for url in unique_urls]
+            return pandas_module.Series(
+                unique_results[codes], index=urls.index, name=urls.name
+            )
+        return list(map(part_func, urls))
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Returns the hit/miss statistics of each of the LRU caches"""
+        return {
+            "scheme_and_host": self._cached_scheme_and_host.cache_info(),
+            "host": self._cached_host.cache_info(),
+            "registrable_domain_of_host": self._cached_registrable_domain_of_host.cache_info(),
+        }
@@ -1,21 +1,47 @@
 """Convenience functions for fast work in python
 
 Available modules:
+    - AsyncDataBatcher
+    - call_with_retries
+    - CircuitBreaker
     - DataBatcher
+    - get_default_worker_pool
     - list_all_python_imports
+    - ParallelRunTelemetry
+    - ParallelWorkerPool
     - print_progress_bar
+    - RequestHedger
     - retry_function_call
+    - RetryBudget
+    - retry_with_backoff
+    - run_multi_host_worker
     - run_python_function_in_parallel
+    - SharedArray
 
 """
 
 # pylint: disable=unused-import
+from joes_giant_toolbox.all.async_data_batcher import AsyncDataBatcher
+from joes_giant_toolbox.all.circuit_breaker import CircuitBreaker
 from joes_giant_toolbox.all.data_batcher import DataBatcher
 from joes_giant_toolbox.all.list_all_python_imports import list_all_python_imports
+from joes_giant_toolbox.all.multi_host import run_multi_host_worker
+from joes_giant_toolbox.all.parallel_run_telemetry import ParallelRunTelemetry
+from joes_giant_toolbox.all.parallel_worker_pool import (
+    ParallelWorkerPool,
+    get_default_worker_pool,
+)
 from joes_giant_toolbox.all.print_progress_bar import print_progress_bar
+from joes_giant_toolbox.all.request_hedger import RequestHedger
+from joes_giant_toolbox.all.retry_budget import RetryBudget
 from joes_giant_toolbox.all.retry_function_call import retry_function_call
+from joes_giant_toolbox.all.retry_with_backoff import (
+    call_with_retries,
+    retry_with_backoff,
+)
 from joes_giant_toolbox.all.run_python_function_in_parallel import (
     run_python_function_in_parallel,
 )
+from joes_giant_toolbox.all.shared_array import SharedArray
 
 # pylint: enable=unused-import
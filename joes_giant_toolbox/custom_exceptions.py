@@ -8,3 +8,14 @@ class MaxRetriesExceededError(Exception):
 
     def __init__(self, message):
         super().__init__(message)
+
+
+class CircuitOpenError(Exception):
+    """Error raised (without calling the protected function) while a circuit breaker is open"""
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class RetryBudgetExhaustedError(MaxRetriesExceededError):
+    """Error raised if a retry was needed, but the shared retry budget (or its rate limit) did not allow it"""
@@ -0,0 +1,101 @@
+"""
+Logging shared across the joes-giant-toolbox package
+
+Every module logs to its own logger (obtained using get_logger(__name__)), all of which sit under the
+package logger "joes_giant_toolbox". Log messages are formatted lazily (using the logging module's
+%-style arguments), so that a message costs nothing unless it is actually going to be emitted, and
+potentially huge inputs are only ever included in messages in truncated form (by wrapping them in ShortRepr)
+
+Example Usage
+-------------
+>>> import logging
+>>> logging.basicConfig()
+>>> logging.getLogger("joes_giant_toolbox").setLevel(logging.DEBUG)     # all toolbox diagnostics
+>>> logging.getLogger("joes_giant_toolbox.all.string_cleaner").setLevel(logging.WARNING)  # silence one module
+"""
+
+import logging
+import reprlib
+import sys
+from typing import Any, List, Optional
+
+PACKAGE_LOGGER_NAME = "joes_giant_toolbox"
+
+# a library must never emit log records unless the application asks for them #
+logging.getLogger(PACKAGE_LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+def get_logger(module_name: str) -> logging.Logger:
+    """Returns the logger for a toolbox module (intended usage: _LOGGER = get_logger(__name__))"""
+    if module_name == "__main__" or not module_name.startswith(PACKAGE_LOGGER_NAME):
+        module_name = f"{PACKAGE_LOGGER_NAME}.{module_name}"
+    return logging.getLogger(module_name)
+
+
+class ShortRepr:
+    """Defers the repr() of an object until a log record containing it is actually formatted, and
+    truncates it (without ever building the full repr, even for a 1 MB string)
+
+    Example Usage
+    -------------
+    >>> _LOGGER.debug("cleaning %s", ShortRepr(huge_string))    # nothing happens unless DEBUG is enabled
+    >>> str(ShortRepr("x" * 1_000_000, max_chars=10))
+    "'xxxxxxxxxx'... (1000000 chars)"
+    """
+
+    __slots__ = ("obj", "max_chars")
+
+    def __init__(self, obj: Any, max_chars: int = 80) -> None:
+        self.obj = obj
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        if isinstance(self.obj, (str, bytes, bytearray)):
+            if len(self.obj) <= self.max_chars:
+                return repr(self.obj)
+            return f"{repr(self.obj[: self.max_chars])}... ({len(self.obj)} chars)"
+        short_repr = reprlib.Repr()
+        short_repr.maxstring = short_repr.maxother = short_repr.maxlong = self.max_chars
+        return short_repr.repr(self.obj)
+
+    __repr__ = __str__
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """A StreamHandler which always writes to the current sys.stdout (like print() does)"""
+
+    @property  # type: ignore[override]
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+_STDOUT_HANDLER: Optional[logging.Handler] = None
+
+
+def enable_verbose_logging(logger: logging.Logger, level: int = logging.INFO) -> None:
+    """Makes sure that records from [logger] at [level] and above are emitted
+
+    This is what the verbose=True arguments across the toolbox do (they used to print() instead)
+    Logging configuration made by the application always takes precedence:
+        - the level of [logger] is only set if neither it nor any toolbox logger above it has a level
+        - messages are only written to stdout if the root logger has no handlers of its own
+    """
+    global _STDOUT_HANDLER
+    toolbox_loggers: List[logging.Logger] = []
+    current_logger: Optional[logging.Logger] = logger
+    while current_logger is not None and current_logger.name.startswith(
+        PACKAGE_LOGGER_NAME
+    ):
+        toolbox_loggers.append(current_logger)
+        current_logger = current_logger.parent
+    if all(x.level == logging.NOTSET for x in toolbox_loggers):
+        logger.setLevel(level)
+    package_logger = logging.getLogger(PACKAGE_LOGGER_NAME)
+    if _STDOUT_HANDLER is None and not logging.getLogger().handlers:
+        _STDOUT_HANDLER = _StdoutHandler()
+        _STDOUT_HANDLER.setFormatter(logging.Formatter("%(message)s"))
+        package_logger.addHandler(_STDOUT_HANDLER)
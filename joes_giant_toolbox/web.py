@@ -3,10 +3,13 @@
 Available modules:
     - anonymous_view_public_linkedin_page
     - duckduckgo_search_multipage
+    - HTTPConnectionPool
     - make_url_request
+    - make_url_requests
     - parse_mime_email_parts
     - require_api_key
     - scrape_webpage_and_all_linked_webpages
+    - UrlDomainExtractor
     - url_to_filename_to_url_mapper
 """
 
@@ -19,8 +22,12 @@ from joes_giant_toolbox.all.duckduckgo_search_multipage import (
     duckduckgo_search_multipage,
 )
 
+from joes_giant_toolbox.all.http_connection_pool import HTTPConnectionPool
+
 from joes_giant_toolbox.all.make_url_request import make_url_request
 
+from joes_giant_toolbox.all.make_url_requests import make_url_requests
+
 from joes_giant_toolbox.all.parse_mime_email_parts import parse_mime_email_parts
 
 from joes_giant_toolbox.all.require_api_key import require_api_key
@@ -29,6 +36,8 @@ from joes_giant_toolbox.all.scrape_webpage_and_all_linked_webpages import (
     scrape_webpage_and_all_linked_webpages,
 )
 
+from joes_giant_toolbox.all.url_domain_extractor import UrlDomainExtractor
+
 from joes_giant_toolbox.all.url_to_filename_to_url_mapper import (
     url_to_filename_to_url_mapper,
 )
@@ -0,0 +1,44 @@
+import asyncio
+
+import joes_giant_toolbox.convenience
+
+
+def test_flushes_on_size_latency_and_end_of_data():
+    """a batch must be emitted when full, when its first item has waited too long, and when the data ends"""
+
+    async def trickle():
+        for x in range(7):
+            await asyncio.sleep(0.2 if x == 5 else 0)
+            yield x
+
+    async def collect_batches():
+        batcher = joes_giant_toolbox.convenience.AsyncDataBatcher(
+            trickle(), max_batch_size=3, max_latency_seconds=0.05
+        )
+        return [batch async for batch in batcher], batcher
+
+    func_output, batcher = asyncio.run(collect_batches())
+    expected_output = [(0, 1, 2), (3, 4), (5, 6)]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+    flush_reasons = [x.flush_reason for x in batcher.batch_stats]
+    assert flush_reasons == ["max_batch_size", "max_latency", "end_of_data"]
+    assert batcher.batch_stats[0].fill_fraction == 1.0
+    assert batcher.stats_summary()["n_items"] == 7
+
+
+def test_flushes_on_max_batch_bytes():
+    """items must be packed greedily under the byte budget (an oversized item gets a batch of its own)"""
+
+    async def collect_batches():
+        batcher = joes_giant_toolbox.convenience.AsyncDataBatcher(
+            ["aa", "bbbb", "c", "ddddddddd", "e"], max_batch_bytes=5
+        )
+        return [batch async for batch in batcher]
+
+    func_output = asyncio.run(collect_batches())
+    expected_output = [("aa",), ("bbbb", "c"), ("ddddddddd",), ("e",)]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
@@ -0,0 +1,196 @@
+import itertools
+import json
+import threading
+import time
+import warnings
+
+import pytest
+
+import joes_giant_toolbox.convenience
+
+
+def test_batches_match_for_sequences_and_iterators():
+    """a list and a generator over the same data must be batched identically"""
+    my_data = list(range(12))
+    for batcher_kwargs, expected_output in (
+        (
+            {"batch_pattern": (1, 2, 4)},
+            [(0,), (1, 2), (3, 4, 5, 6), (7, 8, 9, 10, 11)],
+        ),
+        (
+            {"fixed_batch_size": 5},
+            [(0, 1, 2, 3, 4), (5, 6, 7, 8, 9), (10, 11)],
+        ),
+        ({"fixed_batch_size": 4}, [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9, 10, 11)]),
+    ):
+        for data in (my_data, tuple(my_data), (x for x in my_data)):
+            func_output = list(
+                joes_giant_toolbox.convenience.DataBatcher(data, **batcher_kwargs)
+            )
+            assert (
+                func_output == expected_output
+            ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+
+
+def test_unbounded_stream_is_batched_lazily():
+    """an infinite iterator must be batched without ever being fully consumed"""
+    data_batcher = joes_giant_toolbox.convenience.DataBatcher(
+        itertools.count(), fixed_batch_size=3
+    )
+    func_output = list(itertools.islice(data_batcher, 3))
+    expected_output = [(0, 1, 2), (3, 4, 5), (6, 7, 8)]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+
+
+def test_numpy_batches_are_views():
+    """batches of a numpy array must be views into the original array (no copying)"""
+    np = pytest.importorskip("numpy")
+    my_data = np.arange(10)
+    batches = list(
+        joes_giant_toolbox.convenience.DataBatcher(my_data, fixed_batch_size=4)
+    )
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert all(np.shares_memory(batch, my_data) for batch in batches)
+    assert (np.concatenate(batches) == my_data).all()
+
+
+def test_prefetch_gives_same_batches_and_propagates_errors():
+    """prefetching must not change the batches, and an error while reading the data must reach the consumer"""
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            (x for x in range(10)), batch_pattern=(1, 2), prefetch=2
+        )
+    )
+    expected_output = [(0,), (1, 2), (3, 4, 5, 6, 7, 8, 9)]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+
+    def failing_data():
+        yield from range(5)
+        raise KeyError("data source failed")
+
+    data_batcher = joes_giant_toolbox.convenience.DataBatcher(
+        failing_data(), fixed_batch_size=2, prefetch=3
+    )
+    assert next(data_batcher) == (0, 1)
+    assert next(data_batcher) == (2, 3)
+    with pytest.raises(KeyError, match="data source failed"):
+        next(data_batcher)
+
+
+def test_prefetch_thread_stops_when_closed_early():
+    """stopping early (via the context manager) must shut down the prefetch thread of an unbounded stream"""
+    with joes_giant_toolbox.convenience.DataBatcher(
+        itertools.count(), fixed_batch_size=3, prefetch=2
+    ) as data_batcher:
+        assert next(data_batcher) == (0, 1, 2)
+    assert not data_batcher._prefetch_thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(data_batcher)
+
+
+def test_close_from_another_thread_stops_waiting_consumer():
+    """a consumer waiting for a (slow) batch must stop when close() is called from another thread"""
+
+    def slow_data():
+        yield 0
+        time.sleep(60)
+        yield 1
+
+    data_batcher = joes_giant_toolbox.convenience.DataBatcher(
+        slow_data(), fixed_batch_size=1, prefetch=1
+    )
+    consumed_batches = []
+    consumer_thread = threading.Thread(
+        target=lambda: consumed_batches.extend(data_batcher), daemon=True
+    )
+    consumer_thread.start()
+    time.sleep(0.2)
+    data_batcher.close(timeout=0)
+    consumer_thread.join(timeout=2)
+    assert not consumer_thread.is_alive(), "consumer still waiting after close()"
+    assert consumed_batches == [(0,)], f"consumed_batches={consumed_batches}"
+
+
+def test_max_batch_bytes_packs_greedily_and_applies_oversize_policy():
+    """records must be packed greedily under the byte budget, and oversized records handled per the policy"""
+    my_data = ["aa", "bbbb", "c", "ddddddddd", "e"]
+    for oversize_policy, expected_output in (
+        ("own_batch", [("aa",), ("bbbb", "c"), ("ddddddddd",), ("e",)]),
+        ("skip", [("aa",), ("bbbb", "c"), ("e",)]),
+    ):
+        for data in (my_data, iter(my_data)):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                func_output = list(
+                    joes_giant_toolbox.convenience.DataBatcher(
+                        data, max_batch_bytes=5, oversize_policy=oversize_policy
+                    )
+                )
+            assert (
+                func_output == expected_output
+            ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+    with pytest.raises(ValueError):
+        list(
+            joes_giant_toolbox.convenience.DataBatcher(
+                my_data, max_batch_bytes=5, oversize_policy="raise"
+            )
+        )
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            "abcdefg", max_batch_bytes=100, fixed_batch_size=3
+        )
+    )
+    assert func_output == ["abc", "def", "g"], f"Observed Output: {func_output}"
+
+
+def test_max_batch_bytes_default_size_handles_scalars():
+    """Without a size_func, bytes input and numeric numpy input must be packed by their byte size
+    (rather than raising a TypeError because their datapoints have no len())"""
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(b"abcdefg", max_batch_bytes=3)
+    )
+    assert func_output == [b"abc", b"def", b"g"], f"Observed Output: {func_output}"
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            iter([1, 2.5, "abc"]), max_batch_bytes=100
+        )
+    )
+    assert func_output == [(1, 2.5, "abc")], f"Observed Output: {func_output}"
+    np = pytest.importorskip("numpy")
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            np.arange(10, dtype=np.int64), max_batch_bytes=32
+        )
+    )
+    assert [len(batch) for batch in func_output] == [4, 4, 2], f"{func_output}"
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            np.zeros((5, 3), dtype=np.float32), max_batch_bytes=24
+        )
+    )
+    assert [len(batch) for batch in func_output] == [2, 2, 1], f"{func_output}"
+
+
+def test_max_batch_bytes_dict_records_need_size_func():
+    """dict records must not be sized by their number of keys: without a size_func they raise a
+    TypeError, and with one they are packed by their serialised size"""
+    records = [
+        {"id": 1, "text": "a" * 100},
+        {"id": 2, "text": "b"},
+        {"id": 3, "text": "c"},
+    ]
+    with pytest.raises(TypeError, match="pass a size_func"):
+        list(joes_giant_toolbox.convenience.DataBatcher(records, max_batch_bytes=100))
+    func_output = list(
+        joes_giant_toolbox.convenience.DataBatcher(
+            records, max_batch_bytes=100, size_func=lambda x: len(json.dumps(x))
+        )
+    )
+    assert [[record["id"] for record in batch] for batch in func_output] == [
+        [1],
+        [2, 3],
+    ], f"Observed Output: {func_output}"
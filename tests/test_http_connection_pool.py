@@ -0,0 +1,125 @@
+import http.server
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from joes_giant_toolbox.all.http_connection_pool import HTTPConnectionPool
+from joes_giant_toolbox.all.make_url_request import make_url_request
+
+
+class _TestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/redirect":
+            self._respond(302, b"moved", location="/page?redirected=1")
+        elif self.path.startswith("/page"):
+            self._respond(200, f"content of {self.path}".encode("utf-8"))
+        else:
+            self._respond(404, b"not here")
+
+    def _respond(self, status_code, body, location=None):
+        self.send_response(status_code)
+        if location is not None:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def local_server_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _TestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_make_url_request_reuses_connections(local_server_url):
+    """Repeated requests to 1 host must share 1 connection, and return the same as urllib.request.urlopen()"""
+    connection_pool = HTTPConnectionPool(max_connections_per_host=2)
+    for path in ("/page", "/redirect", "/missing", "/page?x=1"):
+        url = local_server_url + path
+        pooled_response = make_url_request(
+            url, decode_format="utf-8", connection_pool=connection_pool
+        )
+        try:
+            with urllib.request.urlopen(url, timeout=10) as url_response:
+                expected_response = {
+                    "returned_content": url_response.read().decode("utf-8"),
+                    "response_status_code": url_response.status,
+                    "status_desc": "success",
+                }
+        except urllib.error.HTTPError as error:
+            expected_response = {
+                "returned_content": None,
+                "response_status_code": error.status,
+                "status_desc": error.reason,
+            }
+        assert (
+            pooled_response == expected_response
+        ), f"{path}: returned {pooled_response}, expected {expected_response}"
+    stats = connection_pool.stats()
+    assert (
+        stats["connections_opened"] == 1 and stats["connections_reused"] == 4
+    ), f"stats={stats}"
+
+    threads = [
+        threading.Thread(
+            target=make_url_request,
+            args=(local_server_url + "/page",),
+            kwargs={"connection_pool": connection_pool},
+        )
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (
+        connection_pool.stats()["connections_open"] <= 2
+    ), f"{connection_pool.stats()}"
+
+
+def test_connection_pool_wait_times_out_and_forgets_idle_hosts(local_server_url):
+    """A request waiting for a connection must give up after its timeout, and hosts whose idle
+    connections have all been closed must not be kept"""
+    connection_pool = HTTPConnectionPool(
+        max_connections_per_host=1, idle_timeout_seconds=0.05
+    )
+    connection, _ = connection_pool._acquire(  # pylint: disable=protected-access
+        "http", local_server_url.split("//")[1], timeout=10
+    )
+    started_at = time.perf_counter()
+    func_output = make_url_request(
+        local_server_url + "/page", timeout=0.2, connection_pool=connection_pool
+    )
+    elapsed_seconds = time.perf_counter() - started_at
+    assert (
+        func_output["status_desc"] == "request timed out" and elapsed_seconds < 2
+    ), f"{func_output=} {elapsed_seconds=}"
+    connection_pool._release(  # pylint: disable=protected-access
+        "http", local_server_url.split("//")[1], connection, reusable=True
+    )
+    time.sleep(1.1)
+    assert (
+        make_url_request(
+            "http://localhost:1/page", timeout=1, connection_pool=connection_pool
+        )["response_status_code"]
+        is None
+    )
+    stats = connection_pool.stats()
+    assert (
+        stats["connections_evicted_idle"] == 1 and stats["connections_open"] == 0
+    ), f"stats={stats}"
+    assert (
+        not connection_pool._idle  # pylint: disable=protected-access
+        and not connection_pool._n_open  # pylint: disable=protected-access
+    ), "closed hosts must be forgotten"
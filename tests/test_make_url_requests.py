@@ -0,0 +1,113 @@
+import asyncio
+import http.server
+import threading
+import time
+
+from joes_giant_toolbox.all.make_url_request import make_url_request
+from joes_giant_toolbox.all.make_url_requests import make_url_requests
+
+
+_ACTIVE_LOCK = threading.Lock()
+_ACTIVE_COUNTS = {"all_servers": 0, "max_all_servers": 0}
+
+
+class _CountingHandler(http.server.BaseHTTPRequestHandler):
+    """Responds after [path] milliseconds, recording the most concurrent requests seen by its server
+    (and by all servers together)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/trickle":
+            # (sends 1 byte every 0.1 seconds, so that no socket timeout is ever reached) #
+            self.send_response(200)
+            self.send_header("Content-Length", "30")
+            self.end_headers()
+            for _ in range(30):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.1)
+            return
+        with _ACTIVE_LOCK:
+            self.server.n_active += 1
+            self.server.max_active = max(self.server.max_active, self.server.n_active)
+            _ACTIVE_COUNTS["all_servers"] += 1
+            _ACTIVE_COUNTS["max_all_servers"] = max(
+                _ACTIVE_COUNTS["max_all_servers"], _ACTIVE_COUNTS["all_servers"]
+            )
+        time.sleep(int(self.path.strip("/")) / 1000)
+        with _ACTIVE_LOCK:
+            self.server.n_active -= 1
+            _ACTIVE_COUNTS["all_servers"] -= 1
+        body = self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def _start_server() -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+    server.daemon_threads = True
+    server.n_active = 0
+    server.max_active = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_make_url_requests_limits_and_order():
+    """make_url_requests() must respect the concurrency limits, and return make_url_request() dicts
+    (as completed, or in input order if ordered=True)"""
+    servers = [_start_server() for _ in range(2)]
+    urls = [
+        f"http://127.0.0.1:{servers[url_num % 2].server_port}/{(url_num * 7) % 30}"
+        for url_num in range(40)
+    ] + ["not a url"]
+
+    async def fetch_all(**kwargs):
+        return [x async for x in make_url_requests(urls, **kwargs)]
+
+    as_completed = asyncio.run(fetch_all(max_concurrency=5, per_host_limit=3))
+    assert max(server.max_active for server in servers) <= 3, "per_host_limit exceeded"
+    assert _ACTIVE_COUNTS["max_all_servers"] <= 5, "max_concurrency exceeded"
+    assert sorted(url for url, _ in as_completed) == sorted(urls)
+    assert [url for url, _ in as_completed] != urls, "results must stream as completed"
+
+    in_order = asyncio.run(fetch_all(max_concurrency=8, per_host_limit=4, ordered=True))
+    assert [url for url, _ in in_order] == urls, "ordered=True must keep input order"
+    assert in_order[0][1] == make_url_request(urls[0]), f"{in_order[0]}"
+    assert (
+        in_order[-1][1]["response_status_code"] is None
+        and in_order[-1][1]["returned_content"] is None
+    ), "invalid URL must get an error dict"
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_make_url_requests_timeout_limits_whole_request():
+    """A response which arrives too slowly must give a "request timed out" dict after [timeout]
+    seconds, without holding up the other requests"""
+    server = _start_server()
+    urls = [
+        f"http://127.0.0.1:{server.server_port}/{path}" for path in ("trickle", "1")
+    ]
+
+    async def fetch_all():
+        return [x async for x in make_url_requests(urls, timeout=0.5)]
+
+    started_at = time.perf_counter()
+    results = dict(asyncio.run(fetch_all()))
+    elapsed_seconds = time.perf_counter() - started_at
+    assert results[urls[0]] == {
+        "returned_content": None,
+        "response_status_code": None,
+        "status_desc": "request timed out",
+    }, f"{results[urls[0]]}"
+    assert results[urls[1]]["status_desc"] == "success", f"{results[urls[1]]}"
+    assert elapsed_seconds < 2, f"{elapsed_seconds=}"
+    server.shutdown()
+    server.server_close()
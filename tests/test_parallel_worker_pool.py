@@ -0,0 +1,59 @@
+import threading
+
+import joes_giant_toolbox.convenience
+
+INITIALIZER_CALLS = []
+INITIALIZER_LOCK = threading.Lock()
+
+
+def record_initializer_call(tag):
+    """worker initializer used in the tests"""
+    with INITIALIZER_LOCK:
+        INITIALIZER_CALLS.append(tag)
+
+
+def square(x):
+    """function run in parallel in the tests"""
+    return x * x
+
+
+def test_pool_is_warmed_up_once_and_reused():
+    """the initializer must run exactly once per worker, however many calls reuse the pool"""
+    INITIALIZER_CALLS.clear()
+    with joes_giant_toolbox.convenience.ParallelWorkerPool(
+        "multi_thread",
+        max_workers=3,
+        initializer=record_initializer_call,
+        initargs=("loaded",),
+    ) as pool:
+        assert INITIALIZER_CALLS == ["loaded"] * 3, "workers were not warmed up"
+        for _ in range(5):
+            func_output = list(
+                joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                    func=square,
+                    input_tuple=tuple(range(10)),
+                    parallel_method="multi_thread",
+                    verbose=False,
+                    pool=pool,
+                )
+            )
+            assert func_output == [x * x for x in range(10)]
+    assert INITIALIZER_CALLS == ["loaded"] * 3, "workers were restarted"
+
+
+def test_default_pool_is_created_once():
+    """pool='default' must lazily create one module-level pool per parallel_method and reuse it"""
+    default_pool = joes_giant_toolbox.convenience.get_default_worker_pool("multi_core")
+    assert default_pool is joes_giant_toolbox.convenience.get_default_worker_pool(
+        "multi_core"
+    )
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=square,
+            input_tuple=(1, 2, 3),
+            parallel_method="multi_core",
+            verbose=False,
+            pool="default",
+        )
+    )
+    assert func_output == [1, 4, 9], f"Observed Output: {func_output}"
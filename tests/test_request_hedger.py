@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from joes_giant_toolbox.all.request_hedger import RequestHedger
+
+
+def test_request_hedger_call_uses_first_response():
+    """A slow first attempt must be hedged, and the faster duplicate's result returned"""
+    call_num = itertools.count()
+
+    def slow_first_time() -> int:
+        attempt_num = next(call_num)
+        time.sleep(1.0 if attempt_num == 0 else 0.01)
+        return attempt_num
+
+    hedger = RequestHedger(delay_seconds=0.05)
+    started_at = time.perf_counter()
+    func_output = hedger.call(slow_first_time)
+    elapsed_seconds = time.perf_counter() - started_at
+    assert (
+        func_output == 1 and elapsed_seconds < 0.5
+    ), f"{func_output=} {elapsed_seconds=}"
+    assert hedger.call(lambda: "fast") == "fast"
+    stats = hedger.stats()
+    assert (
+        stats["calls"] == 2 and stats["hedges_fired"] == 1 and stats["hedges_won"] == 1
+    ), f"stats={stats}"
+
+    # if both attempts fail, the first attempt's error is raised #
+    def always_slow_failure():
+        time.sleep(0.1)
+        raise ConnectionError(f"attempt {next(call_num)} failed")
+
+    with pytest.raises(ConnectionError, match="attempt 2 failed"):
+        hedger.call(always_slow_failure)
+
+
+def test_request_hedger_call_async_cancels_loser():
+    """The losing coroutine must be cancelled, and the adaptive delay must follow recent latencies"""
+    cancelled = []
+
+    async def slow_tail(delay_seconds: float) -> float:
+        try:
+            await asyncio.sleep(delay_seconds)
+        except asyncio.CancelledError:
+            cancelled.append(delay_seconds)
+            raise
+        return delay_seconds
+
+    async def run_calls(hedger: RequestHedger) -> list:
+        latencies = [0.01] * 30 + [1.0]
+        return [await hedger.call_async(slow_tail, delay) for delay in latencies]
+
+    hedger = RequestHedger(min_samples=20, initial_delay_seconds=5.0)
+    started_at = time.perf_counter()
+    results = asyncio.run(run_calls(hedger))
+    elapsed_seconds = time.perf_counter() - started_at
+    stats = hedger.stats()
+    assert stats["delay_seconds"] < 0.1, f"stats={stats}"
+    # the last call is hedged (with the same slow arguments), so it still takes 1 second #
+    assert results[-1] == 1.0 and stats["hedges_fired"] == 1, f"stats={stats}"
+    assert (
+        cancelled == [1.0] and elapsed_seconds < 2
+    ), f"{cancelled=} {elapsed_seconds=}"
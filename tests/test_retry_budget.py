@@ -0,0 +1,114 @@
+import multiprocessing
+
+import pytest
+
+from joes_giant_toolbox.all.retry_budget import RetryBudget
+from joes_giant_toolbox.all.retry_function_call import retry_function_call
+from joes_giant_toolbox.all.retry_with_backoff import call_with_retries
+from joes_giant_toolbox.custom_exceptions import (
+    MaxRetriesExceededError,
+    RetryBudgetExhaustedError,
+)
+
+
+def _always_down():
+    raise ConnectionError("down")
+
+
+def _use_budget(budget: RetryBudget, n_successes: int, n_retries: int) -> None:
+    for _ in range(n_successes):
+        budget.record_success()
+    for _ in range(n_retries):
+        budget.try_acquire_retry()
+
+
+def test_retry_budget_caps_retries_to_share_of_successes():
+    """Retries must be granted only up to `retry_ratio` of the successful calls"""
+    budget = RetryBudget(retry_ratio=0.1, min_retries_per_second=0.0)
+    with pytest.raises(RetryBudgetExhaustedError):
+        call_with_retries(_always_down, base_delay_seconds=0.001, retry_budget=budget)
+    for _ in range(30):
+        call_with_retries(lambda: "ok", retry_budget=budget)
+    granted = [budget.try_acquire_retry() for _ in range(10)]
+    assert granted.count(True) == 3, f"{granted.count(True)} of 10 retries granted"
+    stats = budget.stats()
+    assert (
+        stats["successes"] == 30
+        and stats["retries_granted"] == 3
+        and stats["retries_denied_budget"] == 8
+    ), f"stats={stats}"
+
+    # a denied retry still counts as running out of retries #
+    with pytest.raises(MaxRetriesExceededError):
+        retry_function_call(
+            _always_down,
+            retry_pattern_seconds=(0.001,) * 5,
+            exceptions_to_handle=(ConnectionError,),
+            retry_budget=budget,
+        )
+
+
+def test_retry_budget_rate_limit():
+    """The token bucket must deny retries beyond `max_burst`, even when the budget allows them"""
+    budget = RetryBudget(
+        retry_ratio=1.0,
+        min_retries_per_second=0.0,
+        max_retries_per_second=0.001,
+        max_burst=2,
+    )
+    for _ in range(10):
+        budget.record_success()
+    granted = [budget.try_acquire_retry() for _ in range(5)]
+    assert granted == [True, True, False, False, False], f"granted={granted}"
+    assert budget.stats()["retries_denied_rate_limit"] == 3, f"{budget.stats()}"
+
+
+def test_retry_budget_is_shared_across_processes():
+    """Successes and retries of child processes must draw on the same budget as the parent's"""
+    budget = RetryBudget(retry_ratio=0.5, min_retries_per_second=0.0)
+    processes = [
+        multiprocessing.Process(target=_use_budget, args=(budget, 10, 4))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    stats = budget.stats()
+    assert (
+        stats["successes"] == 30
+        and stats["retries_granted"] == 12
+        and stats["available_retries"] == 3
+    ), f"stats={stats}"
+
+
+def test_retry_function_call_takes_no_retry_after_last_attempt():
+    """An exhausted retry pattern must only use the budget for the retries actually made
+    (and a budget which covers exactly those retries must not be blamed for the final failure)"""
+    budget = RetryBudget(retry_ratio=1.0, min_retries_per_second=0.0)
+    for _ in range(10):
+        budget.record_success()
+    with pytest.raises(MaxRetriesExceededError) as exc_info:
+        retry_function_call(
+            _always_down,
+            retry_pattern_seconds=(0.001, 0.001, 0.001),
+            exceptions_to_handle=(ConnectionError,),
+            retry_budget=budget,
+        )
+    assert exc_info.type is MaxRetriesExceededError, f"raised {exc_info.type}"
+    stats = budget.stats()
+    assert (
+        stats["retries_granted"] == 2 and stats["available_retries"] == 8
+    ), f"stats={stats}"
+
+    budget = RetryBudget(retry_ratio=1.0, min_retries_per_second=0.0)
+    for _ in range(2):
+        budget.record_success()
+    with pytest.raises(MaxRetriesExceededError) as exc_info:
+        retry_function_call(
+            _always_down,
+            retry_pattern_seconds=(0.001, 0.001, 0.001),
+            exceptions_to_handle=(ConnectionError,),
+            retry_budget=budget,
+        )
+    assert exc_info.type is MaxRetriesExceededError, f"raised {exc_info.type}"
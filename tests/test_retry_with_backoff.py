@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+
+from joes_giant_toolbox.all.circuit_breaker import CircuitBreaker
+from joes_giant_toolbox.all.retry_with_backoff import (
+    call_with_retries,
+    retry_with_backoff,
+)
+from joes_giant_toolbox.custom_exceptions import (
+    CircuitOpenError,
+    MaxRetriesExceededError,
+)
+
+
+def test_call_with_retries_retries_until_success():
+    """call_with_retries must retry handled exceptions, and raise unhandled ones immediately"""
+    n_calls = [0]
+
+    def fail_twice():
+        n_calls[0] += 1
+        if n_calls[0] <= 2:
+            raise ConnectionError("down")
+        return "ok"
+
+    func_output = call_with_retries(
+        fail_twice,
+        base_delay_seconds=0.001,
+        max_delay_seconds=0.01,
+        exceptions_to_handle=(ConnectionError,),
+    )
+    assert func_output == "ok" and n_calls[0] == 3, f"{n_calls[0]} calls made"
+
+    with pytest.raises(KeyError):
+        call_with_retries(
+            lambda: {}["missing"],
+            base_delay_seconds=0.001,
+            exceptions_to_handle=(ConnectionError,),
+        )
+    with pytest.raises(MaxRetriesExceededError):
+        call_with_retries(
+            lambda: 1 / 0,
+            max_attempts=3,
+            base_delay_seconds=0.001,
+            exceptions_to_handle=(ZeroDivisionError,),
+        )
+
+
+def test_retry_with_backoff_decorates_coroutine_functions():
+    """a decorated coroutine function must be retried without blocking the event loop"""
+    n_calls = [0]
+
+    @retry_with_backoff(base_delay_seconds=0.05, max_delay_seconds=0.05)
+    async def fail_once(x):
+        n_calls[0] += 1
+        if n_calls[0] == 1:
+            raise TimeoutError("slow")
+        return x * 2
+
+    async def main():
+        start_time = time.monotonic()
+        results = await asyncio.gather(fail_once(21), asyncio.sleep(0.01, "other"))
+        return results, time.monotonic() - start_time
+
+    results, elapsed_seconds = asyncio.run(main())
+    assert results == [42, "other"], f"Observed Output: {results}"
+    assert elapsed_seconds < 0.5, f"took {elapsed_seconds:.2f} seconds"
+
+
+def test_circuit_breaker_fails_fast_then_probes_recovery():
+    """an open breaker must reject calls without calling the dependency, then close after a successful probe"""
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout_seconds=0.05)
+    dependency_calls = [0]
+
+    def dependency(is_up):
+        dependency_calls[0] += 1
+        if not is_up:
+            raise ConnectionError("down")
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(dependency, False)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_retries(dependency, func_args=(True,), circuit_breaker=breaker)
+    assert dependency_calls[0] == 2, "the open breaker let a call through"
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.call(dependency, True) == "ok"
+    assert breaker.state == "closed", f"breaker stats: {breaker.stats()}"
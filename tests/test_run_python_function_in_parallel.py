@@ -0,0 +1,358 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import joes_giant_toolbox.convenience
+
+
+def square(x):
+    """function run in parallel in the tests"""
+    return x * x
+
+
+def test_chunked_and_streamed_results_match():
+    """chunked, streamed (ordered and unordered) runs must all give the same results as a plain map"""
+    expected_output = [x * x for x in range(1_000)]
+    for parallel_method in ("multi_thread", "multi_core"):
+        func_output = list(
+            joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                func=square,
+                input_tuple=tuple(range(1_000)),
+                parallel_method=parallel_method,
+                verbose=False,
+                chunksize=64,
+            )
+        )
+        assert func_output == expected_output, f"chunked run failed ({parallel_method})"
+        for ordered in (True, False):
+            func_output = list(
+                joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                    func=square,
+                    input_tuple=(x for x in range(1_000)),
+                    parallel_method=parallel_method,
+                    verbose=False,
+                    chunksize=64,
+                    stream=True,
+                    ordered=ordered,
+                    max_in_flight=3,
+                )
+            )
+            if not ordered:
+                func_output.sort()
+            assert (
+                func_output == expected_output
+            ), f"streamed run failed ({parallel_method}, ordered={ordered})"
+
+
+def test_stream_reads_unbounded_input_lazily():
+    """stream mode must only consume as much of the input as it needs (bounded in-flight tasks)"""
+    consumed_inputs = []
+
+    def unbounded_inputs():
+        for x in itertools.count():
+            consumed_inputs.append(x)
+            yield x
+
+    results = joes_giant_toolbox.convenience.run_python_function_in_parallel(
+        func=square,
+        input_tuple=unbounded_inputs(),
+        parallel_method="multi_thread",
+        verbose=False,
+        chunksize=10,
+        stream=True,
+        max_in_flight=2,
+    )
+    func_output = list(itertools.islice(results, 5))
+    results.close()
+    assert func_output == [0, 1, 4, 9, 16]
+    assert len(consumed_inputs) <= 40, f"{len(consumed_inputs)} inputs were consumed"
+
+
+def test_multi_async_runs_coroutines_concurrently_in_order():
+    """multi_async must run coroutines concurrently (up to max_workers at once) and return results in input order"""
+    running_now = [0]
+    max_running = [0]
+
+    async def slow_square(x):
+        running_now[0] += 1
+        max_running[0] = max(max_running[0], running_now[0])
+        await asyncio.sleep(0.01 * (x % 3))
+        running_now[0] -= 1
+        return x * x
+
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=slow_square,
+            input_tuple=tuple(range(50)),
+            parallel_method="multi_async",
+            verbose=False,
+            max_workers=10,
+        )
+    )
+    assert func_output == [x * x for x in range(50)], f"Observed Output: {func_output}"
+    assert (
+        max_running[0] == 10
+    ), f"{max_running[0]} coroutines ran at once (expected 10)"
+
+
+def _sum_rows_if_read_only(x):
+    return (not x["matrix"].flags.writeable, float(x["matrix"][x["row"]].sum()))
+
+
+def test_multi_core_shares_large_arrays_and_releases_them(monkeypatch):
+    """Large numpy arrays must reach multi_core workers (read-only, via shared memory), and the shared memory must be released afterwards"""
+    np = pytest.importorskip("numpy")
+    from multiprocessing import shared_memory
+
+    from joes_giant_toolbox.all import shared_array
+
+    matrix = np.arange(200_000, dtype=np.float64).reshape(100, 2_000)
+    created_names = []
+    original_share = shared_array.LargeArraySharer.share
+
+    def recording_share(self, x):
+        shared_x = original_share(self, x)
+        created_names.extend(
+            value.name
+            for value in shared_x.values()
+            if isinstance(value, shared_array.SharedArray)
+        )
+        return shared_x
+
+    monkeypatch.setattr(shared_array.LargeArraySharer, "share", recording_share)
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=_sum_rows_if_read_only,
+            input_tuple=tuple({"matrix": matrix, "row": i} for i in range(100)),
+            parallel_method="multi_core",
+            verbose=False,
+            max_workers=2,
+            share_arrays_min_bytes=1_000,
+        )
+    )
+    assert func_output == [
+        (True, float(matrix[i].sum())) for i in range(100)
+    ], "workers did not receive the (read-only) array"
+    assert (
+        len(set(created_names)) == 1
+    ), f"array was shared {len(set(created_names))} times"
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created_names[0])
+
+
+def test_multi_core_shared_arrays_do_not_leak_when_first_input_is_small():
+    """Sharing an array which only appears in a later input must not make the workers' resource tracker
+    unlink it (which prints leaked shared_memory warnings at exit)"""
+    pytest.importorskip("numpy")
+    script = textwrap.dedent(
+        """
+        import numpy as np
+        from joes_giant_toolbox.all.run_python_function_in_parallel import run_python_function_in_parallel
+
+        def total(x):
+            return float(np.asarray(x).sum())
+
+        if __name__ == "__main__":
+            print(list(run_python_function_in_parallel(
+                func=total, input_tuple=(1, 2, np.ones(500_000), 3), parallel_method="multi_core", verbose=False
+            )))
+        """
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+    assert completed.stdout.strip() == "[1.0, 2.0, 500000.0, 3.0]", completed.stdout
+    assert "leaked shared_memory" not in completed.stderr, completed.stderr
+
+
+def test_weights_start_costliest_inputs_first_but_keep_input_order():
+    """With [weights], inputs must be started from most to least costly, and results returned in input order"""
+    started_inputs = []
+
+    def record_and_double(x):
+        started_inputs.append(x)
+        return 2 * x
+
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=record_and_double,
+            input_tuple=(0, 1, 2, 3, 4),
+            parallel_method="multi_thread",
+            verbose=False,
+            max_workers=1,
+            weights=[1, 50, 1, 100, 7],
+        )
+    )
+    assert func_output == [0, 2, 4, 6, 8], f"Observed Output: {func_output}"
+    assert started_inputs == [3, 1, 4, 0, 2], f"Start order: {started_inputs}"
+
+
+def test_checkpoint_path_resumes_without_rerunning_completed_inputs(tmp_path):
+    """A run interrupted by an error must, when repeated with the same [checkpoint_path], only run the inputs without a stored result"""
+    checkpoint_path = str(tmp_path / "checkpoint.sqlite")
+    called_inputs = []
+
+    def square_unless_interrupted(x):
+        called_inputs.append(x)
+        if x == 30 and interrupted[0]:
+            raise RuntimeError("simulated crash")
+        return x * x
+
+    interrupted = [True]
+    with pytest.raises(RuntimeError):
+        list(
+            joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                func=square_unless_interrupted,
+                input_tuple=tuple(range(50)),
+                parallel_method="multi_thread",
+                verbose=False,
+                max_workers=1,
+                chunksize=10,
+                checkpoint_path=checkpoint_path,
+            )
+        )
+    interrupted[0] = False
+    called_inputs.clear()
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=square_unless_interrupted,
+            input_tuple=tuple(range(50)),
+            parallel_method="multi_thread",
+            verbose=False,
+            max_workers=1,
+            chunksize=10,
+            checkpoint_path=checkpoint_path,
+        )
+    )
+    assert func_output == [x * x for x in range(50)], f"Observed Output: {func_output}"
+    assert (
+        min(called_inputs) == 30
+    ), f"inputs {sorted(set(range(30)) & set(called_inputs))} were run again"
+
+
+def test_checkpoint_path_ignores_stored_results_beyond_the_inputs(tmp_path):
+    """Rerunning with the same [checkpoint_path] but fewer inputs must not return the extra stored results"""
+    checkpoint_path = str(tmp_path / "checkpoint.sqlite")
+    for n_inputs, stream, ordered in (
+        (5, False, True),
+        (3, False, True),
+        (3, True, True),
+        (2, True, False),
+    ):
+        func_output = list(
+            joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                func=square,
+                input_tuple=tuple(range(n_inputs)),
+                parallel_method="multi_thread",
+                verbose=False,
+                stream=stream,
+                ordered=ordered,
+                checkpoint_path=checkpoint_path,
+            )
+        )
+        assert sorted(func_output) == [
+            x * x for x in range(n_inputs)
+        ], f"{n_inputs} inputs (stream={stream}, ordered={ordered}) returned {func_output}"
+
+
+def test_telemetry_records_every_task_and_exports_to_json():
+    """[telemetry] must record 1 TaskTelemetry per input (also passed to its callback), and export to JSON"""
+    seen_tasks = []
+    telemetry = joes_giant_toolbox.convenience.ParallelRunTelemetry(
+        on_task_complete=seen_tasks.append
+    )
+    func_output = list(
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=lambda x: x + 1,
+            input_tuple=tuple(range(20)),
+            parallel_method="multi_thread",
+            verbose=False,
+            max_workers=3,
+            telemetry=telemetry,
+        )
+    )
+    assert func_output == list(range(1, 21)), f"Observed Output: {func_output}"
+    assert seen_tasks == telemetry.tasks, "callback did not receive every task"
+    assert sorted(task.input_idx for task in telemetry.tasks) == list(range(20))
+    assert all(
+        task.queue_wait_seconds >= 0 and task.wall_seconds >= 0
+        for task in telemetry.tasks
+    ), "negative durations recorded"
+    exported = json.loads(telemetry.to_json())
+    assert exported["summary"]["n_tasks"] == 20, f"summary: {exported['summary']}"
+    assert len(exported["tasks"]) == 20
+
+
+def _square_but_crash_worker_once(x):
+    if x["value"] == 7 and not os.path.exists(x["crash_marker"]):
+        open(x["crash_marker"], "w").close()
+        os._exit(1)  # the worker process dies while holding the task
+    return x["value"] ** 2
+
+
+def test_multi_host_redispatches_tasks_of_lost_workers(tmp_path):
+    """multi_host must return every result (in input order) from local worker processes, even when a worker dies mid-task"""
+    with socket.socket() as probe_socket:
+        probe_socket.bind(("localhost", 0))
+        port = probe_socket.getsockname()[1]
+    workers = [
+        multiprocessing.Process(
+            target=joes_giant_toolbox.convenience.run_multi_host_worker,
+            args=(("localhost", port), b"test secret"),
+        )
+        for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        func_output = list(
+            joes_giant_toolbox.convenience.run_python_function_in_parallel(
+                func=_square_but_crash_worker_once,
+                input_tuple=tuple(
+                    {"value": i, "crash_marker": str(tmp_path / "crashed")}
+                    for i in range(30)
+                ),
+                parallel_method="multi_host",
+                verbose=False,
+                chunksize=2,
+                address=("localhost", port),
+                authkey=b"test secret",
+                lease_timeout_seconds=5,
+            )
+        )
+    finally:
+        for worker in workers:
+            worker.join(timeout=10)
+    assert func_output == [i**2 for i in range(30)], f"Observed Output: {func_output}"
+    assert sorted(worker.exitcode for worker in workers) == [
+        0,
+        0,
+        1,
+    ], "the surviving workers did not stop once the run was complete"
+
+
+def test_multi_host_raises_when_no_worker_arrives():
+    """multi_host must raise a TimeoutError (rather than wait forever) if no worker ever contacts the coordinator"""
+    with pytest.raises(TimeoutError, match="no worker has contacted the coordinator"):
+        joes_giant_toolbox.convenience.run_python_function_in_parallel(
+            func=square,
+            input_tuple=tuple(range(10)),
+            parallel_method="multi_host",
+            verbose=False,
+            address=("localhost", 0),
+            authkey=b"test secret",
+            idle_timeout_seconds=0.5,
+        )
@@ -1,7 +1,293 @@
+import logging
+import re
+
+import pytest
+
 import joes_giant_toolbox.text
 
 string_cleaner = joes_giant_toolbox.text.StringCleaner()
 
+
+def test_compiled_operations_match_sequential_operations():
+    """A compiled chain of operations must give exactly the same output as applying the same operations sequentially"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    operation_params_dict = {
+        "remove_words_or_phrases": {
+            "remove_list": ["inc", "ltd"],
+            "enforce_word_boundaries": True,
+        }
+    }
+    test_strings = [
+        "company name is Stinc Inc S.L.T.D. Ltd",
+        "  Visit https://www.google.co.uk/media?x=1 NOW!!\n\n",
+        "time2go2number136street    a  B c D ef  g h  ",
+        "\x00\x07ÉCOLE Σ ßtraße İstanbul 日本 ΑΣ Β 42",
+        "",
+    ]
+    operation_chains = [
+        ["remove_numbers", "remove_punctuation", "to_lowercase"],
+        ["to_lowercase", "numbers_to_spaces", "remove_non_printable_ascii_chars"],
+        [
+            "newlines_to_spaces",
+            "punctuation_to_spaces",
+            "to_lowercase",
+            "remove_words_or_phrases",
+            "multiple_spaces_to_single_spaces",
+            "remove_whitespace_at_start_and_end",
+        ],
+        ["remove_spaces", "to_lowercase", "non_letters_to_spaces"],
+        ["join_single_space_separated_letters_together", "remove_non_letters"],
+        ["extract_domain_from_url", "to_lowercase"],
+    ]
+    for operation_names_list in operation_chains:
+        compiled_string_cleaner = string_cleaner.compile(
+            operation_names_list, operation_params_dict
+        )
+        for raw_str in test_strings:
+            expected_output = string_cleaner.apply_sequential_operations(
+                raw_str, operation_names_list, operation_params_dict
+            )
+            func_output = compiled_string_cleaner(raw_str)
+            assert (
+                func_output == expected_output
+            ), f"compiled {operation_names_list} on {raw_str!r} returned {func_output!r} (expected {expected_output!r})"
+
+
+def test_clean_many_preserves_input_order():
+    """clean_many() must return the same cleaned strings, in input order, whether run in-process, streamed or in worker processes"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    operation_names_list = ["to_lowercase", "remove_punctuation", "numbers_to_spaces"]
+    raw_strs = [f"Row #{row_num}: Joe IS the BEST!" for row_num in range(2_500)]
+    expected_output = [
+        string_cleaner.apply_sequential_operations(raw_str, operation_names_list)
+        for raw_str in raw_strs
+    ]
+    assert (
+        string_cleaner.clean_many(raw_strs, operation_names_list) == expected_output
+    ), "clean_many() with n_workers=1 gave unexpected output"
+    assert (
+        list(
+            string_cleaner.clean_many(iter(raw_strs), operation_names_list, stream=True)
+        )
+        == expected_output
+    ), "clean_many() with stream=True gave unexpected output"
+    assert (
+        string_cleaner.clean_many(
+            raw_strs, operation_names_list, n_workers=2, chunksize=100
+        )
+        == expected_output
+    ), "clean_many() with n_workers=2 gave unexpected output"
+
+
+def test_remove_words_or_phrases_matches_regex_alternation():
+    """remove_words_or_phrases must remove the same text as the plain regex alternation of the remove list
+    (including choosing the first matching phrase in the remove list when phrases overlap)"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    remove_list = ["a b c", "a", "a b", "inc", "s.l.t.d.", "-x", "", "ltd"]
+    raw_str = "a b d a b c company Stinc Inc s.l.t.d. ltd inc-x a-x ltdinc"
+    for enforce_word_boundaries in (True, False):
+        for test_remove_list in (remove_list, [x for x in remove_list if x]):
+            expected_output = re.sub(
+                "|".join(
+                    [
+                        f"(\\b{re.escape(x)}\\b)"
+                        if enforce_word_boundaries
+                        else f"({re.escape(x)})"
+                        for x in test_remove_list
+                    ]
+                ),
+                "",
+                raw_str,
+            )
+            func_output = string_cleaner.operations["remove_words_or_phrases"](
+                raw_str=raw_str,
+                remove_list=test_remove_list,
+                enforce_word_boundaries=enforce_word_boundaries,
+            )
+            assert (
+                func_output == expected_output
+            ), f"remove_list={test_remove_list} enforce_word_boundaries={enforce_word_boundaries} returned {func_output!r} (expected {expected_output!r})"
+
+
+def test_remove_words_or_phrases_long_phrases_and_modified_remove_list():
+    """remove_words_or_phrases must handle very long phrases, and must notice when the same remove
+    list object is modified between calls"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    long_phrase = "ab" * 5_000
+    remove_list = [long_phrase, long_phrase[:-1] + "c", "x"]
+    raw_str = f"start {long_phrase} middle {long_phrase[:-1]}c end x"
+    for enforce_word_boundaries in (True, False):
+        func_output = string_cleaner.operations["remove_words_or_phrases"](
+            raw_str=raw_str,
+            remove_list=remove_list,
+            enforce_word_boundaries=enforce_word_boundaries,
+        )
+        assert (
+            func_output == "start  middle  end "
+        ), f"enforce_word_boundaries={enforce_word_boundaries} returned {func_output[:50]!r}"
+        compiled_output = string_cleaner.compile(
+            ["remove_words_or_phrases"],
+            {
+                "remove_words_or_phrases": {
+                    "remove_list": remove_list,
+                    "enforce_word_boundaries": enforce_word_boundaries,
+                }
+            },
+        )(raw_str)
+        assert compiled_output == func_output, f"{compiled_output[:50]!r}"
+
+    remove_list.append("start")
+    func_output = string_cleaner.operations["remove_words_or_phrases"](
+        raw_str=raw_str, remove_list=remove_list, enforce_word_boundaries=True
+    )
+    assert func_output == "  middle  end ", f"returned {func_output[:50]!r}"
+
+
+def test_newly_named_custom_operation():
+    """An operation added to [operations] under a new name must work with compile() and clean_many()
+    (unfused, in-process only) exactly as with apply_sequential_operations()"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    string_cleaner.operations["reverse"] = lambda raw_str: raw_str[::-1]
+    operation_names_list = ["to_lowercase", "reverse", "remove_punctuation"]
+    raw_strs = ["Joe IS the best!!", "  Cat's pyjamas 123 "]
+    expected_output = [
+        string_cleaner.apply_sequential_operations(raw_str, operation_names_list)
+        for raw_str in raw_strs
+    ]
+    assert expected_output == ["tseb eht si eoj", " 321 samajyp stac  "]
+    compiled_string_cleaner = string_cleaner.compile(operation_names_list)
+    func_output = [compiled_string_cleaner(raw_str) for raw_str in raw_strs]
+    assert func_output == expected_output, f"compile() returned {func_output}"
+    func_output = string_cleaner.clean_many(raw_strs, operation_names_list)
+    assert func_output == expected_output, f"clean_many() returned {func_output}"
+    with pytest.raises(ValueError, match="can only be used with n_workers=1"):
+        string_cleaner.clean_many(raw_strs, operation_names_list, n_workers=2)
+
+
+def test_unicode_aware_character_operations():
+    """With unicode_aware=True, letters and numbers from any script must be recognised"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(
+        verbose=False, unicode_aware=True
+    )
+    func_output = string_cleaner.apply_sequential_operations(
+        "Café_٣½ 日本! Straße\x00",
+        operation_names_list=[
+            "remove_non_printable_ascii_chars",
+            "remove_numbers",
+            "remove_punctuation",
+            "to_lowercase",
+        ],
+    )
+    assert (
+        func_output == "café 日本 straße"
+    ), f"unicode-aware operations returned unexpected output {func_output!r}"
+
+
+def test_clean_file_matches_line_by_line_cleaning(tmp_path):
+    """clean_file() must write exactly the same lines as cleaning the file line by line, whether run in-process or in worker processes"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    operation_names_list = ["to_lowercase", "remove_punctuation", "remove_numbers"]
+    raw_lines = [f"Line #{line_num}: Joe IS the BEST!" for line_num in range(5_000)]
+    raw_lines[10] = ""
+    in_path = tmp_path / "raw.txt"
+    in_path.write_text("\n".join(raw_lines) + "\n", encoding="utf-8")
+    expected_output = (
+        "\n".join(
+            string_cleaner.apply_sequential_operations(raw_line, operation_names_list)
+            for raw_line in raw_lines
+        )
+        + "\n"
+    )
+    for n_workers in (1, 2):
+        out_path = tmp_path / f"clean_{n_workers}.txt"
+        string_cleaner.clean_file(
+            str(in_path),
+            str(out_path),
+            operation_names_list,
+            n_workers=n_workers,
+            chunk_bytes=1_000,
+        )
+        assert (
+            out_path.read_text(encoding="utf-8") == expected_output
+        ), f"clean_file() with n_workers={n_workers} gave unexpected output"
+
+
+def test_bytes_input_matches_str_input():
+    """Cleaning ASCII bytes/bytearray/memoryview must give exactly the encoded result of cleaning the equivalent str"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=False)
+    raw_str = "  GET /Index.html?id=123 HTTP/1.1\n\n 200   OK  a b c\x1f "
+    operation_names_list = [
+        "to_lowercase",
+        "remove_punctuation",
+        "remove_numbers",
+        "join_single_space_separated_letters_together",
+        "multiple_spaces_to_single_spaces",
+        "remove_whitespace_at_start_and_end",
+    ]
+    compiled_string_cleaner = string_cleaner.compile(operation_names_list)
+    expected_output = compiled_string_cleaner(raw_str).encode("ascii")
+    for raw_bytes in (
+        raw_str.encode("ascii"),
+        bytearray(raw_str.encode("ascii")),
+        memoryview(raw_str.encode("ascii")),
+    ):
+        for func_output in (
+            compiled_string_cleaner(raw_bytes),
+            string_cleaner.apply_sequential_operations(raw_bytes, operation_names_list),
+        ):
+            assert (
+                bytes(func_output) == expected_output
+            ), f"{type(raw_bytes)} input returned {func_output!r} (expected {expected_output!r})"
+            assert isinstance(
+                func_output, bytearray if isinstance(raw_bytes, bytearray) else bytes
+            ), f"{type(raw_bytes)} input returned unexpected type {type(func_output)}"
+    buffer = bytearray(raw_str.encode("ascii"))
+    compiled_string_cleaner.clean_inplace(buffer)
+    assert buffer == expected_output, "clean_inplace() gave unexpected output"
+
+
+def test_verbose_logging_never_formats_whole_input(caplog):
+    """verbose operations must log lazily through the module logger, and never include a huge input in full"""
+    string_cleaner = joes_giant_toolbox.text.StringCleaner(verbose=True)
+    huge_str = "x" * 1_000_000
+    with caplog.at_level(logging.DEBUG, logger="joes_giant_toolbox.all.string_cleaner"):
+        func_output = string_cleaner.operations["remove_numbers"](huge_str)
+    assert func_output == huge_str
+    log_messages = [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == "joes_giant_toolbox.all.string_cleaner"
+        and record.levelno == logging.DEBUG
+    ]
+    assert len(log_messages) == 1, f"expected 1 log message, got {log_messages}"
+    assert (
+        len(log_messages[0]) < 1_000 and "(1000000 chars)" in log_messages[0]
+    ), f"log message was not truncated: {log_messages[0][:200]}"
+
+
+def test_default_string_cleaner_leaves_logging_configuration_alone():
+    """StringCleaner() must not change logger levels or add handlers unless verbose=True is passed explicitly"""
+    module_logger = logging.getLogger("joes_giant_toolbox.all.string_cleaner")
+    package_logger = logging.getLogger("joes_giant_toolbox")
+    original_level = module_logger.level
+    module_logger.setLevel(logging.NOTSET)
+    package_handlers = list(package_logger.handlers)
+    try:
+        for verbose in (None, False):
+            joes_giant_toolbox.text.StringCleaner(verbose=verbose)
+            joes_giant_toolbox.text.StringCleaner()
+            assert (
+                module_logger.level == logging.NOTSET
+            ), f"verbose={verbose} set the logger level to {module_logger.level}"
+            assert (
+                package_logger.handlers == package_handlers
+            ), f"verbose={verbose} added handlers {package_logger.handlers}"
+        joes_giant_toolbox.text.StringCleaner(verbose=True)
+        assert module_logger.level == logging.DEBUG, f"level={module_logger.level}"
+    finally:
+        module_logger.setLevel(original_level)
+
+
 # # run the tests:
 # def test_remove_words_or_phrases():
 #     """Confirms that the remove_words_or_phrases() function works as expected, both in isolation and within a chained sequence of cleaning operations"""
@@ -0,0 +1,82 @@
+import pytest
+
+from joes_giant_toolbox.all.url_domain_extractor import UrlDomainExtractor
+
+
+def test_scheme_and_host_and_host():
+    """scheme+host and host must be extracted (and memoised) from typical URLs"""
+    extractor = UrlDomainExtractor()
+    for _ in range(3):
+        scheme_and_host = extractor.scheme_and_host(
+            "https://www.google.co.uk/media/contact-us.php?x=1"
+        )
+        host = extractor.host("HTTPS://joe@WWW.Google.co.uk:8080/media")
+    assert (
+        scheme_and_host == "https://www.google.co.uk"
+    ), f"unexpected scheme+host '{scheme_and_host}'"
+    assert host == "www.google.co.uk", f"unexpected host '{host}'"
+    cache_info = extractor.cache_info()
+    assert (
+        cache_info["scheme_and_host"].hits == 2 and cache_info["host"].hits == 2
+    ), f"repeated URLs were not served from the cache: {cache_info}"
+
+    # the scheme is optional, including before host:port #
+    for url, expected_host in (
+        ("example.com:8080/path", "example.com"),
+        ("localhost:8000", "localhost"),
+        ("joe@example.com:8080?x=1", "example.com"),
+        ("http://localhost:8000/", "localhost"),
+        ("mailto:joe@example.com", "example.com"),
+    ):
+        host = extractor.host(url)
+        assert host == expected_host, f"host('{url}') returned '{host}'"
+    assert (
+        extractor.registrable_domain("example.com:8080/path") == "example.com"
+    ), "scheme-less host:port must give the registrable domain"
+
+
+def test_registrable_domain(tmp_path):
+    """registrable domain must respect the bundled public suffixes, and the rules of a public suffix list file"""
+    extractor = UrlDomainExtractor()
+    func_output = extractor.extract_many(
+        [
+            "https://news.bbc.co.uk/sport",
+            "https://a.b.github.io/x",
+            "example.com",
+            "https://192.168.0.1/admin",
+            "https://co.uk",
+        ],
+        part="registrable_domain",
+    )
+    expected_output = ["bbc.co.uk", "b.github.io", "example.com", None, None]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+
+    public_suffix_list_path = tmp_path / "public_suffix_list.dat"
+    public_suffix_list_path.write_text(
+        "// comment\ncom\nuk\nco.uk\n*.ck\n!www.ck\n", encoding="utf-8"
+    )
+    extractor = UrlDomainExtractor(public_suffix_list_path=str(public_suffix_list_path))
+    func_output = extractor.extract_many(
+        ["https://a.b.co.uk", "http://a.b.c.ck", "http://a.www.ck", "http://x.y.com"],
+        part="registrable_domain",
+    )
+    expected_output = ["b.co.uk", "b.c.ck", "www.ck", "y.com"]
+    assert (
+        func_output == expected_output
+    ), f"\nExpected Output: {expected_output}\nObserved Output: {func_output}"
+
+
+def test_extract_many_pandas_series():
+    """a pandas Series input must give a Series with the same index, with missing values left missing"""
+    pd = pytest.importorskip("pandas")
+    extractor = UrlDomainExtractor()
+    urls = pd.Series(
+        ["https://www.google.com/a", None, "https://maps.google.com/b"] * 2,
+        index=list("abcdef"),
+    )
+    func_output = extractor.extract_many(urls, part="registrable_domain")
+    assert list(func_output.index) == list("abcdef"), "index was not preserved"
+    assert func_output.isna().tolist() == [False, True, False] * 2
+    assert func_output.dropna().tolist() == ["google.com"] * 4